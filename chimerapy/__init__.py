@@ -12,10 +12,10 @@ from .sorter import Sorter
 
 # Level 2 imports
 from .core import DataStream, Process, Collector, Pipeline, Session, DataSource,\
-    Sensor, Api, tools
+    Sensor, Api, SharedMemoryRing, tools
 
 # Level 3 imports
-from .core.tabular import TabularDataStream, TabularEntry, ImageEntry, IdentityProcess
+from .core.tabular import TabularDataStream, TabularEntry, ParquetEntry, ImageEntry, IdentityProcess
 from .core.video import VideoDataStream, VideoEntry
 
 # For Sphinx docs
@@ -54,6 +54,9 @@ def main():
     parser.add_argument(
         "--memory_limit", dest="memory_limit", type=float, default=0.8, help="RAM memory limit percentage available for the ChimeraDash."
     )
+    parser.add_argument(
+        "--lazy_timetrack", dest="lazy_timetrack", action="store_true", help="Build the global timetrack per window, instead of before loading."
+    )
     args = parser.parse_args()
 
     # Convert relative path to absolute paths
@@ -39,8 +39,12 @@ class DashboardModel(QAbstractListModel):
         # Creating empty essential variables.
         self.entries = pd.DataFrame()
         self.groups = []
+        self.group_indices = {}
         self._sort_by = None
 
+        # The (height, width) of each (user, entry_name) display
+        self.display_sizes = {}
+
     def update_data(self, entries:pd.DataFrame, sort_by:str):
         """Updating data organized by the entries and sorting preference.
 
@@ -74,13 +78,34 @@ class DashboardModel(QAbstractListModel):
             groups[i].reset_index(inplace=True)
             groups[i] = groups[i].drop(columns=['index'])
 
-        # Now group the entries
+        # Now group the entries, keeping the size of their displays
         self.groups = [GroupModel(group) for group in groups]
+        self.group_indices = {tag: i for i, tag in enumerate(self.unique_groups_tags)}
+        for (user, entry_name), display_size in self.display_sizes.items():
+            self.set_display_size(user, entry_name, display_size)
            
         # If the groups were changed, we need to reset the model
         if model_should_be_resetted:
             self.modelReset.emit()
 
+    def get_group_index(self, user, entry_name) -> int:
+        """Determine the group of an entry, by the sort_by.
+
+        Args:
+            user: Name of the user.
+            entry_name: Name of the entry.
+
+        Returns:
+            int: The index of the entry's group.
+
+        """
+        if self._sort_by == 'entry_name':
+            return self.group_indices[entry_name]
+        elif self._sort_by == 'user':
+            return self.group_indices[user]
+        else:
+            raise RuntimeError("Invalid _sort_by type for DashboardModel.")
+
     def update_content(self, index, user, entry_name, content):
         """Update the content given entries.
 
@@ -92,17 +117,29 @@ class DashboardModel(QAbstractListModel):
 
         """
         # First, determine which group by the sort_by
-        if self._sort_by == 'entry_name':
-            group_idx = self.unique_groups_tags.index(entry_name)
-        elif self._sort_by == 'user':
-            group_idx = self.unique_groups_tags.index(user)
-        else:
-            raise RuntimeError("Invalid _sort_by type for DashboardModel.")
+        group_idx = self.get_group_index(user, entry_name)
 
         # Then update the content for that group
         # print(f"Job ID: {index} - g{group_idx} - - {user} - {entry_name} - time: {datetime.datetime.now()}")
         self.groups[group_idx].update_content(user, entry_name, content)
 
+    def set_display_size(self, user, entry_name, display_size):
+        """Set the size of an entry's display.
+
+        Args:
+            user: Name of the user.
+            entry_name: Name of the entry.
+            display_size: The (height, width) of the display.
+
+        """
+        self.display_sizes[(user, entry_name)] = display_size
+
+        # First, determine which group by the sort_by
+        group_idx = self.get_group_index(user, entry_name)
+
+        # Then set the size for that group
+        self.groups[group_idx].set_display_size(user, entry_name, display_size)
+
     def reset_content(self):
         """Reset content by using default black image."""
 
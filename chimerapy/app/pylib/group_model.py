@@ -1,5 +1,5 @@
 # Built-in Imports
-from typing import Optional
+from typing import Optional, Tuple, Dict, List
 import os
 import pathlib
 
@@ -12,7 +12,10 @@ from PyQt5.QtCore import QAbstractListModel, Qt
 from PyQt5 import QtGui
 
 # Internal Imports
-from .qtools import toQImage
+from .qtools import toQImage, getDecodingScale
+
+# ChimeraPy Library Imports
+from chimerapy.core.tabular.entry import ImageEntry
 
 # Constants
 FILE_DIR = pathlib.Path(os.path.dirname(os.path.abspath(__file__)))
@@ -52,6 +55,12 @@ class GroupModel(QAbstractListModel):
         """
         super().__init__()
 
+        # The (height, width) of each entry's display, used to decode 
+        # the images sent encoded at a lower resolution, and of the full
+        # images
+        self.display_sizes: Dict[int, Tuple[int,int]] = {}
+        self.image_sizes: Dict[int, Tuple[int,int]] = {}
+
         # Store Entries
         if type(entries) != type(None):
        
@@ -69,13 +78,22 @@ class GroupModel(QAbstractListModel):
 
                 content.append(entry_content)
 
-            # Appending it to the entries
+            # Keeping the content in a list, next to the entries
             self._entries: pd.DataFrame = entries
-            self._entries['content'] = content
+            self.content: List[QtGui.QImage] = content
 
         else:
-            self._entries: pd.DataFrame = pd.DataFrame({})
-            self.content = []
+            self._entries: pd.DataFrame = pd.DataFrame({'user': [], 'entry_name': [], 'dtype': []})
+            self.content: List[QtGui.QImage] = []
+
+        # Precomputing the columns and the row of each (user, entry_name),
+        # for each update to be O(1)
+        self.users: List[str] = self._entries['user'].tolist()
+        self.entry_names: List[str] = self._entries['entry_name'].tolist()
+        self.dtypes: List[str] = self._entries['dtype'].tolist()
+        self.rows: Dict[Tuple[str,str], int] = {
+            (user, entry_name): row for row, (user, entry_name) in enumerate(zip(self.users, self.entry_names))
+        }
 
     def rowCount(self, parent):
         """PyQt5 required function to know the number of data entries."""
@@ -91,13 +109,13 @@ class GroupModel(QAbstractListModel):
         """
         row = index.row()
         if role == self.EntryRole:
-            return self._entries.iloc[row]["entry_name"]
+            return self.entry_names[row]
         if role == self.UserRole:
-            return self._entries.iloc[row]["user"]
+            return self.users[row]
         if role == self.DTypeRole:
-            return self._entries.iloc[row]["dtype"]
+            return self.dtypes[row]
         if role == self.ContentRole:
-            return self._entries.iloc[row]['content']
+            return self.content[row]
 
     def update_content(self, user, entry_name, content):
         """Update the content.
@@ -109,28 +127,45 @@ class GroupModel(QAbstractListModel):
 
         """
         # Obtain the specific entry that matches the user and the type
-        specific_entry = (self._entries['user'] == user) & (self._entries['entry_name'] == entry_name)
-        specific_entry_idx = np.where(specific_entry)[0][0]
+        specific_entry_idx = self.rows[(user, entry_name)]
 
-        # Ensure the content matches the required QObject requirements
-        entry_type = self._entries['dtype'].iloc[specific_entry_idx]
+        # Decode the images sent encoded by the ``Sorter``, at the 
+        # display's resolution once the full size is known
+        if isinstance(content, np.ndarray) and content.ndim == 1:
+            scale = getDecodingScale(self.image_sizes.get(specific_entry_idx), self.display_sizes.get(specific_entry_idx))
+            content = ImageEntry.decode_image(content, scale)
+            if content is not None:
+                self.image_sizes[specific_entry_idx] = (content.shape[0]*scale, content.shape[1]*scale)
 
         # Converting the content to a QImage
         qcontent = toQImage(content)
 
         # Then update that one
         # print(f"Updating: {specific_entry_idx} - {user} - {entry_name} - with {qcontent}")
-        self._entries.at[specific_entry_idx, 'content'] = qcontent
+        self.content[specific_entry_idx] = qcontent
 
         # Sending signal to update content
         index = self.index(specific_entry_idx, 0)
         self.dataChanged.emit(index, index, [])
 
+    def set_display_size(self, user, entry_name, display_size:Tuple[int,int]):
+        """Set the size of an entry's display.
+
+        Args:
+            user: The name of the user.
+            entry_name: The name of the entry.
+            display_size (Tuple[int,int]): The (height, width) of the \
+            display.
+
+        """
+        self.display_sizes[self.rows[(user, entry_name)]] = display_size
+
     def reset_content(self):
         """Reset all content by using the default black image."""
         
         # Placing all black images into the content
-        self._entries['content'] = QtGui.QImage(str(RESOURCE_DIR/'default_image.jpg'))
+        default_image = QtGui.QImage(str(RESOURCE_DIR/'default_image.jpg'))
+        self.content = [default_image for i in range(len(self._entries))]
 
         # Updating all contents through the signal
         for i in range(len(self._entries)):
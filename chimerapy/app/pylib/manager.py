@@ -2,9 +2,10 @@
 # https://stackoverflow.com/questions/64505389/cant-reference-existing-qml-elements-from-python
 
 # Built-in Imports
-from typing import List, Dict, Sequence
+from typing import List, Dict, Sequence, Optional
 import pathlib
 import json
+import os
 import collections
 import queue
 import threading
@@ -37,6 +38,7 @@ from chimerapy.core.tools import clear_queue, threaded, get_windows
 from chimerapy.core.data_stream import DataStream
 from chimerapy.core.video.data_stream import VideoDataStream
 from chimerapy.core.tabular.data_stream import TabularDataStream
+from chimerapy.core.tabular.entry import ImageEntry
 
 class Manager(QObject):
     modelChanged = pyqtSignal()
@@ -44,8 +46,9 @@ class Manager(QObject):
     pageChanged = pyqtSignal()
     dataLoadedChanged = pyqtSignal()
     slidingBarChanged = pyqtSignal()
+    displayStatsChanged = pyqtSignal()
 
-    signals = [modelChanged, playPauseChanged, pageChanged, dataLoadedChanged]
+    signals = [modelChanged, playPauseChanged, pageChanged, dataLoadedChanged, displayStatsChanged]
 
     def __init__(
             self,
@@ -56,6 +59,9 @@ class Manager(QObject):
             max_loading_queue_size:int=1000,
             memory_limit:float=0.8,
             loader_memory_ratio:float=0.1,
+            send_encoded_images:bool=False,
+            refresh_rate:float=30,
+            lazy_timetrack:bool=False,
             verbose:bool=False,
         ):
         """Construct the ``Manager``.
@@ -73,6 +79,18 @@ class Manager(QObject):
             loader_memory_ratio (float): Memory factor to account for 
             possible lag in memory consumption tracking.
 
+            send_encoded_images (bool): If ``True``, the ``Sorter`` sends
+            the images still encoded, and they are decoded at the 
+            dashboard's resolution.
+
+            refresh_rate (float): The max number of dashboard updates
+            per second. All the content due within a refresh interval
+            is applied in a single update.
+
+            lazy_timetrack (bool): If the ``Loader`` only builds the
+            global timetrack per window, instead of fully before 
+            loading the first window.
+
             verbose (bool): Debugging printout.
 
         """
@@ -87,6 +105,9 @@ class Manager(QObject):
         self.meta_check_step = meta_check_step # milliseconds
         self.max_message_queue_size = max_message_queue_size
         self.max_loading_queue_size = max_loading_queue_size
+        self.send_encoded_images = send_encoded_images
+        self.refresh_interval = 1 / refresh_rate
+        self.lazy_timetrack = lazy_timetrack
         self.verbose = verbose
 
         # Keeping track of all the data in the logdir
@@ -135,11 +156,26 @@ class Manager(QObject):
         self.loading_queue_memory_chunks = {}
         self.sorting_queue_memory_chunks = {}
         self.total_memory_used = 0
+
+        # The samples of the latest batch of the ``Sorter`` to display
+        self.sorted_samples = collections.deque()
+
+        # The display clock, as the (wall time, session time) it started
+        # from, and the achieved display statistics
+        self.display_clock = None
+        self.display_update_times = collections.deque()
+        self.display_stats_time = 0.0
+        self.num_of_dropped_frames = 0
+        self._display_fps = 0.0
+        self._display_lag = 0.0
         
         # Closing information
         self.thread_exit = threading.Event()
         self.thread_exit.clear()
 
+        # The sorter is created once the data is loaded
+        self.sorter = None
+
         # Keeping track of the choice of sorting
         # self.sort_by = "entry_name"
         self.sort_by = "user"
@@ -200,6 +236,14 @@ class Manager(QObject):
     def data_is_loaded(self):
         return self._data_is_loaded
 
+    @pyqtProperty(float, notify=displayStatsChanged)
+    def display_fps(self):
+        return self._display_fps
+
+    @pyqtProperty(float, notify=displayStatsChanged)
+    def display_lag(self):
+        return self._display_lag
+
     @pyqtSlot()
     def play_pause(self):
         """Pressing the pause/play button."""
@@ -237,6 +281,7 @@ class Manager(QObject):
             clear_queue(self.loading_queue)
         while self.sorting_queue.qsize():
             clear_queue(self.sorting_queue)
+        self.sorted_samples.clear()
 
         # Delete all the memory
         self.loading_queue_memory_chunks = {}
@@ -244,6 +289,7 @@ class Manager(QObject):
         
         # Set the time to the start_time
         self.current_time = self.start_time
+        self.display_clock = None
         self._sliding_bar.state = self.current_time / (self.end_time) 
 
         # Set the window of the loader and reset the session variable
@@ -283,6 +329,32 @@ class Manager(QObject):
         # Now sort by entry_name
         self.change_sort("entry_name")
 
+    @pyqtSlot(str, str, int, int)
+    def set_display_size(self, user:str, entry_name:str, width:int, height:int):
+        """Publishing the size of an entry's tile in the dashboard.
+
+        The ``Sorter`` downscales the frames of the entry to fit in its
+        tile, and the images sent encoded are decoded at a resolution 
+        close to it.
+
+        Args:
+            user (str): The name of the user.
+            entry_name (str): The name of the entry.
+            width (int): The width of the tile.
+            height (int): The height of the tile.
+
+        """
+        # If the size has not changed, ignore
+        display_size = (height, width)
+        if self._dashboard_model.display_sizes.get((user, entry_name)) == display_size:
+            return None
+
+        self._dashboard_model.set_display_size(user, entry_name, display_size)
+
+        # Inform the sorter, if it was already created
+        if self.sorter is not None:
+            self.message_display_sizes_sorter()
+
     def change_sort(self, sort_by:str):
         """Changing the sorting of the content in the dashboard. 
 
@@ -383,6 +455,20 @@ class Manager(QObject):
         }
         self.message_to_sorting_queue.put(message)
     
+    def message_display_sizes_sorter(self):
+        """Messaging sorter the sizes of the entries' tiles."""
+
+        message = {
+            'header': 'UPDATE',
+            'body': {
+                'type': 'DISPLAY_SIZES',
+                'content': {
+                    'display_sizes': self._dashboard_model.display_sizes.copy()
+                },
+            }
+        }
+        self.message_to_sorting_queue.put(message)
+
     def message_resume_loader(self):
         """Messaging loader to resume."""
 
@@ -426,7 +512,8 @@ class Manager(QObject):
     def respond_loader_message_timetrack(
             self, 
             timetrack:pd.DataFrame, 
-            windows:list
+            windows:list,
+            window_idx:Optional[int]=None
         ):
         """Responding to loader's initialization message.
 
@@ -434,9 +521,13 @@ class Manager(QObject):
             timetrack (pd.DataFrame): Collector's global timetrack.
             windows (list): List of windows (Window: namedtuple with 
             ``start`` and ``end`` attributes.)
+            window_idx (Optional[int]): The window of the timetrack, if 
+            the timetrack is sent per window. Only the global timetrack
+            is kept.
 
         """
-        self.timetrack = timetrack
+        if type(window_idx) == type(None):
+            self.timetrack = timetrack
         self.num_of_windows = len(windows)
 
     def respond_loader_message_counter(
@@ -678,23 +769,26 @@ class Manager(QObject):
                 if dtype == 'video':
                     video_path = file_dir/f"{entry_name}.avi"
                     assert video_path.exists()
+                    timestamps_path = file_dir/f"{entry_name}_timestamps.bin"
                     ds = VideoDataStream(
                         name=entry_name,
                         start_time=row['start_time'],
-                        video_path=video_path
+                        video_path=video_path,
+                        timestamps_path=timestamps_path if timestamps_path.exists() else None
                     )
                 elif dtype == 'image':
 
                     # Load the meta CSV
                     df = pd.read_csv(file_dir/entry_name/'timestamps.csv')
 
-                    # Load all the images into a data frame
-                    img_filepaths = []
-                    for index, row in df.iterrows():
-                        img_fp = file_dir / entry_name / f"{row['idx']}.jpg"
-                        img_filepaths.append(img_fp)
-
-                    df['img_filepaths'] = img_filepaths
+                    # Point each image to its file or its place in the archive
+                    if row['image_storage'] == 'archive':
+                        archive_index = ImageEntry.read_archive_index(file_dir/entry_name)
+                        df['img_archive'] = str(file_dir/entry_name/ImageEntry.archive_filename)
+                        df['img_offset'] = archive_index[df['idx'].to_numpy(), 0]
+                        df['img_size'] = archive_index[df['idx'].to_numpy(), 1]
+                    else:
+                        df['img_filepaths'] = str(file_dir/entry_name) + os.sep + df['idx'].astype(str) + row['image_format']
                     
                     # Create ds
                     ds = TabularDataStream(
@@ -729,7 +823,7 @@ class Manager(QObject):
             for entry_name, entry_data in session_data.items():
 
                 # For now, skip any tabular data since we don't have a way to visualize
-                if entry_data['dtype'] == 'tabular':
+                if entry_data['dtype'] in ['tabular', 'parquet']:
                     continue
 
                 entries['user'].append(session_name)
@@ -737,6 +831,8 @@ class Manager(QObject):
                 entries['dtype'].append(entry_data['dtype'])
                 entries['start_time'].append(pd.to_timedelta(entry_data['start_time']))
                 entries['end_time'].append(pd.to_timedelta(entry_data['end_time']))
+                entries['image_format'].append(entry_data.get('image_format', '.jpg'))
+                entries['image_storage'].append(entry_data.get('storage', 'files'))
                 # entries['is_subsession'].append(session_data['is_subsession'])
 
                 if entries['end_time'][-1] > self.end_time:
@@ -834,6 +930,7 @@ class Manager(QObject):
             message_from_queue=self.message_from_loading_queue,
             users_data_streams=self.users_data_streams,
             time_window=self.time_window,
+            lazy_timetrack=self.lazy_timetrack,
             verbose=self.verbose
         )
         
@@ -872,6 +969,8 @@ class Manager(QObject):
             message_to_queue=self.message_to_sorting_queue,
             message_from_queue=self.message_from_sorting_queue,
             entries=self.entries,
+            send_encoded_images=self.send_encoded_images,
+            display_sizes=self._dashboard_model.display_sizes.copy(),
             verbose=self.verbose
         )
     
@@ -884,7 +983,6 @@ class Manager(QObject):
                 
         # Get the necessary information to create the Collector 
         self.windows = get_windows(self.start_time, self.end_time, self.time_window)
-        self.update_content_times = collections.deque(maxlen=100)
      
         # Starting the Manager's messaging thread and the content update thread
         self.check_loader_messages_thread = self.check_loader_messages()
@@ -907,6 +1005,60 @@ class Manager(QObject):
         self.loader.start()
         self.sorter.start()
 
+    def get_sorted_batch(self, timeout:float) -> bool:
+        """Get the next batch of the ``Sorter`` to display.
+
+        Args:
+            timeout (float): The max time to wait for the batch.
+
+        Returns:
+            bool: If a batch was obtained.
+
+        """
+        try:
+            batch = self.sorting_queue.get(timeout=timeout)
+        except queue.Empty:
+            return False
+
+        # Update the memory used by the sorting queue
+        if batch['uuid']:
+            while batch['uuid'] not in self.sorting_queue_memory_chunks:
+                time.sleep(0.01)
+            del self.sorting_queue_memory_chunks[batch['uuid']]
+
+        # Unpack the batch into its samples
+        self.sorted_samples.extend(zip(
+            range(batch['index'], batch['index'] + len(batch['times'])),
+            batch['times'],
+            [batch['entries'][code] for code in batch['codes']],
+            batch['contents']
+        ))
+
+        return True
+
+    def update_display_stats(self, tic:float, playback_time:int, latest_time:int):
+        """Update the achieved fps and lag of the dashboard.
+
+        Args:
+            tic (float): The wall time of the update.
+            playback_time (int): The time of the display clock (ns).
+            latest_time (int): The time of the latest content shown (ns).
+
+        """
+        # Count the updates of the last second
+        self.display_update_times.append(tic)
+        while tic - self.display_update_times[0] > 1:
+            self.display_update_times.popleft()
+        self._display_fps = float(len(self.display_update_times))
+        self._display_lag = (playback_time - latest_time) / 1e9
+
+        # Inform the front-end once per second
+        if tic - self.display_stats_time >= 1:
+            self.display_stats_time = tic
+            self.displayStatsChanged.emit()
+            if self.verbose:
+                print(f"Display: {self._display_fps:.1f} fps, {self._display_lag:.3f} s lag, {self.num_of_dropped_frames} dropped frames")
+
     @threaded
     def update_content(self):
         """Main thread for updating the content on the dashboard.
@@ -916,6 +1068,13 @@ class Manager(QObject):
 
         ``Loader`` --> ``Sorter`` --> ``update_content`` Thread
 
+        The playback follows a display clock, which runs in real-time 
+        from the time it was started (or resumed). At every refresh 
+        interval, all the content due is applied in a single update, 
+        with only the latest frame of each entry, and the stale frames
+        are dropped. If the ``Sorter`` falls behind, the clock waits at
+        the latest content shown.
+
         """
         # Keep repeating until exiting the app
         while not self.thread_exit.is_set():
@@ -927,68 +1086,73 @@ class Manager(QObject):
 
             # Also, not processing if not playing or the session is complete
             if not self._is_play or self.session_complete:
+                self.display_clock = None
                 time.sleep(0.1)
                 continue
- 
-            # Get the next entry information!
-            try:
-                data_chunk = self.sorting_queue.get(timeout=0.1)
-            except queue.Empty:
-                print('EMPTY')
-                # Check if all the data has been loaded, if so that means
-                # that all the data has been played
-                if self.sorting_bar.state == 1:
-                   
-                    # Make that the session is complate and stop playing!
-                    print("Session end detected!")
-                    self.session_complete = True
-                    self._is_play = False
-                    self.playPauseChanged.emit()
-
-                    # Also reset the content
-                    self._dashboard_model.reset_content()
-                    self.modelChanged.emit()
-                
-                # Regardless, continue
-                continue
-            
-            # Get the time before updating
-            tic = time.time()
 
-            # Update the memory used by the sorting queue
-            if data_chunk['uuid']:
-                while data_chunk['uuid'] not in self.sorting_queue_memory_chunks:
-                    time.sleep(0.01)
-                del self.sorting_queue_memory_chunks[data_chunk['uuid']]
-            
-            # Compute the average time it takes to update content, and its ratio 
-            # to the expect time, clipping at 1
-            average_update_delta = sum(self.update_content_times)/max(1, len(self.update_content_times))
+            # Start the display clock from the current time
+            tic = time.time()
+            if self.display_clock is None:
+                self.display_clock = (tic, self.current_time.value)
+            playback_time = self.display_clock[1] + int((tic - self.display_clock[0]) * 1e9)
+
+            # Take all the content due, keeping the latest of each entry
+            due_content = {}
+            is_starving = False
+            while True:
+                if len(self.sorted_samples) == 0 and not self.get_sorted_batch(timeout=self.refresh_interval):
+                    is_starving = True
+                    break
+                if self.sorted_samples[0][1] > playback_time:
+                    break
+                index, entry_time, entry, content = self.sorted_samples.popleft()
+                if entry in due_content:
+                    self.num_of_dropped_frames += 1
+                due_content[entry] = (index, entry_time, content)
+
+            # Check if all the data has been loaded, if so that means
+            # that all the data has been played
+            if is_starving and len(due_content) == 0 and self.sorting_bar.state == 1:
+               
+                # Make that the session is complate and stop playing!
+                print("Session end detected!")
+                self.session_complete = True
+                self._is_play = False
+                self.playPauseChanged.emit()
+
+                # Also reset the content
+                self._dashboard_model.reset_content()
+                self.modelChanged.emit()
+                continue
 
-            # Calculate the delta between the current time and the entry's time
-            time_delta = (data_chunk['entry_time'] - self.current_time).value / 1e9
-            time_delta = max(0,time_delta-average_update_delta) # Accounting for updating
-            # print(time_delta)
-            time.sleep(time_delta)
+            # Update the content in a single pass
+            latest_time = None
+            for (user, entry_name), (index, entry_time, content) in due_content.items():
+                self._dashboard_model.update_content(
+                    index,
+                    user,
+                    entry_name,
+                    content
+                )
+                latest_time = entry_time if latest_time is None else max(latest_time, entry_time)
+
+            if latest_time is not None:
+                self.update_display_stats(tic, playback_time, int(latest_time))
+
+            # Updating the current time, which waits at the latest 
+            # content if the ``Sorter`` is behind
+            if is_starving:
+                if latest_time is not None:
+                    self.current_time = pd.Timedelta(int(latest_time), unit='ns')
+                self.display_clock = None
+            else:
+                self.current_time = pd.Timedelta(playback_time, unit='ns')
 
             # Updating sliding bar
-            self.current_time = data_chunk['entry_time']
             self._sliding_bar.state = self.current_time / (self.end_time) 
 
-            # Update the content
-            self._dashboard_model.update_content(
-                data_chunk['index'],
-                data_chunk['user'],
-                data_chunk['entry_name'],
-                data_chunk['content']
-            )
-
-            # Computing the time difference of uploading content
-            tac = time.time()
-            delta = tac - tic
-
-            # Finally update the sliding bar
-            self.update_content_times.append(delta)
+            # Wait until the next refresh
+            time.sleep(max(0, self.refresh_interval - (time.time() - tic)))
     
     def exit(self):
         """Exiting the application.
@@ -1020,36 +1184,16 @@ class Manager(QObject):
 
             self.message_end_loading_and_sorting()
 
-            # Clearing Queues to permit the processes to shutdown
-            # print("Clearing queues")
-            for q_name, queue in self.queues.items():
-                # print(f"Clearing {q_name} queue")
-                clear_queue(queue)
-
-            # Then wait for threads and process
-            # print("Clearing loading queue again")
-            while self.loading_queue.qsize():
-                clear_queue(self.loading_queue)
-                time.sleep(0.2)
-
-            self.loader.join()
-            # print("Loading process join")
-
-            time.sleep(0.3)
-            
-            # Clearing Queues to permit the processes to shutdown
-            # print("Clearing all queues again")
-            for q_name, queue in self.queues.items():
-                # print(f"clearing {q_name}.")
-                clear_queue(queue)
-
-            # print("Clearing sorting queue again")
-            while self.sorting_queue.qsize():
-                # print(self.sorting_queue.qsize())
-                clear_queue(self.sorting_queue)
-                time.sleep(0.2)
-
-            self.sorter.join()
-            # print("Sorting process join")
+            # Clearing Queues to permit the processes to shutdown, except
+            # the message queues to the subprocesses as this could drop
+            # the END messages
+            while self.loader.is_alive() or self.sorter.is_alive():
+                for q_name, queue in self.queues.items():
+                    if not q_name.startswith('m_to'):
+                        clear_queue(queue)
+
+                # Joining the subprocesses
+                self.loader.join(timeout=1)
+                self.sorter.join(timeout=1)
 
         # print("Finished closing")
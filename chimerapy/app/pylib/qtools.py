@@ -1,3 +1,6 @@
+# Built-in Imports
+from typing import Optional, Tuple
+
 # Third-party Imports
 import numpy as np
 import cv2
@@ -36,3 +39,28 @@ def toQImage(im:np.ndarray) -> QtGui.QImage:
                 return qim.copy()
 
     return QtGui.QImage()
+
+def getDecodingScale(
+        image_size:Optional[Tuple[int,int]], 
+        display_size:Optional[Tuple[int,int]]
+    ) -> int:
+    """Determine the largest reduction of an image that fills a display.
+
+    Args:
+        image_size (Optional[Tuple[int,int]]): The (height, width) of the \
+        full resolution image, if known.
+        display_size (Optional[Tuple[int,int]]): The (height, width) of \
+        the display, if known.
+
+    Returns:
+        int: The reduction of the resolution, either 1, 2, 4 or 8.
+
+    """
+    if image_size is None or display_size is None:
+        return 1
+
+    for scale in [8, 4, 2]:
+        if image_size[0] / scale >= display_size[0] and image_size[1] / scale >= display_size[1]:
+            return scale
+
+    return 1
@@ -18,5 +18,10 @@ Item {
         height: _height
         width: _width
         image: content
+
+        // Publish the size of the tile, for the frames to be downscaled
+        Component.onCompleted: Manager.set_display_size(user, entry_name, width, height)
+        onWidthChanged: Manager.set_display_size(user, entry_name, width, height)
+        onHeightChanged: Manager.set_display_size(user, entry_name, width, height)
     }
 }
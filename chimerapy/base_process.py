@@ -1,11 +1,13 @@
 # Built-in Imports
+from typing import Callable, Optional
 import multiprocessing as mp
+import multiprocessing.connection
 import threading
 import queue
 import time
 
 # ChimeraPy Imports
-from chimerapy.core.tools import threaded
+from chimerapy.core.tools import threaded, get_queue_reader
 
 # Resource:
 # https://stackoverflow.com/questions/8489684/python-subclassing-multiprocessing-process
@@ -20,8 +22,19 @@ class BaseProcess(mp.Process):
     is generated to continuously check for new messages within this 
     ``BaseProcess``.
 
+    Instead of polling the queues with sleeps, the message thread and 
+    the ``run`` routines of the subclasses block with ``wait_for_data``
+    and ``wait_until``. These are woken up by the queues' pipes and by 
+    the handled messages, making ``PAUSE``, ``RESUME``, and ``END`` 
+    take effect right away. Queues without a pipe and other changes of
+    state are checked every ``recheck_interval``.
+
     """
 
+    # The period (in seconds) of checking queues without a pipe and 
+    # predicates that depend on state changed outside of the messages
+    recheck_interval:float = 0.1
+
     def __init__(
             self, 
             message_to_queue:mp.Queue,
@@ -56,6 +69,13 @@ class BaseProcess(mp.Process):
         self.thread_exit = threading.Event()
         self.thread_exit.clear()
 
+        # Pipe that becomes readable once the process is ending, to wake
+        # up the routines waiting on the queues
+        self.exit_reader, self.exit_writer = mp.Pipe(duplex=False)
+
+        # Condition notified after every handled message
+        self.state_changed = threading.Condition()
+
         # Create the thread that checks messages
         self.check_messages_thread = self.check_messages()
         self.check_messages_thread.start()
@@ -64,46 +84,92 @@ class BaseProcess(mp.Process):
     def check_messages(self):
         """Creates the threaded function that can be called to ``start``."""
 
-        # Set the flag to check if new message
-        new_message = False
-        message = None
-        
         # Constantly check for messages
         while not self.thread_exit.is_set():
             
-            # Prevent blocking, as we need to check if the thread_exist
-            # is set.
-            while not self.thread_exit.is_set():
-                try:
-                    message = self.message_to_queue.get(timeout=1)
-                    new_message = True
-                    break
-                except queue.Empty:
-                    new_message = False
-                    time.sleep(0.1)
-                    
-            # Only process if new message is set and message exists
-            if new_message and message:
+            # Block until a message arrives or the process is ending
+            if not self.wait_for_data(self.message_to_queue):
+                continue
 
-                # Handle the incoming message
-                if self.verbose:
-                    print(f"{self.__class__.__name__} - NEW MESSAGE - {message}")
+            try:
+                message = self.message_to_queue.get(timeout=1)
+            except queue.Empty:
+                continue
 
-                # META --> General
-                if message['header'] == 'META':
+            # Handle the incoming message
+            if self.verbose:
+                print(f"{self.__class__.__name__} - NEW MESSAGE - {message}")
 
-                    # Determine the type of message and interpret it
-                    func = self.message_to_functions[message['body']['type']]
+            # META --> General
+            if message['header'] == 'META':
 
-                # else --> Specific on the process
-                else:
+                # Determine the type of message and interpret it
+                func = self.message_to_functions[message['body']['type']]
 
-                    # Determing the type of message by the subclasses's 
-                    # mapping
-                    func = self.subclass_message_to_functions[message['body']['type']]
+            # else --> Specific on the process
+            else:
 
-                # After obtaining the function, execute it
+                # Determing the type of message by the subclasses's 
+                # mapping
+                func = self.subclass_message_to_functions[message['body']['type']]
+
+            # After obtaining the function, execute it and wake up 
+            # the routines waiting for a change in state
+            with self.state_changed:
                 func(**message['body']['content'])
+                self.state_changed.notify_all()
+
+    def wait_for_data(self, data_queue:mp.Queue, timeout:Optional[float]=None) -> bool:
+        """Block until the queue has data or the process is ending.
+
+        The ``multiprocessing`` queues are waited on through their pipe.
+        Other queues are checked every ``recheck_interval``.
+
+        Args:
+            data_queue (mp.Queue): The queue to wait on.
+            timeout (Optional[float]): The max time to wait.
+
+        Returns:
+            bool: If the queue has data to ``get``.
+
+        """
+        reader = get_queue_reader(data_queue)
+        if reader is not None:
+            ready = mp.connection.wait([reader, self.exit_reader], timeout=timeout)
+            return reader in ready
+
+        # Poll the queue, while still waking up when the process is ending
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while data_queue.empty():
+            wait_time = self.recheck_interval if deadline is None else min(self.recheck_interval, deadline - time.monotonic())
+            if wait_time <= 0 or mp.connection.wait([self.exit_reader], timeout=wait_time):
+                return not data_queue.empty()
+        return True
+
+    def wait_until(self, predicate:Callable[[], bool], timeout:Optional[float]=None) -> bool:
+        """Block until the predicate is true or the process is ending.
+
+        The predicate is checked after every handled message, which is 
+        when the state of the process changes, and at least every 
+        ``recheck_interval``.
+
+        Args:
+            predicate (Callable[[], bool]): The condition to wait for.
+            timeout (Optional[float]): The max time to wait.
+
+        Returns:
+            bool: The last value of the predicate.
+
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.state_changed:
+            while not (predicate() or self.thread_exit.is_set()):
+                wait_time = self.recheck_interval if deadline is None else min(self.recheck_interval, deadline - time.monotonic())
+                if wait_time <= 0:
+                    break
+                self.state_changed.wait(wait_time)
+
+        return predicate()
 
     def pause(self):
         """Pausing the main ``run`` routine of the process.
@@ -129,8 +195,10 @@ class BaseProcess(mp.Process):
     def end(self):
         """Signal to stop the messaging thread"""
 
-        # Setting the thread exit event
+        # Setting the thread exit event and waking up the routines 
+        # waiting on the queues
         self.thread_exit.set()
+        self.exit_writer.send(True)
 
     def close(self):
         """Closing the subprocesses, with stopping the message thread."""
@@ -138,5 +206,9 @@ class BaseProcess(mp.Process):
         # Waiting for the thread to end
         self.check_messages_thread.join()
 
+        # Closing the pipe
+        self.exit_reader.close()
+        self.exit_writer.close()
+
         # Closing appropriately
         super().close()
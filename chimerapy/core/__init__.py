@@ -17,4 +17,5 @@ from .collector import Collector
 from .pipeline import Pipeline
 from .session import Session
 from .data_source import DataSource, Sensor, Api
+from .transport import SharedMemoryRing
 from . import tools
@@ -2,11 +2,15 @@
 __package__ = 'chimerapy'
 
 # Built-in Imports
-from typing import Sequence, Dict
+from typing import Sequence, Dict, Tuple
+import concurrent.futures
 import collections
 import queue
+import time
+import threading
 
 # Third-party Imports
+import numpy as np
 import pandas as pd
 
 # Internal Imports
@@ -28,6 +32,13 @@ class Collector:
         data stream type, and data pointers to allow the iteration over
         all samples in all data streams efficiently.
 
+        lazy_timetrack (bool): If the global timetrack is only built per
+        window range in ``get_timetrack``, instead of fully at startup.
+
+        stream_timings (Dict[Tuple[str, str], collections.deque]): The 
+        latest ``get`` durations (in seconds) of each (group, data 
+        stream) pair.
+
     """
 
     def __init__(
@@ -37,6 +48,8 @@ class Collector:
             start_time:pd.Timedelta=None,
             end_time:pd.Timedelta=None,
             empty:bool=False,
+            num_of_workers:int=0,
+            lazy_timetrack:bool=False,
             verbose:bool=False
         ) -> None:
         """Construct the ``Collector``.
@@ -51,12 +64,35 @@ class Collector:
         from the beginning to end. The data stream pointers help
         retrieve the correct data in an orderly fashion.
 
+        If ``num_of_workers`` is greater than zero, the data streams are
+        fetched concurrently by a thread pool of that size. Video 
+        decoding and pandas slicing release the GIL, so the latency of a
+        window approaches the slowest data stream instead of the sum of
+        all of them.
+
+        If ``lazy_timetrack``, the global timetrack is not materialized 
+        at startup. Only the start and end times are computed, and the
+        timetrack of a window range is merged when requested. This keeps
+        the startup time and memory independent of the number of samples.
+
         """
         # Constructing the data stream dictionary
         self.data_streams_groups = data_streams_groups
         self.time_window = time_window
+        self.num_of_workers = num_of_workers
+        self.lazy_timetrack = lazy_timetrack
         self.verbose = verbose
 
+        # Thread pool (only when concurrent) and timing of each stream,
+        # which the pool's workers update concurrently
+        self.executor = None
+        self.stream_timings = {}
+        self.stream_timings_lock = threading.Lock()
+        if self.num_of_workers > 0:
+            self.executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.num_of_workers
+            )
+
         # Starting up the datastreams
         for dss in self.data_streams_groups.values():
             for ds in dss:
@@ -120,34 +156,46 @@ class Collector:
         """Construct the global timetrack.
 
         The method for constructing the global timetrack is by using the
-        timelines of each data streams. A pd.TimedeltaIndex column 
-        with labelled ``time`` is used to sort the multimodal data. 
+        timelines of each data streams. Each data stream's timetrack is
+        already sorted, therefore only their int64 nanosecond times are 
+        concatenated and ordered with a stable argsort, instead of 
+        sorting a concatenated data frame. The ``group`` and ``ds_type``
+        columns are categorical.
+
+        If ``lazy_timetrack``, only the start and end times are computed
+        and the global timetrack remains empty.
 
         If verbose, the global timetrack is saved as well.
 
         """
-        dss_times= []
+        # Keeping the codes of the groups and data streams
+        self.group_categories = list(self.data_streams_groups.keys())
+        self.ds_type_categories = list(dict.fromkeys(
+            ds.name for ds_list in self.data_streams_groups.values() for ds in ds_list
+        ))
+
+        # Lazy timetracks only need the boundaries of each data stream
+        if self.lazy_timetrack:
+            dss_boundaries = [
+                (ds.timetrack_ns[0], ds.timetrack_ns[-1])
+                for ds_list in self.data_streams_groups.values()
+                for ds in ds_list if len(ds.timetrack_ns) > 0
+            ]
+            self.global_timetrack = self.merge_timetracks([])
+            self.global_timetrack_ns = np.empty(0, dtype=np.int64)
+            self.start_time = pd.Timedelta(min(x[0] for x in dss_boundaries))
+            self.end_time = pd.Timedelta(max(x[1] for x in dss_boundaries))
+            return None
+
+        # Obtaining each ds's complete timetrack
+        dss_times = []
         for group_name, ds_list in self.data_streams_groups.items():
             for ds in ds_list:
+                dss_times.append((group_name, ds, 0, len(ds.timetrack_ns)))
 
-                # Obtaining each ds's timetrack and adding an ds_type 
-                # identifier to know which data stream
-                time_series = ds.timetrack.copy()
-                time_series['group'] = group_name
-                time_series['ds_type'] = ds.name
-                time_series['ds_index'] = [x for x in range(len(time_series))]
-
-                # Storing the dataframe with all the other streams
-                dss_times.append(time_series)
-
-        # Converging the data streams tags to a global timetrack
-        self.global_timetrack: pd.DataFrame = pd.concat(dss_times, axis=0)
-
-        # Ensuring that the ds_index column is an integer
-        self.global_timetrack['ds_index'] = self.global_timetrack['ds_index'].astype(int)
-        self.global_timetrack.sort_values(by='time', inplace=True)
-        self.global_timetrack.reset_index(inplace=True)
-        self.global_timetrack = self.global_timetrack.drop(columns=['index'])
+        # Converging the data streams to a global timetrack
+        self.global_timetrack: pd.DataFrame = self.merge_timetracks(dss_times)
+        self.global_timetrack_ns = self.global_timetrack['time'].values.view(np.int64)
         
         # Split samples based on the time window size
         self.start_time = self.global_timetrack['time'][0]
@@ -156,6 +204,50 @@ class Collector:
         # For debugging purposes, save the timetrack to csv to debug
         if self.verbose:
             self.global_timetrack.to_csv('global_timetrack.csv', index=False)
+
+    def merge_timetracks(
+            self, 
+            dss_times:Sequence[Tuple[str, DataStream, int, int]]
+        ) -> pd.DataFrame:
+        """Merge ranges of the data streams' sorted timetracks.
+
+        Args:
+            dss_times (Sequence[Tuple[str, DataStream, int, int]]): The 
+            group name, data stream, and the start and end positions of 
+            the range in the data stream's timetrack.
+
+        Returns:
+            pd.DataFrame: The merged timetrack with ``time``, 
+            ``ds_index``, ``group``, and ``ds_type`` columns.
+
+        """
+        # Gather the times, pointers, and codes of each range
+        times, ds_indices, group_codes, ds_type_codes = [], [], [], []
+        for group_name, ds, start, end in dss_times:
+            times.append(ds.timetrack_ns[start:end])
+            ds_indices.append(np.arange(start, end, dtype=np.int64))
+            group_codes.append(np.full(end-start, self.group_categories.index(group_name), dtype=np.int32))
+            ds_type_codes.append(np.full(end-start, self.ds_type_categories.index(ds.name), dtype=np.int32))
+
+        # Order the concatenated times with a stable argsort, keeping the
+        # order of the data streams for equal times
+        if times:
+            times = np.concatenate(times)
+            order = np.argsort(times, kind='stable')
+            times = times[order]
+            ds_indices = np.concatenate(ds_indices)[order]
+            group_codes = np.concatenate(group_codes)[order]
+            ds_type_codes = np.concatenate(ds_type_codes)[order]
+        else:
+            times = ds_indices = np.empty(0, dtype=np.int64)
+            group_codes = ds_type_codes = np.empty(0, dtype=np.int32)
+
+        return pd.DataFrame({
+            'time': pd.to_timedelta(times, unit='ns'),
+            'ds_index': ds_indices,
+            'group': pd.Categorical.from_codes(group_codes, categories=self.group_categories),
+            'ds_type': pd.Categorical.from_codes(ds_type_codes, categories=self.ds_type_categories)
+        })
         
     def set_start_time(self, time:pd.Timedelta):
         """Set the start time, clipping previous time in the global timetrack.
@@ -203,15 +295,83 @@ class Collector:
 
         # Iterating over all groups (like users) and their corresponding
         # data streams.
-        for group_name, ds_list in self.data_streams_groups.items():
-            for ds in ds_list:
-                
-                # Obtaining the sample and storing it
-                sample: pd.DataFrame = ds.get(start_time, end_time)
-                all_samples[group_name][ds.name] = sample
+        if self.executor:
+            
+            # Submit all the data streams first, then collect them in the
+            # same order to keep the output deterministic
+            futures = [
+                (group_name, ds, self.executor.submit(self.get_stream, group_name, ds, start_time, end_time))
+                for group_name, ds_list in self.data_streams_groups.items()
+                for ds in ds_list
+            ]
+            for group_name, ds, future in futures:
+                all_samples[group_name][ds.name] = future.result()
+
+        else:
+            for group_name, ds_list in self.data_streams_groups.items():
+                for ds in ds_list:
+                    
+                    # Obtaining the sample and storing it
+                    all_samples[group_name][ds.name] = self.get_stream(group_name, ds, start_time, end_time)
 
         return all_samples
 
+    def get_stream(
+            self, 
+            group_name:str, 
+            ds:DataStream, 
+            start_time:pd.Timedelta, 
+            end_time:pd.Timedelta
+        ) -> pd.DataFrame:
+        """Get the data samples of a single data stream, timing it.
+
+        Args:
+            group_name (str): The group the data stream belongs to.
+            ds (DataStream): The data stream.
+            start_time (pd.Timedelta): Start of time window.
+            end_time (pd.Timedelta): End of time window.
+
+        Returns:
+            pd.DataFrame: The data samples of the data stream.
+
+        """
+        tic = time.perf_counter()
+        sample: pd.DataFrame = ds.get(start_time, end_time)
+        toc = time.perf_counter()
+
+        # Keep track of the latest durations of the data stream
+        key = (group_name, ds.name)
+        with self.stream_timings_lock:
+            if key not in self.stream_timings:
+                self.stream_timings[key] = collections.deque(maxlen=100)
+            self.stream_timings[key].append(toc - tic)
+
+        return sample
+
+    def get_timing_stats(self) -> pd.DataFrame:
+        """Get the ``get`` timing statistics of each data stream.
+
+        Returns:
+            pd.DataFrame: The ``mean``, ``max``, and ``last`` durations (in 
+            seconds) of the latest ``get`` calls, indexed by ``group`` and
+            ``ds_type``.
+
+        """
+        # Copy the timings, as the workers could be updating them
+        with self.stream_timings_lock:
+            stream_timings = {key: list(timings) for key, timings in self.stream_timings.items()}
+
+        stats = collections.defaultdict(list)
+        for (group_name, ds_name), timings in stream_timings.items():
+            stats['group'].append(group_name)
+            stats['ds_type'].append(ds_name)
+            stats['mean'].append(sum(timings) / len(timings))
+            stats['max'].append(max(timings))
+            stats['last'].append(timings[-1])
+
+        return pd.DataFrame(dict(stats), columns=['group', 'ds_type', 'mean', 'max', 'last'])\
+            .set_index(['group', 'ds_type'])
+
     def get_timetrack(
             self, 
             start_time: pd.Timedelta, 
@@ -227,15 +387,33 @@ class Collector:
             pd.DataFrame: The global timetrack from that range.
 
         """
-        return self.global_timetrack[(self.global_timetrack['time'] >= start_time) & (self.global_timetrack['time'] < end_time)]
+        # Build the range from each data stream's timetrack when lazy
+        if self.lazy_timetrack:
+            dss_times = []
+            for group_name, ds_list in self.data_streams_groups.items():
+                for ds in ds_list:
+                    start, end = ds.get_window_indices(start_time, end_time)
+                    dss_times.append((group_name, ds, start, end))
+            return self.merge_timetracks(dss_times)
+
+        # Else, slice the global timetrack
+        start = np.searchsorted(self.global_timetrack_ns, pd.Timedelta(start_time).value, side='left')
+        end = np.searchsorted(self.global_timetrack_ns, pd.Timedelta(end_time).value, side='left')
+        return self.global_timetrack.iloc[start:max(start, end)]
 
     def __len__(self):
         """Get the size of the global timetrack."""
+        if self.lazy_timetrack:
+            return sum(len(ds.timetrack_ns) for ds_list in self.data_streams_groups.values() for ds in ds_list)
         return len(self.global_timetrack)
 
     def close(self):
         """Close all data streams and ``Collector``."""
 
+        # Stop the thread pool
+        if self.executor:
+            self.executor.shutdown(wait=True)
+
         # Iterate through all data streams and close them.
         for dss in self.data_streams_groups.values():
             for ds in dss:
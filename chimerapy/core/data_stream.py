@@ -2,8 +2,10 @@
 __package__ = 'chimerapy'
 
 # Built-in Imports
+from typing import Tuple
 
 # Third Party Imports
+import numpy as np
 import pandas as pd
 
 # Internal Imports
@@ -17,6 +19,16 @@ class DataStream:
     Attributes:
         index (int): Keeping track of the current sample to load in __next__.
 
+        timetrack (pd.DataFrame): The time track of the data stream, \
+            sorted by the ``time`` column.
+
+        timetrack_ns (np.ndarray): The ``time`` column of the timetrack \
+            as a sorted int64 nanosecond array, used to find windows \
+            with binary search.
+
+        timetrack_index (np.ndarray): The ``ds_index`` column of the \
+            timetrack as an int64 array.
+
     Raises:
         NotImplementedError: __getitem__ function needs to be implemented \
             before calling.
@@ -108,10 +120,57 @@ class DataStream:
         
         """
         # Constructing the timetrack (including time and data pointer)
-        self.timetrack = pd.DataFrame({
+        self.set_timetrack(pd.DataFrame({
             'time': timeline,
-            'ds_index': [x for x in range(len(timeline))]
-        })
+            'ds_index': np.arange(len(timeline), dtype=np.int64)
+        }))
+
+    def set_timetrack(self, timetrack: pd.DataFrame) -> None:
+        """Store the timetrack and its sorted nanosecond time array.
+
+        The timetrack is sorted by ``time`` (keeping the ``ds_index``
+        pointers) if it is not already, so that windows can be located
+        with ``np.searchsorted`` instead of full boolean masks.
+
+        Args:
+            timetrack (pd.DataFrame): The timetrack with ``time`` and \
+                ``ds_index`` columns.
+
+        """
+        # Ensure the columns have the expected types
+        timetrack = timetrack.astype({'time': 'timedelta64[ns]', 'ds_index': np.int64})
+        
+        # Only sort when needed, as most timelines are already ordered
+        if not timetrack['time'].is_monotonic_increasing:
+            timetrack = timetrack.sort_values(by='time', kind='mergesort')
+        timetrack = timetrack.reset_index(drop=True)
+
+        # Store the timetrack and its numpy views
+        self.timetrack = timetrack
+        self.timetrack_ns = timetrack['time'].values.view(np.int64)
+        self.timetrack_index = timetrack['ds_index'].values
+
+    def get_window_indices(
+            self,
+            start_time: pd.Timedelta,
+            end_time: pd.Timedelta
+        ) -> Tuple[int, int]:
+        """Get the timetrack positions of the samples within the window.
+
+        The window includes ``start_time`` and excludes ``end_time``,
+        therefore the samples are found in ``timetrack[start:end]``.
+
+        Args:
+            start_time (pd.Timedelta): The start of the time window.
+            end_time (pd.Timedelta): The end of the time window.
+
+        Returns:
+            Tuple[int, int]: The start and end positions in the timetrack.
+
+        """
+        start = int(np.searchsorted(self.timetrack_ns, pd.Timedelta(start_time).value, side='left'))
+        end = int(np.searchsorted(self.timetrack_ns, pd.Timedelta(end_time).value, side='left'))
+        return start, max(start, end)
 
     def get(
         self, 
@@ -143,14 +202,11 @@ class DataStream:
             trim_time (pd.Timedelta): The cut-off time. 
 
         """
-        # Obtain the mask 
-        mask = self.timetrack['time'] > trim_time
-        new_timetrack = self.timetrack[mask]
-        new_timetrack.reset_index(inplace=True)
-        new_timetrack = new_timetrack.drop(columns=['index'])
+        # Find the first data point after the trim time
+        start = np.searchsorted(self.timetrack_ns, pd.Timedelta(trim_time).value, side='right')
 
         # Store the new timetrack
-        self.timetrack = new_timetrack
+        self.set_timetrack(self.timetrack.iloc[start:])
 
     def trim_after(self, trim_time: pd.Timedelta) -> None:
         """Remove data points after the trim_time timestamp.
@@ -159,14 +215,11 @@ class DataStream:
             trim_time (pd.Timedelta): The cut-off time.
 
         """
-        # Obtain the mask 
-        mask = self.timetrack['time'] < trim_time
-        new_timetrack = self.timetrack[mask]
-        new_timetrack.reset_index(inplace=True)
-        new_timetrack = new_timetrack.drop(columns=['index'])
+        # Find the first data point at or after the trim time
+        end = np.searchsorted(self.timetrack_ns, pd.Timedelta(trim_time).value, side='left')
         
         # Store the new timetrack
-        self.timetrack = new_timetrack
+        self.set_timetrack(self.timetrack.iloc[:end])
 
     def set_index(self, new_index: int) -> None:
         """Set the index used for the __next__ method.
@@ -2,13 +2,25 @@
 __package__ = 'chimerapy'
 
 # Built-in Imports
-from typing import Dict
+from typing import Dict, List
+import time
 
 # Third-party Imports
 import pandas as pd
 
 class Entry:
-    """Abstract Entry to be saved in the session and tracking changes."""
+    """Abstract Entry to be saved in the session and tracking changes.
+
+    The appended data frames are kept in a list of unsaved changes, 
+    which are concatenated once when flushed. ``needs_flush`` indicates
+    when the unsaved changes reached ``max_unsaved_rows`` or are older
+    than ``max_unsaved_period`` seconds.
+
+    """
+
+    # Thresholds of the unsaved changes to flush them
+    max_unsaved_rows:int = 1000
+    max_unsaved_period:float = 1.0
 
     def __repr__(self):
         """String representation of ``Entry``."""
@@ -18,6 +30,12 @@ class Entry:
         """String representation of ``Entry``."""
         return self.__repr__()
 
+    def reset_unsaved_changes(self):
+        """Create the empty list of unsaved changes."""
+        self.unsaved_changes: List[pd.DataFrame] = []
+        self.num_of_unsaved_changes = 0
+        self.last_flush_time = time.time()
+
     def append(self, data_chunk:Dict):
         """Append data to the entry - recording as unsaved changes.
 
@@ -28,7 +46,41 @@ class Entry:
         # Get the dataframe
         df = data_chunk['data']
         # Append the dataframe
-        self.unsaved_changes = pd.concat([self.unsaved_changes,df])
+        self.unsaved_changes.append(df)
+        self.num_of_unsaved_changes += len(df)
+
+    def needs_flush(self) -> bool:
+        """Determine if the unsaved changes should be flushed.
+
+        Returns:
+            bool: If there are too many or too old unsaved changes.
+
+        """
+        if len(self.unsaved_changes) == 0:
+            return False
+
+        return self.num_of_unsaved_changes >= self.max_unsaved_rows or \
+            time.time() - self.last_flush_time >= self.max_unsaved_period
+
+    def pop_unsaved_changes(self) -> pd.DataFrame:
+        """Concatenate the unsaved changes and clear them.
+
+        Returns:
+            pd.DataFrame: The unsaved changes.
+
+        """
+        # Avoid copying a single data frame
+        if len(self.unsaved_changes) == 1:
+            df = self.unsaved_changes[0].reset_index(drop=True)
+        else:
+            df = pd.concat(self.unsaved_changes, ignore_index=True)
+
+        # Reuse the list for the next changes
+        self.unsaved_changes.clear()
+        self.num_of_unsaved_changes = 0
+        self.last_flush_time = time.time()
+
+        return df
     
     def flush(self):
         """Write/Save changes and mark them as processed.
@@ -2,8 +2,9 @@
 __package__ = 'chimerapy'
 
 # Built-in Imports
-from typing import Union, Dict, Any
+from typing import Union, Dict, Any, Optional
 import uuid
+import time
 import multiprocessing as mp
 
 # Third-party Imports
@@ -12,6 +13,7 @@ import numpy as np
 
 # Internal Imports
 from chimerapy.core.tools import get_memory_data_size, PortableQueue
+from chimerapy.core.transport import SharedMemoryRing, SharedMemoryChunk
 
 class Session:
     """Interface to the ``Logger``. 
@@ -26,20 +28,44 @@ class Session:
             self, 
             name:str,
             logging_queue:PortableQueue,
+            shared_memory_ring:Optional[SharedMemoryRing]=None,
+            max_buffered_rows:int=0,
+            max_buffered_period:float=1.0
         ) -> None:
         """``Session`` Constructor.
 
+        Small ``add_tabular`` calls can be combined before reaching the
+        logging queue. The rows of each entry are buffered until there 
+        are ``max_buffered_rows`` of them, the oldest is older than 
+        ``max_buffered_period``, or ``flush`` is called (the runners do
+        so after ``Pipeline.end``). Each entry keeps the order of its rows.
+
         Args:
             name (str): The name of the session.
             logging_queue (PortableQueue): The queue where all formatted 
             data chunks are ``put``.
+            shared_memory_ring (Optional[SharedMemoryRing]): The shared 
+            memory of the ``Logger``. If provided, the frames of 
+            ``add_video`` and ``add_images`` are written into it and 
+            only their descriptor is ``put`` in the logging queue.
+            max_buffered_rows (int): The number of rows of an entry 
+            that are buffered before being ``put`` together. With ``0``,
+            the tabular data is not buffered.
+            max_buffered_period (float): The max time (in seconds) rows
+            stay in the buffer, checked when the ``Session`` is used.
 
         """
         # Storing the logging queue and name for the session
         self.name = name
         self.logging_queue = logging_queue
+        self.shared_memory_ring = shared_memory_ring
+        self.max_buffered_rows = max_buffered_rows
+        self.max_buffered_period = max_buffered_period
         self.runner = None
 
+        # The buffered tabular data of each entry
+        self.buffers: Dict[str, Dict[str, Any]] = {}
+
     def set_runner(self, runner:'Runner'):
         """Set the ``SingleRunner`` or ``GroupRunner`` to the session.
 
@@ -54,20 +80,44 @@ class Session:
         self.runner = runner
 
     def record_memory_usage(self, data_chunk: Dict[str, Any]):
-        """Record the memory usage of newly ``put`` data in logging queue.
+        """Record the memory usage of data to ``put`` in logging queue.
+
+        The memory usage is recorded before ``put``, so that it is 
+        always known when the ``Logger`` reports the chunk as logged.
 
         Args:
-            data_chunk (Dict[str, Any]): The recently ``put`` data chunk.
+            data_chunk (Dict[str, Any]): The data chunk to ``put``.
         """
 
         if type(self.runner) != type(None):
-            self.runner.logging_queue_memory_chunks[data_chunk['uuid']] = get_memory_data_size(data_chunk)
+            memory_usage = get_memory_data_size(data_chunk)
+            if isinstance(data_chunk['data'], SharedMemoryChunk):
+                memory_usage += data_chunk['data'].nbytes
+            self.runner.logging_queue_memory_chunks[data_chunk['uuid']] = memory_usage
+
+    def pack_frames(self, df:pd.DataFrame) -> Any:
+        """Write the frames into the shared memory, if available.
+
+        Args:
+            df (pd.DataFrame): The data frame with the frames.
+
+        Returns:
+            Any: The ``SharedMemoryChunk`` descriptor, or the data frame \
+            if there is no shared memory or the frames do not fit.
+
+        """
+        if type(self.shared_memory_ring) == type(None):
+            return df
+        return self.shared_memory_ring.pack(df)
     
     def add_image(
             self, 
             name:str, 
             data:np.ndarray, 
             timestamp:pd.Timedelta=None,
+            image_format:str='.jpg',
+            quality:Optional[int]=None,
+            storage:str='files'
         ) -> None:
         """Log an image to an specified entry at an optional timestamp.
 
@@ -79,6 +129,15 @@ class Session:
             timestamp (pd.Timedelta): The optional timestamp
             to tag the image with.
 
+            image_format (str): The file extension that selects the 
+            encoder, used when the ``Entry`` is created.
+
+            quality (Optional[int]): The quality of the encoder, used 
+            when the ``Entry`` is created.
+
+            storage (str): ``'files'`` or ``'archive'``, used when the 
+            ``Entry`` is created.
+
         """
         # If the data is not a numpy array, raise error
         if type(data) == type(None):
@@ -94,20 +153,22 @@ class Session:
             'uuid': uuid.uuid4(),
             'session_name': self.name,
             'name': name,
-            'data': df,
-            'dtype': 'image'
+            'data': self.pack_frames(df),
+            'dtype': 'image',
+            'entry_params': {'image_format': image_format, 'quality': quality, 'storage': storage}
         }
-        self.logging_queue.put(data_chunk.copy())
-
-        # Accounting for memory usage
         self.record_memory_usage(data_chunk)
+        self.logging_queue.put(data_chunk)
 
     def add_images(
             self,
             name:str,
             df:pd.DataFrame,
             time_column:str='_time_',
-            data_column:str='frames'
+            data_column:str='frames',
+            image_format:str='.jpg',
+            quality:Optional[int]=None,
+            storage:str='files'
         ) -> None:
         """Log images stored in a pd.DataFrame.
 
@@ -117,6 +178,12 @@ class Session:
             time_column (str): The name of the time column.
             data_column (str): The name of the data column containing 
             the images.
+            image_format (str): The file extension that selects the 
+            encoder, used when the ``Entry`` is created.
+            quality (Optional[int]): The quality of the encoder, used 
+            when the ``Entry`` is created.
+            storage (str): ``'files'`` or ``'archive'``, used when the 
+            ``Entry`` is created.
 
         """
         # If the data is empty, skip it
@@ -133,13 +200,12 @@ class Session:
             'uuid': uuid.uuid4(),
             'session_name': self.name,
             'name': name,
-            'data': images_df,
-            'dtype': 'image'
+            'data': self.pack_frames(images_df),
+            'dtype': 'image',
+            'entry_params': {'image_format': image_format, 'quality': quality, 'storage': storage}
         }
-        self.logging_queue.put(data_chunk.copy())
-        
-        # Accounting for memory usage
         self.record_memory_usage(data_chunk)
+        self.logging_queue.put(data_chunk)
         
     def add_video(
             self,
@@ -162,8 +228,9 @@ class Session:
         if len(df) == 0:
             return None
 
-        # Renaming and extracting only the video content
-        video_df = df[[data_column, time_column]].copy()
+        # Renaming and extracting only the video content, which only 
+        # copies the references to the frames
+        video_df = df[[data_column, time_column]]
         video_df = video_df.rename(columns={data_column: 'frames', time_column: '_time_'})
 
         # Put data in the logging queue
@@ -171,19 +238,18 @@ class Session:
             'uuid': uuid.uuid4(),
             'session_name': self.name,
             'name': name,
-            'data': video_df,
+            'data': self.pack_frames(video_df),
             'dtype': 'video'
         }
-        self.logging_queue.put(data_chunk.copy())
-        
-        # Accounting for memory usage
         self.record_memory_usage(data_chunk)
+        self.logging_queue.put(data_chunk)
         
     def add_tabular(
             self, 
             name:str,
             data:Union[pd.Series, pd.DataFrame, Dict],
-            time_column:str='_time_'
+            time_column:str='_time_',
+            file_format:str='csv'
         ) -> None:
         """Log tabular data.
 
@@ -191,8 +257,12 @@ class Session:
             name (str): Name of the tabular data.
             data (Union[pd.Series, pd.DataFrame, Dict]): Tabular data.
             time_column (str): Name of the time column.
+            file_format (str): The file format of the entry, either 
+            ``csv`` or ``parquet``. Parquet is faster to write and load,
+            but requires ``pyarrow``.
 
         """
+        assert file_format in ['csv', 'parquet'], f"{file_format} is an invalid file format for ``add_tabular``."
         # If the data is empty, skip it
         if len(data) == 0:
             return None
@@ -207,15 +277,73 @@ class Session:
         else:
             raise TypeError(f"{type(data)} is an invalid type for ``add_tabular``.")
 
-        # Put data in the logging queue
+        df = df.rename(columns={time_column: '_time_'})
+        dtype = 'tabular' if file_format == 'csv' else 'parquet'
+
+        # Without buffering, put data in the logging queue right away
+        if self.max_buffered_rows <= 0:
+            self.put_tabular(name, df, dtype)
+            return None
+
+        # A change of file format cannot be combined with the buffer
+        if name in self.buffers and self.buffers[name]['dtype'] != dtype:
+            self.flush(name)
+
+        # Buffer the data
+        if name not in self.buffers:
+            self.buffers[name] = {'dtype': dtype, 'dfs': [], 'num_of_rows': 0, 'start_time': time.time()}
+        self.buffers[name]['dfs'].append(df)
+        self.buffers[name]['num_of_rows'] += len(df)
+
+        # Put the full or old buffers in the logging queue
+        if self.buffers[name]['num_of_rows'] >= self.max_buffered_rows:
+            self.flush(name)
+        self.flush_stale()
+
+    def put_tabular(self, name:str, df:pd.DataFrame, dtype:str) -> None:
+        """Put tabular data in the logging queue.
+
+        Args:
+            name (str): Name of the tabular data.
+            df (pd.DataFrame): Tabular data, with a ``_time_`` column.
+            dtype (str): Either ``tabular`` or ``parquet``.
+
+        """
         data_chunk = {
             'uuid': uuid.uuid4(),
             'session_name': self.name,
             'name': name,
-            'data': df.rename(columns={time_column: '_time_'}),
-            'dtype': 'tabular'
+            'data': df,
+            'dtype': dtype
         }
-        self.logging_queue.put(data_chunk.copy())
-
-        # Accounting for memory usage
         self.record_memory_usage(data_chunk)
+        self.logging_queue.put(data_chunk)
+
+    def flush(self, name:Optional[str]=None) -> None:
+        """Put the buffered tabular data in the logging queue.
+
+        Args:
+            name (Optional[str]): The entry to flush. If ``None``, all \
+            the entries are flushed.
+
+        """
+        names = list(self.buffers.keys()) if name is None else [name]
+        for name in names:
+            buffer = self.buffers.pop(name, None)
+            if buffer is None:
+                continue
+
+            # Combine the buffered data frames
+            if len(buffer['dfs']) == 1:
+                df = buffer['dfs'][0]
+            else:
+                df = pd.concat(buffer['dfs'], ignore_index=True)
+
+            self.put_tabular(name, df, buffer['dtype'])
+
+    def flush_stale(self) -> None:
+        """Put the buffered tabular data older than ``max_buffered_period``."""
+        current_time = time.time()
+        for name in list(self.buffers.keys()):
+            if current_time - self.buffers[name]['start_time'] >= self.max_buffered_period:
+                self.flush(name)
@@ -1,4 +1,4 @@
 # Imports
 from .data_stream import TabularDataStream
-from .entry import TabularEntry, ImageEntry
+from .entry import TabularEntry, ParquetEntry, ImageEntry
 from .processes import IdentityProcess
@@ -6,6 +6,7 @@ import collections
 import tqdm
 import pathlib
 
+import numpy as np
 import pandas as pd
 
 from chimerapy.core.data_stream import DataStream
@@ -186,16 +187,19 @@ class TabularDataStream(DataStream):
         """
         assert end_time > start_time, "``end_time`` should be greater than ``start_time``."
         
-        # Generate mask for the window data
-        after_start_time = self.timetrack['time'] >= start_time
-        before_end_time = self.timetrack['time'] < end_time
-        time_window_mask = after_start_time & before_end_time
+        # Locate the window within the sorted timetrack
+        start, end = self.get_window_indices(start_time, end_time)
 
-        # Convert the time_window_mask to have the data indx
-        data_index = self.timetrack[time_window_mask].ds_index
+        # Convert the window to have the data indx
+        data_index = self.timetrack_index[start:end]
 
-        # Extract the data
-        data = self.data.iloc[data_index]
+        # Extract the data, as a contiguous slice whenever possible
+        if len(data_index) == 0:
+            data = self.data.iloc[0:0]
+        elif data_index[-1] - data_index[0] + 1 == len(data_index):
+            data = self.data.iloc[data_index[0]:data_index[-1]+1]
+        else:
+            data = self.data.iloc[data_index]
 
         # Return the data sample
         return data
@@ -210,18 +214,16 @@ class TabularDataStream(DataStream):
         time_column_data = append_data[time_column]
         assert isinstance(time_column_data.iloc[0], pd.Timedelta), "time column should be ``pd.Timedelta`` objects."
 
-        # Create data frame for the timeline
+        # Create data frame for the timeline, pointing after the current data
         append_timetrack = pd.DataFrame(
             {
-                'time': time_column_data, 
-                'ds_index': 
-                    [x for x in range(len(time_column_data))]
+                'time': time_column_data.values, 
+                'ds_index': np.arange(len(time_column_data)) + len(self.data)
             }
         )
 
         # Add to the timetrack (cannot be inplace)
-        self.timetrack = pd.concat([self.timetrack, append_timetrack])
-        self.timetrack['ds_index'] = self.timetrack['ds_index'].astype(int)
+        self.set_timetrack(pd.concat([self.timetrack, append_timetrack]))
 
         # Then add it to the data body (cannot be inplace)
         self.data = pd.concat([self.data, append_data])
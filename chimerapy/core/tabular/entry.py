@@ -2,16 +2,25 @@
 __package__ = 'tabular'
 
 # Built-in Imports
-from typing import Union, Dict, Optional, Any
+from typing import Union, Dict, List, Optional, Any
+import concurrent.futures
 import pathlib
+import json
 import os
-import gc
 
 # Third-party Imports
 import pandas as pd
 import numpy as np
 import cv2
 
+# Optional Third-party Imports
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
 # Internal Imports
 from chimerapy.core.entry import Entry
 from chimerapy.core.tabular.data_stream import TabularDataStream
@@ -40,7 +49,7 @@ class TabularEntry(Entry):
             os.mkdir(self.dir)
 
         # Setting initial values
-        self.unsaved_changes = pd.DataFrame(columns=['_time_', 'data'])
+        self.reset_unsaved_changes()
         self.num_of_total_changes = 0
 
         # Data types that only need one file that gets appended
@@ -56,83 +65,414 @@ class TabularEntry(Entry):
         """Commit the unsaved changes to memory."""
 
         # If no new changes, end
-        if len(self.unsaved_changes.index) == 0:
+        if len(self.unsaved_changes) == 0:
             return None
 
+        # Concatenate the unsaved changes once
+        unsaved_changes = self.pop_unsaved_changes()
+
         # If this is the first time, we want the headers
         if self.num_of_total_changes == 0:
-            self.unsaved_changes.to_csv(self.save_loc, mode='a', index=False, header=True)
+            unsaved_changes.to_csv(self.save_loc, mode='a', index=False, header=True)
         else:
-            self.unsaved_changes.to_csv(self.save_loc, mode='a', index=False, header=False)
+            unsaved_changes.to_csv(self.save_loc, mode='a', index=False, header=False)
 
-        # Update the counter and clear out the unsaved items
-        self.num_of_total_changes += len(self.unsaved_changes)
-        self.unsaved_changes = self.unsaved_changes.iloc[0:0]
-
-        # Collect the garbage
-        del self.unsaved_changes
-        self.unsaved_changes = pd.DataFrame(columns=['_time_', 'data'])
-        gc.collect()
+        # Update the counter
+        self.num_of_total_changes += len(unsaved_changes)
 
     def close(self):
 
         # Apply the last changes and that's it!
         self.flush()
 
+class ParquetEntry(TabularEntry):
+    """Tabular entry saved as a Parquet file.
+
+    Instead of formatting the data as text and appending it to a CSV
+    file, each ``flush`` writes the unsaved changes as a row group with
+    a streaming ``ParquetWriter``. Timedelta columns are stored as int64
+    nanoseconds and their names are kept in the file's metadata, for
+    ``read`` to restore them. If later changes have wider types or new
+    columns, the schema is promoted. This requires the optional 
+    ``pyarrow`` dependency.
+
+    """
+
+    def __init__(
+        self, 
+        dir:pathlib.Path,
+        name:str,
+        ):
+        """Construct an Parquet Entry.
+
+        Args:
+            dir (pathlib.Path): The directory to store the snap shots \
+            of data.
+            name (str): The name of the ``Entry``.
+
+        """
+        assert pa is not None, "``ParquetEntry`` requires ``pyarrow``, install it with ``pip install pyarrow``."
+        super().__init__(dir, name)
+
+        # The writer is created with the schema of the first changes
+        self.save_loc = self.dir / f"{self.name}.parquet"
+        self.writer = None
+        self.schema = None
+        self.timedelta_columns = []
+
+    def open_writer(self, schema:'pa.Schema'):
+        """Open the writer of the Parquet file with a schema.
+
+        Args:
+            schema (pa.Schema): The schema of the logged data.
+
+        """
+        self.schema = schema
+        metadata = {b'chimerapy': json.dumps({'timedelta_columns': self.timedelta_columns}).encode()}
+        self.writer = pq.ParquetWriter(self.save_loc, schema.with_metadata(metadata))
+
+    def conform(self, table:'pa.Table') -> 'pa.Table':
+        """Cast a table to the schema, filling the missing columns with nulls.
+
+        Args:
+            table (pa.Table): The table of the changes.
+
+        Returns:
+            pa.Table: The table with the writer's schema.
+
+        """
+        columns = [
+            table.column(field.name).cast(field.type) if field.name in table.column_names \
+                else pa.nulls(len(table), field.type)
+            for field in self.schema
+        ]
+        return pa.Table.from_arrays(columns, schema=self.schema)
+
+    def promote_schema(self, schema:'pa.Schema'):
+        """Rewrite the Parquet file with a promoted schema.
+
+        A Parquet file has a single schema, so the logged row groups 
+        are read back and written again with the new schema. This only 
+        happens when the changes require a wider type (e.g. ``int64`` to
+        ``double`` once a value is NaN) or add a column.
+
+        Args:
+            schema (pa.Schema): The promoted schema.
+
+        """
+        self.writer.close()
+        logged_table = pq.read_table(self.save_loc).replace_schema_metadata(None)
+        self.open_writer(schema)
+        self.writer.write_table(self.conform(logged_table))
+
+    def flush(self):
+        """Commit the unsaved changes to memory as a new row group."""
+
+        # If no new changes, end
+        if len(self.unsaved_changes) == 0:
+            return None
+
+        # Store the timedeltas as int64 nanoseconds
+        df = self.pop_unsaved_changes()
+        self.timedelta_columns += [
+            column for column in df.columns 
+            if pd.api.types.is_timedelta64_dtype(df[column]) and column not in self.timedelta_columns
+        ]
+        for column in self.timedelta_columns:
+            if column in df.columns:
+                df[column] = pd.to_timedelta(df[column]).values.astype('timedelta64[ns]').view(np.int64)
+        table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+
+        # If this is the first time, create the writer with the schema
+        if self.writer is None:
+            self.open_writer(table.schema)
+
+        # If the changes do not fit the schema, promote it to the 
+        # common schema of both
+        elif not table.schema.equals(self.schema):
+            schema = pa.unify_schemas([self.schema, table.schema], promote_options='permissive')
+            if not schema.equals(self.schema):
+                self.promote_schema(schema)
+
+        self.writer.write_table(self.conform(table))
+
+        # Update the counter
+        self.num_of_total_changes += len(df)
+
+    def close(self):
+
+        # Apply the last changes and close the file
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    @staticmethod
+    def read(filepath:Union[str, pathlib.Path]) -> pd.DataFrame:
+        """Read a Parquet file written by a ``ParquetEntry``.
+
+        Args:
+            filepath (Union[str, pathlib.Path]): The Parquet file.
+
+        Returns:
+            pd.DataFrame: The logged data, with its timedelta columns.
+
+        """
+        assert pq is not None, "``ParquetEntry`` requires ``pyarrow``, install it with ``pip install pyarrow``."
+
+        # Load the table and restore the timedeltas
+        table = pq.read_table(filepath)
+        df = table.to_pandas()
+        metadata = json.loads((table.schema.metadata or {}).get(b'chimerapy', b'{}'))
+        for column in metadata.get('timedelta_columns', []):
+            df[column] = pd.to_timedelta(df[column], unit='ns')
+
+        return df
+
 class ImageEntry(Entry):
 
+    # Frames are large, so flush them in smaller batches
+    max_unsaved_rows:int = 30
+
+    # The encoding parameter that controls the quality of each format
+    quality_params:Dict[str, int] = {
+        '.jpg': cv2.IMWRITE_JPEG_QUALITY,
+        '.jpeg': cv2.IMWRITE_JPEG_QUALITY,
+        '.png': cv2.IMWRITE_PNG_COMPRESSION,
+        '.webp': cv2.IMWRITE_WEBP_QUALITY
+    }
+
+    # The decoding flag of each reduction of the resolution
+    decoding_flags:Dict[int, int] = {
+        1: cv2.IMREAD_COLOR,
+        2: cv2.IMREAD_REDUCED_COLOR_2,
+        4: cv2.IMREAD_REDUCED_COLOR_4,
+        8: cv2.IMREAD_REDUCED_COLOR_8
+    }
+
+    # The files of the ``'archive'`` storage: the encoded images are 
+    # appended to a single container and their (offset, size) pairs, 
+    # as little-endian int64, to the index
+    archive_filename:str = 'images.bin'
+    index_filename:str = 'index.bin'
+
     def __init__(
         self, 
         dir:pathlib.Path,
         name:str,
+        image_format:str='.jpg',
+        quality:Optional[int]=None,
+        storage:str='files',
+        num_of_workers:int=4
         ):
+        """Construct an Image Entry.
+
+        Args:
+            dir (pathlib.Path): The directory to store the images folder.
+            name (str): The name of ``Entry``.
+            image_format (str): The file extension that selects the \
+            encoder (``'.jpg'``, ``'.png'``, or ``'.webp'``).
+            quality (Optional[int]): The quality (or compression level \
+            for ``'.png'``) of the encoder. ``None`` uses OpenCV's default.
+            storage (str): ``'files'`` to save an image file per image, \
+            or ``'archive'`` to append the images to a single container \
+            with an offset index.
+            num_of_workers (int): The number of threads that encode the \
+            images of a flush in parallel.
+
+        """
+        assert image_format in self.quality_params, \
+            f"image_format should be one of {list(self.quality_params)}, not {image_format}"
+        assert storage in ['files', 'archive'], \
+            f"storage should be 'files' or 'archive', not {storage}"
 
         # Storing input parameters
         self.dir = dir
         self.name = name
+        self.image_format = image_format
+        self.quality = quality
+        self.storage = storage
+
+        # Determine the encoding parameters
+        if self.quality is None:
+            self.encode_params = []
+        else:
+            self.encode_params = [self.quality_params[self.image_format], int(self.quality)]
                 
         # Setting initial values
-        self.unsaved_changes = pd.DataFrame(columns=['_time_', 'data'])
+        self.reset_unsaved_changes()
         self.num_of_total_changes = 0
 
         # For image entry, need to save to a new directory
         self.save_loc = self.dir / self.name
         os.mkdir(self.save_loc)
 
+        # The archive is only appended to, so track its size for offsets
+        self.archive_path = self.save_loc / self.archive_filename
+        self.index_path = self.save_loc / self.index_filename
+        self.archive_size = 0
+
+        # cv2.imencode releases the GIL, so the images can be encoded 
+        # by a pool of threads
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=num_of_workers)
+
+    def encode_image(self, frame:np.ndarray) -> np.ndarray:
+        """Encode a single image.
+
+        Args:
+            frame (np.ndarray): The image to encode.
+
+        Returns:
+            np.ndarray: The buffer of the encoded image.
+
+        """
+        success, buffer = cv2.imencode(self.image_format, frame, self.encode_params)
+        assert success, f"Failed to encode an image of {self.name}"
+        return buffer
+
+    def save_image(self, idx:int, frame:np.ndarray):
+        """Encode and write a single image.
+
+        Args:
+            idx (int): The index of the image, used as its filename.
+            frame (np.ndarray): The image to save.
+
+        """
+        self.encode_image(frame).tofile(str(self.save_loc / f"{idx}{self.image_format}"))
+
+    def append_to_archive(self, buffers:List[np.ndarray]):
+        """Append encoded images to the archive and its index.
+
+        Args:
+            buffers (List[np.ndarray]): The encoded images, in order.
+
+        """
+        # Compute where each image starts in the archive
+        sizes = np.array([buffer.nbytes for buffer in buffers], dtype='<i8')
+        offsets = self.archive_size + np.cumsum(sizes) - sizes
+
+        # Write the images first, so that the index never points to 
+        # missing data
+        with open(self.archive_path, 'ab') as f:
+            for buffer in buffers:
+                f.write(buffer.data)
+        with open(self.index_path, 'ab') as f:
+            f.write(np.stack([offsets, sizes], axis=1).tobytes())
+
+        self.archive_size += int(sizes.sum())
+
     def flush(self):
         """Flush out unsaved changes to memory.
 
         For ``ImageEntry``, a folder is created, the images are stored
         inside, and finally a csv file is saved with the timestamps 
-        pertaining to each image.
+        pertaining to each image. The images are encoded in parallel and
+        the timestamps of a flush are appended in one write.
 
         """
         # Depending on different type of inputs, we should save data differently
         # For images, we just need to save each image logged
+        # If no new changes, end
+        if len(self.unsaved_changes) == 0:
+            return None
+
         # Save the unsaved changes
-        for i, row in self.unsaved_changes.iterrows():
-            # Storing the image
-            filepath = self.save_loc / f"{self.num_of_total_changes+i}.jpg"
-            cv2.imwrite(str(filepath), row.frames)
-            # Storing timestamp data for all images
-            meta_df = pd.DataFrame(
-                {'_time_': [row._time_], 'idx': [self.num_of_total_changes+i]}
-            )
-            if self.num_of_total_changes == 0 and i == 0:
-                meta_df.to_csv(self.save_loc / "timestamps.csv", mode='a', index=False, header=True)
-            else: 
-                meta_df.to_csv(self.save_loc / "timestamps.csv", mode='a', index=False, header=False)
-
-        # Update the counter and clear out the unsaved items
-        self.num_of_total_changes += len(self.unsaved_changes)
-        self.unsaved_changes = self.unsaved_changes.iloc[0:0]
-
-        # Collect the garbage
-        del self.unsaved_changes
-        self.unsaved_changes = pd.DataFrame(columns=['_time_', 'data'])
-        gc.collect()
+        unsaved_changes = self.pop_unsaved_changes()
+        indices = np.arange(
+            self.num_of_total_changes, 
+            self.num_of_total_changes + len(unsaved_changes)
+        )
+
+        # Storing the images, and waiting for all of them to be written
+        if self.storage == 'files':
+            futures = [
+                self.executor.submit(self.save_image, idx, frame)
+                for idx, frame in zip(indices, unsaved_changes['frames'])
+            ]
+            for future in futures:
+                future.result()
+        else:
+            buffers = list(self.executor.map(self.encode_image, unsaved_changes['frames']))
+            self.append_to_archive(buffers)
+
+        # Storing timestamp data for all images
+        meta_df = pd.DataFrame({'_time_': unsaved_changes['_time_'].values, 'idx': indices})
+        meta_df.to_csv(
+            self.save_loc / "timestamps.csv", 
+            mode='a', 
+            index=False, 
+            header=self.num_of_total_changes == 0
+        )
+
+        # Update the counter
+        self.num_of_total_changes += len(unsaved_changes)
 
     def close(self):
 
         # Apply the last changes and that's it!
         self.flush()
+
+        # Stop the encoding threads
+        self.executor.shutdown(wait=True)
+
+    @staticmethod
+    def read_archive_index(save_loc:pathlib.Path) -> np.ndarray:
+        """Memory-map the index of an ``'archive'`` image entry.
+
+        Args:
+            save_loc (pathlib.Path): The directory of the image entry.
+
+        Returns:
+            np.ndarray: The (offset, size) of each image, in the order \
+            of the ``idx`` column of the timestamps.
+
+        """
+        index_path = save_loc / ImageEntry.index_filename
+        if not index_path.exists() or index_path.stat().st_size == 0:
+            return np.empty((0, 2), dtype='<i8')
+        return np.memmap(index_path, dtype='<i8', mode='r').reshape(-1, 2)
+
+    @staticmethod
+    def read_archive_image(archive_path:pathlib.Path, offset:int, size:int) -> bytes:
+        """Read an encoded image from an archive.
+
+        Args:
+            archive_path (pathlib.Path): The filepath of the archive.
+            offset (int): The start of the image in the archive.
+            size (int): The number of bytes of the encoded image.
+
+        Returns:
+            bytes: The encoded image, to be decoded with ``cv2.imdecode``.
+
+        """
+        with open(archive_path, 'rb') as f:
+            f.seek(offset)
+            return f.read(size)
+
+    @staticmethod
+    def decode_image(buffer:Union[bytes, np.ndarray], scale:int=1) -> Optional[np.ndarray]:
+        """Decode an encoded image into an RGB image.
+
+        ``cv2.imdecode`` releases the GIL, so images can be decoded in 
+        parallel by a thread pool. JPEG images are directly decoded at a
+        reduced resolution when ``scale`` is larger than one.
+
+        Args:
+            buffer (Union[bytes, np.ndarray]): The encoded image.
+            scale (int): The reduction of the resolution, either 1, 2, \
+            4 or 8.
+
+        Returns:
+            Optional[np.ndarray]: The RGB image, or ``None`` if the \
+            buffer cannot be decoded.
+
+        """
+        assert scale in ImageEntry.decoding_flags, \
+            f"scale should be one of {list(ImageEntry.decoding_flags)}, not {scale}"
+
+        if isinstance(buffer, bytes):
+            buffer = np.frombuffer(buffer, dtype=np.uint8)
+        image = cv2.imdecode(buffer, ImageEntry.decoding_flags[scale])
+        if image is None:
+            return None
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
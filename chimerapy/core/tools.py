@@ -1,12 +1,13 @@
 # Built-in Imports
-from typing import List, Any
+from typing import List, Any, Optional
+import sys
 import math
 from multiprocessing.queues import Queue
 import multiprocessing as mp
+import multiprocessing.connection
 import threading
 import collections
 import queue
-import pickle
 
 # Third-Party Imports
 from PIL import Image
@@ -108,6 +109,29 @@ class PortableQueue(Queue):
         while not self.empty():
             self.get()
 
+def get_queue_reader(data_queue:Any) -> Optional[mp.connection.Connection]:
+    """Get the connection that becomes readable when a queue has data.
+
+    Only ``multiprocessing`` queues (including ``PortableQueue``) are 
+    backed by a pipe, whose reading end can be waited on with 
+    ``multiprocessing.connection.wait``. Other queues, like 
+    ``queue.Queue`` or the proxies of a ``multiprocessing.Manager``, 
+    have to be polled instead.
+
+    Args:
+        data_queue (Any): The queue.
+
+    Returns:
+        Optional[mp.connection.Connection]: The reading end of the \
+        queue's pipe, or ``None`` if the queue has none.
+
+    """
+    if isinstance(data_queue, Queue):
+        reader = getattr(data_queue, '_reader', None)
+        if isinstance(reader, mp.connection.Connection):
+            return reader
+    return None
+
 def threaded(fn):
     """Decorator for class methods to be spawn new thread.
     
@@ -213,17 +237,13 @@ def to_numpy(im:Image) -> np.ndarray:
     return data
 
 def get_memory_data_size(data:Any) -> int:
-    """Calculate the memory usage of a Python object.
-
-    This was a solution to a memory leak issue. Here is the SO link:
-    https://stackoverflow.com/q/71447286/13231446
+    """Estimate the memory usage of a Python object.
 
-    The main issue is that multiprocessing.Queue pickles an input and 
-    unpickles when using ``get``. Numpy arrays do not handle this well,
-    for their memory meta data is corrupted when this happends. This 
-    caused memory to not be accurately computed. The solution was to 
-    repickle the data and measure the len of the pickle string. This is
-    a temporary solution, as I would like NumPy to solve this issue.
+    ``sys.getsizeof`` does not account for the buffers of NumPy arrays 
+    that do not own their data (like video frames sliced from a batch).
+    Instead of pickling the data to measure it, which serializes every
+    data chunk a second time, the containers are walked and the buffers 
+    are measured with ``ndarray.nbytes`` and ``DataFrame.memory_usage``.
 
     Args:
         data (Any): The python object in question.
@@ -231,7 +251,34 @@ def get_memory_data_size(data:Any) -> int:
     Returns:
         int: Size of the Python object in bytes.
     """
-    return len(pickle.dumps(data))
+    if isinstance(data, np.ndarray):
+        if data.dtype == object:
+            return data.nbytes + sum(get_memory_data_size(x) for x in data.flat)
+        return data.nbytes
+
+    elif isinstance(data, pd.DataFrame):
+        # Non-object columns are accurate without a deep inspection
+        size = int(data.memory_usage(index=True, deep=False).sum())
+        for column_name in data.columns[data.dtypes == object]:
+            size += sum(get_memory_data_size(x) for x in data[column_name].values)
+        return size
+
+    elif isinstance(data, pd.Series):
+        size = int(data.memory_usage(index=True, deep=False))
+        if data.dtype == object:
+            size += sum(get_memory_data_size(x) for x in data.values)
+        return size
+
+    elif isinstance(data, dict):
+        return sys.getsizeof(data) + sum(
+            get_memory_data_size(k) + get_memory_data_size(v) for k, v in data.items()
+        )
+
+    elif isinstance(data, (list, tuple, set)):
+        return sys.getsizeof(data) + sum(get_memory_data_size(x) for x in data)
+
+    else:
+        return sys.getsizeof(data)
 
 def get_threads_cpu_percent(p:psutil.Process, interval:float=0.1) -> List:
     # Got this from:
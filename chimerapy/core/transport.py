@@ -0,0 +1,257 @@
+# Package Management
+__package__ = 'chimerapy'
+
+# Built-in Imports
+from typing import Any, Dict, List, Tuple, Optional
+from multiprocessing import shared_memory
+import collections
+import queue
+
+# Third-party Imports
+import numpy as np
+import pandas as pd
+
+# Internal Imports
+from chimerapy.core.tools import PortableQueue
+
+# Descriptors that travel through the queues instead of the buffers
+SharedArray = collections.namedtuple("SharedArray", ['dtype', 'shape', 'offset'])
+SharedFrames = collections.namedtuple("SharedFrames", ['dtype', 'shape', 'offset'])
+SharedDataFrame = collections.namedtuple("SharedDataFrame", ['index', 'columns'])
+SharedMemoryChunk = collections.namedtuple("SharedMemoryChunk", ['segment', 'nbytes', 'content'])
+
+# Buffers are aligned to help vectorized copies
+ALIGNMENT = 64
+
+class SharedMemoryRing:
+    """Ring of shared memory segments to transport loaded data.
+
+    Instead of pickling the data frames (and their video frames) through
+    a ``multiprocessing.Queue``, the large column buffers are written
+    once into a free shared memory segment. Only a small
+    ``SharedMemoryChunk`` descriptor is then ``put`` in the queue. The
+    receiving process rebuilds the data frames from the segment and
+    releases it back to the ring.
+
+    The ring is created by the main process, before starting the
+    subprocesses, and it is passed to them like the queues.
+
+    Attributes:
+        segment_size (int): The size (in bytes) of each segment.
+        segments (List[shared_memory.SharedMemory]): The segments.
+        free_segments (PortableQueue): The indices of the free segments.
+
+    """
+
+    def __init__(self, num_of_segments:int, segment_size:int):
+        """Construct the ``SharedMemoryRing``.
+
+        Args:
+            num_of_segments (int): The number of segments, which limits \
+                the number of data chunks in transit.
+            segment_size (int): The size (in bytes) of each segment. Data \
+                chunks larger than a segment are not packed.
+
+        """
+        self.segment_size = segment_size
+        self.segments: List[shared_memory.SharedMemory] = [
+            shared_memory.SharedMemory(create=True, size=segment_size)
+            for i in range(num_of_segments)
+        ]
+
+        # All the segments are free at the start
+        self.free_segments = PortableQueue(maxsize=num_of_segments)
+        for i in range(num_of_segments):
+            self.free_segments.put(i)
+
+    def __len__(self):
+        """Get the number of segments."""
+        return len(self.segments)
+
+    def plan(self, obj:Any, buffers:List[Tuple[int, Any]], offset:int) -> Tuple[Any, int]:
+        """Replace the large buffers of an object by their descriptors.
+
+        Args:
+            obj (Any): The object, a (nested) dictionary of data frames.
+            buffers (List[Tuple[int, Any]]): The buffers to write and \
+                their offsets, which is extended by this method.
+            offset (int): The offset of the next buffer in the segment.
+
+        Returns:
+            Tuple[Any, int]: The descriptor and the next offset.
+
+        """
+        if isinstance(obj, dict):
+            content = {}
+            for key, value in obj.items():
+                content[key], offset = self.plan(value, buffers, offset)
+            return content, offset
+
+        elif isinstance(obj, pd.DataFrame):
+            columns = []
+            for column_name in obj.columns:
+                column = obj[column_name]
+
+                # Numeric columns (including timedeltas) are written as is
+                if isinstance(column.dtype, np.dtype) and column.dtype.kind in 'biufcmM':
+                    values = column.values
+                    descriptor = SharedArray(values.dtype.str, values.shape, offset)
+
+                # Columns of equally shaped arrays (like video frames) are
+                # written as a single block
+                elif is_frames_column(column):
+                    first_frame = column.iloc[0]
+                    values = column.values
+                    descriptor = SharedFrames(first_frame.dtype.str, (len(column), *first_frame.shape), offset)
+
+                # Anything else is small and pickled with the descriptor
+                else:
+                    columns.append((column_name, column.values))
+                    continue
+
+                columns.append((column_name, descriptor))
+                buffers.append((descriptor, values))
+                nbytes = int(np.prod(descriptor.shape)) * np.dtype(descriptor.dtype).itemsize
+                offset += -(-nbytes // ALIGNMENT) * ALIGNMENT
+
+            return SharedDataFrame(obj.index, columns), offset
+
+        else:
+            return obj, offset
+
+    def pack(self, data:Dict[str, Any], timeout:Optional[float]=0.1) -> Any:
+        """Write the data into a free segment and get its descriptor.
+
+        Args:
+            data (Dict[str, Any]): The (nested) dictionary of data frames.
+            timeout (Optional[float]): How long to wait for a free segment.
+
+        Returns:
+            Any: The ``SharedMemoryChunk`` descriptor, or the original
+            data if it does not fit in a segment or no segment is free.
+
+        """
+        # Determine the layout before acquiring a segment
+        buffers = []
+        content, nbytes = self.plan(data, buffers, 0)
+        if nbytes > self.segment_size or not buffers:
+            return data
+
+        # Acquire a free segment
+        try:
+            segment = self.free_segments.get(timeout=timeout)
+        except queue.Empty:
+            return data
+
+        # Write the buffers
+        buf = self.segments[segment].buf
+        for descriptor, values in buffers:
+            target = np.ndarray(descriptor.shape, dtype=descriptor.dtype, buffer=buf, offset=descriptor.offset)
+            if isinstance(descriptor, SharedFrames):
+                for i, frame in enumerate(values):
+                    target[i] = frame
+            else:
+                target[...] = values
+            del target
+
+        return SharedMemoryChunk(segment, nbytes, content)
+
+    def unpack(self, chunk:Any, copy:bool=True) -> Any:
+        """Rebuild the data from a descriptor.
+
+        Args:
+            chunk (Any): The ``SharedMemoryChunk`` descriptor. Any other \
+                object is returned as is.
+            copy (bool): If the arrays are copied out of the segment, \
+                which is then released. Without copying, the arrays are \
+                views of the segment and ``release`` needs to be called \
+                once they are no longer used.
+
+        Returns:
+            Any: The (nested) dictionary of data frames.
+
+        """
+        if not isinstance(chunk, SharedMemoryChunk):
+            return chunk
+
+        # Rebuild the content and release the segment if its copied
+        data = self.rebuild(chunk.content, self.segments[chunk.segment].buf, copy)
+        if copy:
+            self.release(chunk)
+
+        return data
+
+    def rebuild(self, content:Any, buf:memoryview, copy:bool) -> Any:
+        """Rebuild the object from its descriptor and the segment.
+
+        Args:
+            content (Any): The descriptor.
+            buf (memoryview): The segment's buffer.
+            copy (bool): If the arrays are copied out of the segment.
+
+        Returns:
+            Any: The rebuilt object.
+
+        """
+        if isinstance(content, dict):
+            return {key: self.rebuild(value, buf, copy) for key, value in content.items()}
+
+        elif isinstance(content, SharedDataFrame):
+            columns = {}
+            for column_name, value in content.columns:
+                if isinstance(value, (SharedArray, SharedFrames)):
+                    array = np.ndarray(value.shape, dtype=value.dtype, buffer=buf, offset=value.offset)
+                    if copy:
+                        array = array.copy()
+                    if isinstance(value, SharedFrames):
+                        array = list(array)
+                    columns[column_name] = array
+                else:
+                    columns[column_name] = value
+            return pd.DataFrame(columns, index=content.index)
+
+        else:
+            return content
+
+    def release(self, chunk:SharedMemoryChunk):
+        """Release the segment of the data chunk back to the ring.
+
+        Args:
+            chunk (SharedMemoryChunk): The descriptor of the data chunk.
+
+        """
+        self.free_segments.put(chunk.segment)
+
+    def close(self, unlink:bool=False):
+        """Close the access to the segments.
+
+        Args:
+            unlink (bool): If the segments should be destroyed, which \
+                should only be done by the process that created the ring.
+
+        """
+        for segment in self.segments:
+            segment.close()
+            if unlink:
+                segment.unlink()
+
+def is_frames_column(column:pd.Series) -> bool:
+    """Determine if the column only has arrays with the same shape.
+
+    Args:
+        column (pd.Series): The data frame's column.
+
+    Returns:
+        bool: If the column can be written as a single block.
+
+    """
+    if len(column) == 0 or not isinstance(column.iloc[0], np.ndarray):
+        return False
+
+    first_frame = column.iloc[0]
+    return all(
+        isinstance(frame, np.ndarray) and \
+        frame.shape == first_frame.shape and \
+        frame.dtype == first_frame.dtype
+        for frame in column.values
+    )
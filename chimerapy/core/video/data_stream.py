@@ -3,8 +3,9 @@ __package__ = 'video'
 
 # Built-in Imports
 from typing import Union, Tuple, Optional
-import multiprocessing as mp
+import threading
 import pathlib
+import queue
 import gc
 
 # Third-party Imports
@@ -15,6 +16,7 @@ import numpy as np
 
 # Internal imports
 from chimerapy.core.data_stream import DataStream
+from chimerapy.core.tools import threaded
 
 class VideoDataStream(DataStream):
     """Implementation of DataStream focused on Video data.
@@ -35,7 +37,10 @@ class VideoDataStream(DataStream):
             fps:Optional[Union[float,int]]=None,
             size:Optional[Tuple[int, int]]=None,
             color_mode:str="BGR",
-            startup_now:bool=False
+            startup_now:bool=False,
+            seek_threshold:int=30,
+            prefetch_size:int=0,
+            timestamps_path:Optional[Union[pathlib.Path, str]]=None
         ) -> None:
         """Construct new ``VideoDataStream`` instance.
 
@@ -45,6 +50,16 @@ class VideoDataStream(DataStream):
                 the video file.
             start_time (pd.Timedelta): The timestamp used to dictate the \
                 beginning of the video.
+            seek_threshold (int): Forward jumps of up to this many frames \
+                are skipped by grabbing frames instead of seeking, as \
+                seeking decodes from the previous keyframe.
+            prefetch_size (int): If greater than zero, a background thread \
+                decodes up to this many upcoming frames ahead of ``get``.
+            timestamps_path (Optional[Union[pathlib.Path, str]]): The path \
+                to the binary sidecar with the recorded timestamp of each \
+                frame (little-endian int64 nanoseconds), as written by \
+                ``VideoEntry``. If provided, the timetrack uses these \
+                timestamps instead of assuming a constant ``fps``.
 
         """
         # Save parameters that don't matter what type of mode ("reading" vs "writing")
@@ -54,12 +69,15 @@ class VideoDataStream(DataStream):
         self.fps = fps
         self.size = size
         self.color_mode = color_mode
+        self.seek_threshold = seek_threshold
+        self.prefetch_size = prefetch_size
+        self.timestamps_path = timestamps_path
         self.has_startup = False
-        self.compression_queue = mp.Queue(maxsize=5)
         
         # Setting the index is necessary for video, even before __iter__
         self.index = 0
         self.data_index = 0
+        self.num_of_seeks = 0
 
         # First determine if this video is a path or an empty stream
         if self.video_path:
@@ -132,6 +150,11 @@ class VideoDataStream(DataStream):
             # the ``run`` method of the process.
             self.video = cv2.VideoCapture(str(self.video_path))
             self.nb_frames = int(self.video.get(cv2.CAP_PROP_FRAME_COUNT))
+            self.frame_shape = (
+                int(self.video.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                int(self.video.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                3
+            )
 
             # Only update fps if there was no previous fps set
             if type(self.fps) == type(None):
@@ -142,6 +165,10 @@ class VideoDataStream(DataStream):
             # data stream's timetrack
             self.update_timetrack()
 
+            # Start decoding ahead if requested
+            if self.prefetch_size > 0:
+                self.start_prefetching()
+
         # Else, its for the writing mode
         else:
 
@@ -168,19 +195,43 @@ class VideoDataStream(DataStream):
         self.fps = fps
 
     def update_timetrack(self):
+
+        # If the timestamps of the frames were recorded, use them, 
+        # relative to the start time
+        if self.timestamps_path:
+            timestamps = self.read_timestamps(self.timestamps_path)[:self.nb_frames]
+            self.nb_frames = len(timestamps)
+            if self.nb_frames > 0:
+                timestamps = timestamps - timestamps[0]
+            self.timeline = pd.TimedeltaIndex(timestamps, unit='ns') + self.start_time
             
-        # Creating new timeline
-        self.timeline = pd.TimedeltaIndex(
-            pd.timedelta_range(
-                start=self.start_time, 
-                periods=self.nb_frames, 
-                freq=f"{int(1e9/self.fps)}N"
+        # Else, creating new timeline with a constant fps
+        else:
+            self.timeline = pd.TimedeltaIndex(
+                pd.timedelta_range(
+                    start=self.start_time, 
+                    periods=self.nb_frames, 
+                    freq=f"{int(1e9/self.fps)}N"
+                )
             )
-        )
 
         # Converting timeline to timetrack
         super().make_timetrack(self.timeline)
 
+    @staticmethod
+    def read_timestamps(timestamps_path:Union[pathlib.Path, str]) -> np.ndarray:
+        """Read the binary sidecar of the frames' timestamps.
+
+        Args:
+            timestamps_path (Union[pathlib.Path, str]): The path to the \
+                sidecar.
+
+        Returns:
+            np.ndarray: The timestamps in nanoseconds, as int64.
+
+        """
+        return np.fromfile(timestamps_path, dtype='<i8').astype(np.int64)
+
     def open_writer(
         self, 
         video_path:Union[pathlib.Path, str],
@@ -249,77 +300,261 @@ class VideoDataStream(DataStream):
             pd.DataFrame: video data from time window.
 
         """
-        assert end_time > start_time, "``end_time`` should be greater than ``start_time``."
-        assert self.mode == "reading", "``get`` currently works in ``reading`` mode."
-        assert self.has_startup == True, f"{self.__class__.__name__} cannot execute ``get`` before calling ``startup``."
-        
-        # Generate mask for the window data
-        after_start_time = self.timetrack['time'] >= start_time
-        before_end_time = self.timetrack['time'] < end_time
-        time_window_mask = after_start_time & before_end_time
-
-        # Obtain the data indicies
-        data_idx = self.timetrack[time_window_mask]
+        # Get the frames as a single batch
+        times, frames = self.get_batch(start_time, end_time)
 
-        # Check if the data_idx is empty, if so return an empty data frame
-        if len(data_idx) == 0:
+        # Check if the batch is empty, if so return an empty data frame
+        if len(times) == 0:
             return pd.DataFrame({
                 '_time_':pd.TimedeltaIndex([]), 
                 'frames':[]}
             )
-       
-        # Getting the start and end indx to get the frames
-        start_data_index = min(data_idx.ds_index)
-        end_data_index = max(data_idx.ds_index)
-        list_of_frames = list(range(start_data_index, end_data_index+1))
+
+        # Construct data frame, where each frame is a view of the batch
+        df = pd.DataFrame({'_time_': times, 'frames': list(frames)})
+
+        return df
+
+    def get_batch(
+            self, 
+            start_time: pd.Timedelta, 
+            end_time: pd.Timedelta
+        ) -> Tuple[pd.TimedeltaIndex, np.ndarray]:
+        """Get video frames from ``start_time`` to ``end_time`` as one array.
+
+        The frames are decoded directly into the slots of a preallocated
+        ``(n, h, w, c)`` uint8 array, without intermediate lists of 
+        frames or copies for changing the color channels.
+
+        Args:
+            start_time (pd.Timedelta): Start of the time window.
+            end_time (pd.Timedelta): End of the time window.
+
+        Returns:
+            Tuple[pd.TimedeltaIndex, np.ndarray]: The timestamps and the \
+                frames from the time window.
+
+        """
+        assert end_time > start_time, "``end_time`` should be greater than ``start_time``."
+        assert self.mode == "reading", "``get`` currently works in ``reading`` mode."
+        assert self.has_startup == True, f"{self.__class__.__name__} cannot execute ``get`` before calling ``startup``."
+        
+        # Locate the window within the sorted timetrack
+        start, end = self.get_window_indices(start_time, end_time)
+        times = pd.TimedeltaIndex(self.timetrack['time'].values[start:end])
+        
+        # Check if the window is empty, if so return an empty batch
+        if start == end:
+            return times, np.empty((0, *self.frame_shape), dtype=np.uint8)
 
         # Ensure that the video is in the right location
+        start_data_index = int(self.timetrack_index[start])
         self.set_index(start_data_index)
 
-        # Get all the samples
-        times = data_idx['time'].tolist()
-        # stacked_frames = self.video.get_batch(list_of_frames).asnumpy() # decord does not play nice with PyQt5
-        frames = []
-        for i in range(start_data_index, end_data_index+1):
-            res, frame = self.video.read()
-            frames.append(frame)
+        # Fill the batch with the frames
+        frames = np.empty((end-start, *self.frame_shape), dtype=np.uint8)
+        if self.prefetch_size > 0:
+            nb_read = self.read_prefetched_frames(frames)
+        else:
+            nb_read = self.read_frames(frames)
 
-        # Convert the data depending on the RGB type
-        if self.color_mode == "RGB":
+        return times[:nb_read], frames[:nb_read]
 
-            # Stack to easily change color channels
-            stacked_frames = np.stack(frames)
-            stacked_frames[...,[0,1,2]] = stacked_frames[...,[2,1,0]]
+    def read_frames(self, frames:np.ndarray) -> int:
+        """Decode the next frames of the video into the given batch.
 
-            # Split the stacked frames to a list of frames
-            extract_dim_frames = np.split(stacked_frames, len(list_of_frames), axis=0)
-            frames = [np.squeeze(x, axis=0) for x in extract_dim_frames]
+        Args:
+            frames (np.ndarray): The ``(n, h, w, c)`` batch to fill.
 
-        elif self.color_mode == "BGR":
-            pass
+        Returns:
+            int: The number of decoded frames, which is smaller than the \
+                batch if the video ended.
 
-        # Update the data index record
-        # very important to update - as this keeps track of the video's 
-        # location
-        self.data_index = end_data_index + 1
+        """
+        nb_read = 0
+        for frame in frames:
+            res, _ = self.video.read(image=frame)
+            self.data_index += 1
+            
+            # Stop if the video has no more frames
+            if not res:
+                break
+            
+            # Convert the data depending on the RGB type
+            if self.color_mode == "RGB":
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
 
-        # Construct data frame
-        df = pd.DataFrame({'_time_': times, 'frames': frames})
+            nb_read += 1
 
-        return df
+        return nb_read
+
+    def start_prefetching(self):
+        """Start the thread that decodes frames ahead of ``get``.
+
+        The decoding thread owns the OpenCV video and places the frames
+        in a bounded queue of ``prefetch_size`` frames. When the data 
+        index jumps, the thread is requested to seek and the frames 
+        decoded before the jump are discarded by their generation.
+
+        """
+        # Queue and synchronization between ``get`` and the decoding thread
+        self.prefetch_queue = queue.Queue(maxsize=self.prefetch_size)
+        self.prefetch_lock = threading.Lock()
+        self.prefetch_wakeup = threading.Event()
+        self.prefetch_exit = threading.Event()
+        self.prefetch_generation = 0
+        self.prefetch_seek = self.data_index
+        self.prefetch_end_index = None
+
+        # Start the decoding thread
+        self.prefetch_thread = self.decode_ahead()
+        self.prefetch_thread.daemon = True
+        self.prefetch_thread.start()
+
+    def stop_prefetching(self):
+        """Stop the decoding thread."""
+        self.prefetch_exit.set()
+        self.prefetch_wakeup.set()
+        self.prefetch_thread.join()
+
+    @threaded
+    def decode_ahead(self):
+        """Threaded function that continuously decodes upcoming frames."""
+        decode_index = 0
+        video_ended = False
+        
+        while not self.prefetch_exit.is_set():
+
+            # Apply any requested jumps
+            with self.prefetch_lock:
+                generation = self.prefetch_generation
+                if type(self.prefetch_seek) != type(None):
+                    self.move_video(decode_index, self.prefetch_seek)
+                    decode_index = self.prefetch_seek
+                    self.prefetch_seek = None
+                    video_ended = False
+
+            # If the video ended, wait until a new jump is requested
+            if video_ended:
+                self.prefetch_wakeup.wait(timeout=0.1)
+                self.prefetch_wakeup.clear()
+                continue
+            
+            # Decode the next frame
+            frame = np.empty(self.frame_shape, dtype=np.uint8)
+            res, _ = self.video.read(image=frame)
+            if res and self.color_mode == "RGB":
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+            elif not res:
+                frame = None
+                video_ended = True
+
+            # Place the frame (or the end marker) in the queue, unless 
+            # a jump made it irrelevant
+            while not self.prefetch_exit.is_set() and generation == self.prefetch_generation:
+                try:
+                    self.prefetch_queue.put((generation, decode_index, frame), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+            decode_index += 1
+
+    def read_prefetched_frames(self, frames:np.ndarray) -> int:
+        """Copy the next decoded frames from the prefetching queue.
+
+        Args:
+            frames (np.ndarray): The ``(n, h, w, c)`` batch to fill.
+
+        Returns:
+            int: The number of frames copied, which is smaller than the \
+                batch if the video ended.
+
+        """
+        # If the video already ended at this location, nothing to read
+        if type(self.prefetch_end_index) != type(None) and \
+            self.data_index >= self.prefetch_end_index:
+            return 0
+
+        nb_read = 0
+        while nb_read < len(frames):
+            
+            # Wait for the next frame, as long as the thread is decoding
+            try:
+                generation, data_index, frame = self.prefetch_queue.get(timeout=1)
+            except queue.Empty:
+                if not self.prefetch_thread.is_alive():
+                    break
+                continue
+
+            # Discard frames decoded before the latest jump
+            if generation != self.prefetch_generation:
+                continue
+
+            # Stop if the video has no more frames
+            if type(frame) == type(None):
+                self.prefetch_end_index = data_index
+                break
+
+            frames[nb_read] = frame
+            self.data_index = data_index + 1
+            nb_read += 1
+
+        return nb_read
 
     def set_index(self, new_data_index):
-        """Set the video's index by updating the pointer in OpenCV."""
-        # If the data index does not match the requested index,
-        # it means that some jump or cut has happend.
-        # We need to clear our the reading queue and set the video.
-        if self.data_index != new_data_index:
-            # print(f"Video miss - reassigning index: {self.data_index}-{new_data_index}")
-            if self.mode == "reading":
-
-                # Set the new location for the video
-                self.video.set(cv2.CAP_PROP_POS_FRAMES, new_data_index-1)
-                self.data_index = new_data_index
+        """Set the video's index, only seeking OpenCV's pointer on jumps.
+
+        The ``Loader`` walks the windows in increasing order, so most 
+        requests continue exactly where the previous ``read`` ended and
+        the video keeps streaming forward. Short forward jumps are 
+        skipped with ``grab``, while backward or long jumps (such as a
+        restart in the dashboard) seek with ``CAP_PROP_POS_FRAMES``.
+
+        """
+        # If the data index matches the requested index, the access is 
+        # contiguous and the video is already in the right location.
+        if self.data_index == new_data_index:
+            return None
+
+        # Else, some jump or cut has happend.
+        if self.mode == "reading":
+
+            # The decoding thread owns the video, request the jump
+            if self.prefetch_size > 0:
+                with self.prefetch_lock:
+                    self.prefetch_generation += 1
+                    self.prefetch_seek = new_data_index
+                    self.prefetch_end_index = None
+                self.prefetch_wakeup.set()
+
+            # Else, move the video ourselves
+            else:
+                self.move_video(self.data_index, new_data_index)
+
+            self.data_index = new_data_index
+
+    def move_video(self, current_data_index:int, new_data_index:int):
+        """Move OpenCV's pointer from the current to the new data index.
+
+        Short forward jumps are skipped with ``grab``, while backward or
+        long jumps seek with ``CAP_PROP_POS_FRAMES``.
+
+        Args:
+            current_data_index (int): The index of the next frame to read.
+            new_data_index (int): The requested index of the next frame.
+
+        """
+        # Skip short forward jumps without seeking
+        skip = new_data_index - current_data_index
+        if 0 <= skip <= self.seek_threshold:
+            for i in range(skip):
+                self.video.grab()
+
+        # Set the new location for the video
+        else:
+            self.video.set(cv2.CAP_PROP_POS_FRAMES, new_data_index)
+            self.num_of_seeks += 1
 
     def append(
             self, 
@@ -338,30 +573,31 @@ class VideoDataStream(DataStream):
         # This operation can only be done in the writing mode
         assert self.mode == "writing"
 
-        # Create data frame for the timeline
+        # Create data frame for the timeline, pointing after the written frames
         append_timetrack = pd.DataFrame(
             {
-                'time': time_column_data, 
-                'ds_index': 
-                    [x for x in range(len(time_column_data))]
+                'time': time_column_data.values, 
+                'ds_index': np.arange(len(time_column_data)) + self.nb_frames
             }
         )
 
         # Add to the timetrack (cannot be inplace)
-        self.timetrack = pd.concat([self.timetrack, append_timetrack])
-        self.timetrack['ds_index'] = self.timetrack['ds_index'].astype(int)
-
-        # Appending the file to the video writer
-        for index, row in append_data.iterrows():
-            frame = getattr(row, data_column)
-            self.video.write(np.uint8(frame).copy())
+        self.set_timetrack(pd.concat([self.timetrack, append_timetrack]))
+
+        # Appending the file to the video writer, only converting the 
+        # frames that are not already contiguous uint8 arrays
+        for frame in append_data[data_column].values:
+            if frame.dtype != np.uint8 or not frame.flags['C_CONTIGUOUS']:
+                frame = np.ascontiguousarray(frame, dtype=np.uint8)
+            self.video.write(frame)
             self.nb_frames += 1
 
     def close(self):
         """Close the ``VideoDataStream`` instance."""
         # Closing the video capture device
         if self.mode == "reading": # Decord
-            pass
+            if self.prefetch_size > 0 and self.has_startup:
+                self.stop_prefetching()
         elif self.mode == "writing": # OpenCV
             self.video.release()
         else:
@@ -2,30 +2,47 @@
 __package__ = 'tabular'
 
 # Built-in Imports
+from typing import Optional
 import pathlib
-import gc
+import queue
+import time
 import os
 
 # Third-party Imports
 import pandas as pd
+import numpy as np
 
 # Internal Imports
 from chimerapy.core.entry import Entry
 from chimerapy.core.video.data_stream import VideoDataStream
+from chimerapy.core.tools import threaded
 
 class VideoEntry(Entry):
-    
+
+    # Frames are large, so flush them in smaller batches
+    max_unsaved_rows:int = 30
+
     def __init__(
         self, 
         dir:pathlib.Path,
         name:str,
+        max_queued_batches:int=4
         ):
         """
 
+        The frames are written to the video by a dedicated encoding 
+        thread, fed through a bounded queue of batches. If the encoder 
+        falls behind, ``flush`` blocks until there is room in the queue.
+        The timestamp of each frame is appended to a binary sidecar 
+        (little-endian int64 nanoseconds), as the video's fps cannot 
+        capture a variable frame rate.
+
         Args:
             dir (pathlib.Path): The directory/filepath to store the \
             generated data file.
             name (str): The name of ``Entry``.
+            max_queued_batches (int): The max number of flushed batches \
+            waiting to be encoded.
 
         """
         # Saving the Entry attributes
@@ -37,63 +54,140 @@ class VideoEntry(Entry):
             os.mkdir(self.dir)
 
         # Setting initial values
-        self.unsaved_changes = pd.DataFrame(columns=['_time_', 'data'])
+        self.reset_unsaved_changes()
         self.num_of_total_changes = 0
         
         self.save_loc = self.dir / f"{self.name}.avi"
+        self.timestamps_loc = self.dir / f"{self.name}_timestamps.bin"
         self.stream = VideoDataStream.empty(name=name, startup_now=True)
+
+        # Encoding statistics
+        self.num_of_encoded_frames = 0
+        self.encoding_time = 0.0
+        self.encoding_error:Optional[Exception] = None
+
+        # Start the encoding thread
+        self.encoding_queue = queue.Queue(maxsize=max_queued_batches)
+        self.encoding_thread = self.encode_frames()
+        self.encoding_thread.start()
+
+    @property
+    def encode_fps(self) -> float:
+        """The number of frames encoded per second spent encoding."""
+        if self.encoding_time == 0:
+            return 0.0
+        return self.num_of_encoded_frames / self.encoding_time
+
+    @threaded
+    def encode_frames(self):
+        """Threaded function that writes the flushed batches to the video."""
+
+        # Continue encoding until the ``None`` sentinel is received
+        while True:
+            
+            batch = self.encoding_queue.get()
+            if batch is None:
+                break
+
+            # Keep consuming the batches after an error, so that 
+            # ``flush`` never blocks, and report it from ``flush``
+            if self.encoding_error:
+                continue
+
+            try:
+                tic = time.perf_counter()
+                self.stream.append(batch)
+                self.encoding_time += time.perf_counter() - tic
+
+                # Record the timestamps of the written frames
+                with open(self.timestamps_loc, 'ab') as f:
+                    f.write(pd.to_timedelta(batch['_time_']).values.astype('<i8').tobytes())
+
+                self.num_of_encoded_frames += len(batch)
+            except Exception as e:
+                self.encoding_error = e
     
+    @staticmethod
+    def estimate_fps(times:pd.Series) -> float:
+        """Estimate the fps from the timestamps of a window of frames.
+
+        The median of the periods between frames is used, which is not
+        affected by dropped or bursty frames.
+
+        Args:
+            times (pd.Series): The timestamps of the frames.
+
+        Returns:
+            float: The estimated fps.
+
+        Raises:
+            ValueError: If no two frames have increasing timestamps.
+
+        """
+        # Duplicate or out of order timestamps are not periods
+        periods = np.diff(pd.to_timedelta(times).values.astype(np.int64))
+        periods = periods[periods > 0]
+        if len(periods) == 0:
+            raise ValueError(f"Estimating the fps requires frames with increasing timestamps, got {len(times)} frames without.")
+        return 1e9 / float(np.median(periods))
+
     def flush(self):
         """Commit the unsaved changes to memory."""
 
+        # Report any failure of the encoding thread
+        if self.encoding_error:
+            raise self.encoding_error
+
         # If no new changes, end
-        if len(self.unsaved_changes.index) == 0:
+        if len(self.unsaved_changes) == 0:
+            return None
+
+        # Opening the video writer requires at least two samples
+        # If there not enough samples, wait until we do
+        if self.num_of_total_changes == 0 and self.num_of_unsaved_changes < 2:
             return None
 
+        # Concatenate the unsaved changes once
+        unsaved_changes = self.pop_unsaved_changes()
+
         # If this is the first time, set the video writer to match the 
         # input size
         if self.num_of_total_changes == 0:
-            
-            # This operation requires at least two samples
-            # If there not enough samples, wait until we do
-            if len(self.unsaved_changes['frames']) < 2:
-                return None
 
             # Determine the size
-            first_frame = self.unsaved_changes['frames'].iloc[0]
+            first_frame = unsaved_changes['frames'].iloc[0]
             w, h = first_frame.shape[0], first_frame.shape[1]
 
             # Determine if RGB or grey video
             is_grey = len(first_frame.shape) == 2
 
-            # Determine the fps
-            t1 = self.unsaved_changes['_time_'].iloc[0]
-            t2 = self.unsaved_changes['_time_'].iloc[1]
-            period = (t2.microseconds - t1.microseconds) / 1_000_000
-            average_fps = (1 / period) - 0.000300003000028 # This is necessary for some reason ?
-
             # Opening the frame writer with the new data
             self.stream.open_writer(
                 video_path=self.save_loc,
-                fps=average_fps,
+                fps=self.estimate_fps(unsaved_changes['_time_']),
                 size=(w,h),
                 grey=is_grey
             )
 
-        # Else, let's save the changes
-        self.stream.append(self.unsaved_changes)
+        # Else, let the encoding thread save the changes
+        self.encoding_queue.put(unsaved_changes)
         
-        # Update the counter and clear out the unsaved items
-        self.num_of_total_changes += len(self.unsaved_changes)
-        self.unsaved_changes = self.unsaved_changes.iloc[0:0]
-
-        # Ensure that the garbage is collected
-        self.unsaved_changes = pd.DataFrame(columns=['_time_', 'data'])
+        # Update the counter
+        self.num_of_total_changes += len(unsaved_changes)
 
     def close(self):
 
-        # Apply the last changes
-        self.flush()
+        # Apply the last changes and wait for them to be encoded, even
+        # if the encoding failed
+        try:
+            self.flush()
+        finally:
+            self.encoding_queue.put(None)
+            self.encoding_thread.join()
+
+            # Close the video data stream
+            self.stream.close()
 
-        # Close the video data stream
-        self.stream.close()
+        # Report a failure of the last batches
+        if self.encoding_error:
+            raise self.encoding_error
@@ -1,7 +1,6 @@
 from typing import Dict, Sequence, Optional, Any
 import multiprocessing as mp
 import queue
-import time
 import uuid
 import signal
 
@@ -12,6 +11,7 @@ import pandas as pd
 from .core.tools import get_memory_data_size, PortableQueue
 from .core.data_stream import DataStream
 from .core.collector import Collector
+from .core.transport import SharedMemoryRing, SharedMemoryChunk
 from .base_process import BaseProcess
 
 class Loader(BaseProcess):
@@ -33,6 +33,9 @@ class Loader(BaseProcess):
             time_window:pd.Timedelta=pd.Timedelta(seconds=3),
             start_time:Optional[pd.Timedelta]=None,
             end_time:Optional[pd.Timedelta]=None,
+            num_of_workers:int=0,
+            lazy_timetrack:bool=False,
+            shared_memory_ring:Optional[SharedMemoryRing]=None,
             verbose:bool=False
         ):
         """Construct a ``Loader`` obtain to load data from data streams.
@@ -61,6 +64,20 @@ class Loader(BaseProcess):
             end_time (pd.Timedelta): The end time to restrict all data \
                 stream timelines when construct the global timetrack.
 
+            num_of_workers (int): The number of threads used by the \
+                ``Collector`` to fetch the data streams concurrently. \
+                With ``0``, the data streams are fetched serially.
+
+            lazy_timetrack (bool): If the ``Collector`` should only build \
+                the global timetrack per window range, instead of fully \
+                before loading the first window. The timetrack of each \
+                window is then sent once the window is loaded.
+
+            shared_memory_ring (Optional[SharedMemoryRing]): The ring of \
+                shared memory segments used to transport the loaded data. \
+                Without it, the data is pickled through the \
+                ``loading_queue``.
+
             verbose (bool): Enabling debugging printouts.
 
         """
@@ -76,6 +93,9 @@ class Loader(BaseProcess):
         self.time_window = time_window
         self.start_time = start_time
         self.end_time = end_time
+        self.num_of_workers = num_of_workers
+        self.lazy_timetrack = lazy_timetrack
+        self.shared_memory_ring = shared_memory_ring
     
         # Adding specific function class from the message
         self.subclass_message_to_functions.update({
@@ -92,16 +112,32 @@ class Loader(BaseProcess):
         # Set the time window
         self.loading_window = loading_window
          
-    def message_timetrack_update(self):
-        """message_from function to provide updated timetrack info."""
+    def message_timetrack_update(
+            self, 
+            timetrack:Optional[pd.DataFrame]=None, 
+            window_idx:Optional[int]=None
+        ):
+        """message_from function to provide updated timetrack info.
+
+        Args:
+            timetrack (Optional[pd.DataFrame]): The timetrack to send. \
+                By default, the ``Collector``'s global timetrack.
+            window_idx (Optional[int]): The window of the timetrack, when \
+                the timetrack is built per window (``lazy_timetrack``).
+
+        """
+        if type(timetrack) == type(None):
+            timetrack = self.collector.global_timetrack.copy()
+
         # Create the message
         collector_construction_message = {
             'header': 'UPDATE',
             'body': {
                 'type': 'TIMETRACK',
                 'content': {
-                    'timetrack': self.collector.global_timetrack.copy(),
-                    'windows': self.collector.windows
+                    'timetrack': timetrack,
+                    'windows': self.collector.windows,
+                    'window_idx': window_idx
                 }
             }
         }
@@ -120,6 +156,11 @@ class Loader(BaseProcess):
                 queue, which its memory consumption needs to be tracked.
 
         """
+        # The data in shared memory is not accounted by pickling the chunk
+        data_memory_usage = get_memory_data_size(data_chunk)
+        if isinstance(data_chunk['data'], SharedMemoryChunk):
+            data_memory_usage += data_chunk['data'].nbytes
+
         # Create the message
         loading_window_message = {
             'header': 'UPDATE',
@@ -128,7 +169,7 @@ class Loader(BaseProcess):
                 'content': {
                     'uuid': data_chunk['uuid'],
                     'loading_window': self.loading_window,
-                    'data_memory_usage': get_memory_data_size(data_chunk)
+                    'data_memory_usage': data_memory_usage
                 }
             }
         }
@@ -185,13 +226,16 @@ class Loader(BaseProcess):
             time_window=self.time_window,
             start_time=self.start_time,
             end_time=self.end_time,
+            num_of_workers=self.num_of_workers,
+            lazy_timetrack=self.lazy_timetrack,
             verbose=self.verbose,
         )
 
         # Get information about the collector's windows
         self.windows = self.collector.windows
 
-        # Sending the global timetrack to the Manager
+        # Sending the global timetrack to the Manager, which is empty if
+        # lazy and then sent per window as the windows are loaded
         self.message_timetrack_update()
 
         # Set the initial value
@@ -200,11 +244,12 @@ class Loader(BaseProcess):
         # Get the data continously
         while not self.thread_exit.is_set():
 
-            # Check if the loading is halted
+            # Check if the loading is halted, if so, wait for a message 
+            # that changes the loading window or resumes the loading
             if self.loading_window == -1 or self.thread_pause.is_set():
                 if self.verbose:
                     print(f"LOADER WAITING: {self.loading_window} or {self.thread_pause.is_set()}")
-                time.sleep(0.5)
+                self.wait_until(lambda: self.loading_window != -1 and not self.thread_pause.is_set())
 
             # Only load windows if there are more to load
             elif self.loading_window < len(self.windows):
@@ -219,6 +264,10 @@ class Loader(BaseProcess):
                 data = self.collector.get(start, end)
                 data_is_loaded = False
 
+                # Write the data into shared memory if possible
+                if self.shared_memory_ring:
+                    data = self.shared_memory_ring.pack(data)
+
                 # Creating data chunk with uuid
                 data_chunk = {
                     'uuid': uuid.uuid4(),
@@ -232,10 +281,15 @@ class Loader(BaseProcess):
                         data_is_loaded = True
                         break
                     except queue.Full:
-                        time.sleep(0.1)
+                        continue
 
                 # Update the loading window pointer
                 if data_is_loaded:
+                    if self.lazy_timetrack:
+                        self.message_timetrack_update(
+                            self.collector.get_timetrack(start, end), 
+                            window_idx=int(self.loading_window)
+                        )
                     self.loading_window += 1
                     self.message_loading_window_counter(data_chunk)
 
@@ -250,6 +304,10 @@ class Loader(BaseProcess):
 
         # Closing the collector
         self.collector.close()
+
+        # Closing the access to the shared memory
+        if self.shared_memory_ring:
+            self.shared_memory_ring.close()
        
         # Closing process
         self.close()
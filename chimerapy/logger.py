@@ -1,22 +1,24 @@
 # Built-in Imports
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import multiprocessing as mp
 import queue
 import threading
 import collections
 import json
 import pathlib
-import time
 import os
-import queue
 import signal
+import time
+import traceback
 
 # Third-party imports
 
 # ChimeraPy Library
 from .core.tools import PortableQueue, threaded
+from .core.transport import SharedMemoryRing
+from .core.entry import Entry
 from .core.video import VideoEntry
-from .core.tabular import TabularEntry, ImageEntry
+from .core.tabular import TabularEntry, ParquetEntry, ImageEntry
 from .base_process import BaseProcess
 
 # Resource:
@@ -39,6 +41,10 @@ class Logger(BaseProcess):
             logging_queue:PortableQueue,
             message_to_queue:PortableQueue,
             message_from_queue:PortableQueue,
+            shared_memory_ring:Optional[SharedMemoryRing]=None,
+            num_of_writers:int=4,
+            max_writer_queue_size:int=100,
+            meta_data_period:float=1.0,
             verbose:bool=False
         ):
         """Construct a ``Logger`` to log data in a structured manner.
@@ -59,6 +65,23 @@ class Logger(BaseProcess):
             message_from_queue (PortableQueue): The messaging queue used to \
                 receive messages from the ``Logger``.
 
+            shared_memory_ring (Optional[SharedMemoryRing]): The shared \
+                memory used by the ``Session`` to transport the logged \
+                frames. The frames are copied out of the segments, which \
+                are then released back to the ``Session``.
+
+            num_of_writers (int): The number of threads that write the \
+                entries. Each entry is assigned to a single writer, which \
+                keeps the order of its data chunks.
+
+            max_writer_queue_size (int): The max number of data chunks \
+                waiting for each writer. When a writer falls behind, the \
+                ``Logger`` blocks instead of buffering without limit.
+
+            meta_data_period (float): The min time (in seconds) between \
+                writes of ``meta.json``. The changes are batched and also \
+                written at shutdown.
+
         """
         super().__init__(
             message_to_queue=message_to_queue,
@@ -70,15 +93,19 @@ class Logger(BaseProcess):
         self.experiment_name = experiment_name
         self.experiment_dir = self.logdir / self.experiment_name
         self.logging_queue = logging_queue
+        self.shared_memory_ring = shared_memory_ring
+        self.num_of_writers = num_of_writers
+        self.max_writer_queue_size = max_writer_queue_size
+        self.meta_data_period = meta_data_period
         self.verbose = verbose
 
-        # Keeping records of all logged data
+        # Keeping records of all logged data and the writer of each entry
         self.records = collections.defaultdict(dict)
-        self.threads = collections.defaultdict(dict)
-        self.queues = collections.defaultdict(dict)
+        self.entry_writers = collections.defaultdict(dict)
         self.meta_data = {}
         self.dtype_to_class = {
             'tabular': TabularEntry,
+            'parquet': ParquetEntry,
             'image': ImageEntry,
             'video': VideoEntry
         }
@@ -147,12 +174,32 @@ class Logger(BaseProcess):
             print("Logging_status_message failed to send!")
     
     def _save_meta_data(self):
-        """Save the meta to a JSON file."""
-        # Added lock to prevent interfering in writing data in shared file
-        self.lock.acquire()
-        with open(self.experiment_dir / 'meta.json', "w") as json_file:
+        """Save the meta to a JSON file.
+
+        The file is replaced atomically, so that readers (like the 
+        ``Manager``) never load a partially written file.
+
+        """
+        tmp_path = self.experiment_dir / 'meta.json.tmp'
+        with open(tmp_path, "w") as json_file:
             json.dump(self.meta_data, json_file)
-        self.lock.release()
+        os.replace(tmp_path, self.experiment_dir / 'meta.json')
+
+        # Reset the debouncing of the changes
+        self.meta_data_changed = False
+        self.meta_data_save_time = time.time()
+
+    def _update_meta_data(self, data:Dict[str, Any]):
+        """Update the entry's end time in the meta data with new data.
+
+        Args:
+            data (Dict[str, Any]): The new data chunk.
+
+        """
+        if len(data['data']) > 0:
+            end_time_stamp = str(data['data'].iloc[-1]._time_)
+            self.meta_data['records'][data['session_name']][data['name']]['end_time'] = end_time_stamp 
+            self.meta_data_changed = True
 
     def create_entry(self, data_chunk:Dict[str, Any]):
         """Create an entry and add it to the records and meta data.
@@ -174,48 +221,104 @@ class Logger(BaseProcess):
         # Selecting the class
         entry_cls = self.dtype_to_class[data_chunk['dtype']]
 
-        # Creating the entry and recording in meta data
-        self.records[data_chunk['session_name']][data_chunk['name']] = entry_cls(entry_dir, data_chunk['name'])
+        # Creating the entry and its meta data, before recording them, 
+        # so that a failure does not leave a partial entry
+        entry_params = data_chunk.get('entry_params', {})
+        entry = entry_cls(entry_dir, data_chunk['name'], **entry_params)
         entry_meta_data = {
             'dtype': data_chunk['dtype'],
             'start_time': str(data_chunk['data'].iloc[0]._time_),
             'end_time': str(data_chunk['data'].iloc[-1]._time_),
+            **entry_params
         }
+        self.records[data_chunk['session_name']][data_chunk['name']] = entry
         self.meta_data['records'][data_chunk['session_name']][data_chunk['name']] = entry_meta_data
-        self._save_meta_data()
+        self.meta_data_changed = True
+
+        # Assign the entry to a writer, in turns
+        writer = len(self.writer_entries_created) % self.num_of_writers
+        self.entry_writers[data_chunk['session_name']][data_chunk['name']] = writer
+        self.writer_entries[writer].append(entry)
+        self.writer_entries_created.append(writer)
   
     @threaded
-    def entry_thread(self, queue:queue.Queue):
-        """Create a new thread for an entry of data.
+    def writer_thread(self, writer_queue:queue.Queue, entries:List[Entry]):
+        """Create a new thread that writes a group of entries.
 
-        Each thread has the individual responsibility of update a specific 
-        entry. The input queue is the matching data flow for said entry.
+        Each writer has the individual responsibility of updating its
+        entries. The input queue is the matching data flow for them.
 
         Args:
-            queue (queue.Queue): The queue that feeds data to the thread.
+            writer_queue (queue.Queue): The queue that feeds data to the thread.
+            entries (List[Entry]): The entries updated by the thread, \
+            which grows as new entries are assigned to the writer.
 
         """
-        # Continue processing
+        # Continue processing until the ``None`` sentinel is received
         while True:
 
-            # If we have data to log, work on it
-            if queue.qsize() != 0:
-                
-                # Log the data
-                data_chunk = queue.get()
-                self.flush(data_chunk)
+            # Block until we have data to log, while periodically 
+            # flushing the entries with old unsaved changes
+            try:
+                data_chunk = writer_queue.get(timeout=min(
+                    (entry.max_unsaved_period for entry in list(entries)), 
+                    default=Entry.max_unsaved_period
+                ))
+            except queue.Empty:
+                data_chunk = {}
+
+            if data_chunk is None:
+                break
+
+            # Log the data, reporting a failure without stopping the 
+            # writer, as its other entries and queue depend on it
+            if data_chunk:
+                try:
+                    self.flush(data_chunk)
+                except Exception as e:
+                    print(f"Error: Logger failed to log {data_chunk['session_name']}/{data_chunk['name']}: {e!r}")
+                    traceback.print_exc()
 
                 # Notify that the data is complete!
-                self.num_of_logged_data += 1
-                self.message_logging_status(data_chunk)
+                with self.lock:
+                    self.num_of_logged_data += 1
+                    self.message_logging_status(data_chunk)
 
-            # Else, sleep to save resources
-            else:
-                time.sleep(0.1)
+            # Flush the entries if their unsaved changes become too old
+            for entry in list(entries):
+                try:
+                    if entry.needs_flush():
+                        entry.flush()
+                except Exception as e:
+                    print(f"Error: Logger failed to flush {entry.name}: {e!r}")
+                    traceback.print_exc()
 
-            # Breaking condition
-            if self.thread_exit.is_set() and queue.qsize() == 0:
-                break
+    def put_to_writer(self, writer:int, item:Optional[Dict[str, Any]]) -> bool:
+        """Put an item in the queue of a writer, unless the writer stopped.
+
+        The writers' queues are bounded, so the ``put`` waits for room 
+        while the writer is alive, instead of blocking forever.
+
+        Args:
+            writer (int): The index of the writer.
+            item (Optional[Dict[str, Any]]): The data chunk, or the \
+            ``None`` sentinel.
+
+        Returns:
+            bool: If the item was put in the queue.
+
+        """
+        while self.writer_threads[writer].is_alive():
+            try:
+                self.writer_queues[writer].put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                if self.thread_exit.is_set() and self.verbose:
+                    print(f"Logger waiting for writer {writer} to finish.")
+                continue
+
+        print(f"Error: Logger writer {writer} stopped, dropping data.")
+        return False
    
     def flush(self, data:Dict[str, Any]):
         """Flush out unsaved logged changes by saving and clearing cache.
@@ -239,15 +342,12 @@ class Logger(BaseProcess):
         assert isinstance(self.records[data['session_name']][data['name']], self.dtype_to_class[data['dtype']]), \
             f"Entry Type={self.records[data['session_name']][data['name']]} should match input data dtype {data['dtype']}"
 
-        # Need to update the end_time for meta_data
-        if len(data['data']) > 0:
-            end_time_stamp = str(data['data'].iloc[-1]._time_)
-            self.meta_data['records'][data['session_name']][data['name']]['end_time'] = end_time_stamp 
-            self._save_meta_data()
-
         # Now that we have account for both scenarios, just log data!
-        self.records[data['session_name']][data['name']].append(data)
-        self.records[data['session_name']][data['name']].flush()
+        # The entry is only flushed when enough changes are buffered
+        entry = self.records[data['session_name']][data['name']]
+        entry.append(data)
+        if entry.needs_flush():
+            entry.flush()
 
     def run(self):
         """Run the ``Logger``.
@@ -267,53 +367,73 @@ class Logger(BaseProcess):
         # Keeping track of processed data
         self.num_of_logged_data = 0
 
+        # Start the pool of writers
+        self.writer_entries = [[] for i in range(self.num_of_writers)]
+        self.writer_entries_created = []
+        self.writer_queues = [queue.Queue(maxsize=self.max_writer_queue_size) for i in range(self.num_of_writers)]
+        self.writer_threads = [
+            self.writer_thread(writer_queue=self.writer_queues[i], entries=self.writer_entries[i]) 
+            for i in range(self.num_of_writers)
+        ]
+        for thread in self.writer_threads:
+            thread.start()
+
         # Continuously check if there are data to log and save
         while True: 
 
-            # First check if there is an item in the queue
-            if self.logging_queue.qsize() != 0:
+            # Block until there is an item in the queue or the Logger is
+            # ending, waking up to save the meta data changes
+            if self.wait_for_data(self.logging_queue, timeout=self.meta_data_period):
 
                 # Get the data frome the queue and calculate the memory usage
-                data_chunk = self.logging_queue.get(block=True)
+                try:
+                    data_chunk = self.logging_queue.get(timeout=1)
+                except queue.Empty:
+                    continue
+
+                # Copy the frames out of the shared memory
+                if self.shared_memory_ring:
+                    data_chunk['data'] = self.shared_memory_ring.unpack(data_chunk['data'])
 
                 # Extract the session name and entry name
                 session_name = data_chunk['session_name']
                 entry_name = data_chunk['name']
 
                 # Determine if the data chunk is for a new entry, if so,
-                # then create a new thread and pass that data!
-                if session_name not in self.records.keys() or entry_name not in self.records[session_name].keys():
-                   
-                    # Create the entry for the data_chunk
-                    self.create_entry(data_chunk)
-
-                    # Setup the thread with its queue
-                    new_entry_queue = queue.Queue() 
-                    new_entry_thread = self.entry_thread(queue=new_entry_queue)
-
-                    # Start the thread
-                    new_entry_thread.start()
-
-                    # Store them
-                    self.queues[session_name][entry_name] = new_entry_queue
-                    self.threads[session_name][entry_name] = new_entry_thread
-
-                # Now that we have ensure that a thread exists, feed the
-                # data chunk to that thread
-                self.queues[session_name][entry_name].put(data_chunk)
-
-            else:
-                time.sleep(0.1)
+                # then create the entry and assign it to a writer. A 
+                # failure is reported without stopping the Logger, as the
+                # other entries and writers depend on it
+                try:
+                    if session_name not in self.records.keys() or entry_name not in self.records[session_name].keys():
+                        self.create_entry(data_chunk)
+                    else:
+                        self._update_meta_data(data_chunk)
+                except Exception as e:
+                    print(f"Error: Logger failed to create {session_name}/{entry_name}: {e!r}")
+                    traceback.print_exc()
+
+                    # Still notify that the data is complete
+                    with self.lock:
+                        self.num_of_logged_data += 1
+                        self.message_logging_status(data_chunk)
+                    continue
+
+                # Now that we have ensure that the entry exists, feed the
+                # data chunk to its writer
+                self.put_to_writer(self.entry_writers[session_name][entry_name], data_chunk)
+
+            # Save the batched meta data changes
+            if self.meta_data_changed and time.time() - self.meta_data_save_time >= self.meta_data_period:
+                self._save_meta_data()
 
             # Break Condition
             if self.thread_exit.is_set() and self.logging_queue.qsize() == 0:
                 break
 
-        # Wait until all the logging threads have stopped!
-        for session_name in self.threads.keys():
-            for entry_name in self.threads[session_name].keys():
-                thread = self.threads[session_name][entry_name]
-                thread.join()
+        # Wait until all the writers have stopped!
+        for writer, thread in enumerate(self.writer_threads):
+            self.put_to_writer(writer, None)
+            thread.join()
 
         # Sending message that the Logger finished!
         self.message_logger_finished()
@@ -331,6 +451,20 @@ class Logger(BaseProcess):
 
         """
         # Then close all the entries
-        for session in self.records.values():
-            for entry in session.values():
-                entry.close()
+        for session_name, session in self.records.items():
+            for entry_name, entry in session.items():
+                try:
+                    entry.close()
+                except Exception as e:
+                    print(f"Error: Logger failed to close {session_name}/{entry_name}: {e!r}")
+                    traceback.print_exc()
+
+                # Report how fast the video was encoded
+                if isinstance(entry, VideoEntry):
+                    self.meta_data['records'][session_name][entry_name]['encode_fps'] = entry.encode_fps
+
+        self._save_meta_data()
+
+        # Closing the access to the shared memory
+        if self.shared_memory_ring:
+            self.shared_memory_ring.close()
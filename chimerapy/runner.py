@@ -10,6 +10,7 @@ import multiprocessing as mp
 import queue
 import pathlib
 import signal
+import concurrent.futures
 
 # Third-Party Imports
 import psutil
@@ -21,6 +22,7 @@ from .logger import Logger
 from .core.pipeline import Pipeline
 from .core.data_stream import DataStream
 from .core.session import Session
+from .core.transport import SharedMemoryRing
 from .core.tools import threaded, clear_queue, PortableQueue,  get_threads_cpu_percent
 
 class SingleRunner:
@@ -65,6 +67,15 @@ class SingleRunner:
             max_message_queue_size:int=100,
             memory_limit:float=0.8,
             memory_usage_factor:float=2.25,
+            num_of_loading_workers:int=0,
+            num_of_shared_memory_segments:int=0,
+            shared_memory_segment_size:int=64*1024**2,
+            num_of_prefetched_chunks:int=0,
+            num_of_logging_shared_memory_segments:int=0,
+            logging_shared_memory_segment_size:int=64*1024**2,
+            max_session_buffered_rows:int=0,
+            max_session_buffered_period:float=1.0,
+            lazy_timetrack:bool=False,
             verbose=False,
         ):
         """
@@ -100,6 +111,36 @@ class SingleRunner:
                 with tracking all memory loaded, the actual memory is\
                 typically higher. The factor is to account for this \
                 difference.
+            num_of_loading_workers (int): The number of threads used \
+                by the ``Loader`` to fetch the data streams concurrently.
+            num_of_shared_memory_segments (int): The number of shared \
+                memory segments used to transport the loaded data, \
+                instead of pickling it through the loading queue. With \
+                ``0``, shared memory is not used.
+            shared_memory_segment_size (int): The size (in bytes) of \
+                each shared memory segment. Windows that do not fit are \
+                pickled through the loading queue.
+            num_of_prefetched_chunks (int): The number of data chunks \
+                a background thread gets (and deserializes) from the \
+                loading queue ahead of the pipeline. With ``0``, the \
+                data chunks are obtained by the processing loop.
+            num_of_logging_shared_memory_segments (int): The number of \
+                shared memory segments used to transport the frames of \
+                ``add_video`` and ``add_images`` to the ``Logger``, \
+                instead of pickling them through the logging queue. With \
+                ``0``, shared memory is not used.
+            logging_shared_memory_segment_size (int): The size (in bytes) \
+                of each logging shared memory segment. Frames that do not \
+                fit are pickled through the logging queue.
+            max_session_buffered_rows (int): The number of rows of each \
+                tabular entry that the ``Session`` buffers before putting \
+                them in the logging queue as a single data chunk. With \
+                ``0`` (the default), the tabular data is not buffered.
+            max_session_buffered_period (float): The max time (in \
+                seconds) tabular rows stay in the ``Session``'s buffer.
+            lazy_timetrack (bool): If the ``Loader`` only builds the \
+                global timetrack per window, instead of fully before \
+                loading the first window.
             verbose (bool): Debugging printout.
 
         """
@@ -117,6 +158,7 @@ class SingleRunner:
         self.max_loading_queue_size = max_loading_queue_size
         self.max_logging_queue_size = max_logging_queue_size
         self.max_message_queue_size = max_message_queue_size
+        self.num_of_prefetched_chunks = num_of_prefetched_chunks
         self.verbose = verbose
 
         # Keep track of the number of processed data chunks
@@ -166,18 +208,27 @@ class SingleRunner:
                 time_window,
                 self.max_loading_queue_size, 
                 start_time,
-                end_time
+                end_time,
+                num_of_loading_workers,
+                num_of_shared_memory_segments,
+                shared_memory_segment_size,
+                lazy_timetrack
             )
 
             # Setup the logger
             self.init_logger(
                 self.max_logging_queue_size,
+                num_of_logging_shared_memory_segments,
+                logging_shared_memory_segment_size
             )
 
             # Create session for runner
             self.session = Session(
                 name='root',
-                logging_queue=self.logging_queue
+                logging_queue=self.logging_queue,
+                shared_memory_ring=self.logging_shared_memory_ring,
+                max_buffered_rows=max_session_buffered_rows,
+                max_buffered_period=max_session_buffered_period
             )
             self.session.set_runner(self)
             self.pipe.set_session(self.session)
@@ -191,7 +242,11 @@ class SingleRunner:
             time_window:pd.Timedelta,
             max_loading_queue_size:int,
             start_time:Optional[pd.Timedelta],
-            end_time:Optional[pd.Timedelta]
+            end_time:Optional[pd.Timedelta],
+            num_of_workers:int=0,
+            num_of_shared_memory_segments:int=0,
+            shared_memory_segment_size:int=64*1024**2,
+            lazy_timetrack:bool=False
         ) -> None:
         """Routine for initializing the ``Loader``.
 
@@ -205,10 +260,31 @@ class SingleRunner:
             end_time (Optional[pd.Timedelta]): The cutoff of the end 
             time of the global timetrack.
 
+            num_of_workers (int): The number of threads used to fetch 
+            the data streams concurrently.
+
+            num_of_shared_memory_segments (int): The number of shared 
+            memory segments to transport the loaded data.
+
+            shared_memory_segment_size (int): The size of each shared 
+            memory segment.
+
+            lazy_timetrack (bool): If the global timetrack is only built
+            per window.
+
         """
         # Then, create the data queues for loading and logging
         self.loading_queue = PortableQueue(maxsize=max_loading_queue_size)
 
+        # Create the shared memory to transport the loaded data
+        if num_of_shared_memory_segments > 0:
+            self.shared_memory_ring = SharedMemoryRing(
+                num_of_segments=num_of_shared_memory_segments,
+                segment_size=shared_memory_segment_size
+            )
+        else:
+            self.shared_memory_ring = None
+
         # Then create the message queues for the loading subprocess
         self.message_to_loading_queue = PortableQueue(maxsize=self.max_message_queue_size)
         self.message_from_loading_queue = PortableQueue(maxsize=self.max_message_queue_size)
@@ -228,6 +304,9 @@ class SingleRunner:
             time_window=time_window,
             start_time=start_time,
             end_time=end_time,
+            num_of_workers=num_of_workers,
+            lazy_timetrack=lazy_timetrack,
+            shared_memory_ring=self.shared_memory_ring,
             verbose=self.verbose
         )
         
@@ -244,15 +323,32 @@ class SingleRunner:
     def init_logger(
             self,
             max_logging_queue_size:int,
+            num_of_shared_memory_segments:int=0,
+            shared_memory_segment_size:int=64*1024**2
         ) -> None:
         """Routine for initializing the ``Logger``.
 
         Args:
             max_logging_queue_size (int): Max size of the logging queue.
 
+            num_of_shared_memory_segments (int): The number of shared 
+            memory segments to transport the logged frames.
+
+            shared_memory_segment_size (int): The size of each shared 
+            memory segment.
+
         """
         # Create the queue for the logging data
         self.logging_queue = PortableQueue(maxsize=max_logging_queue_size)
+
+        # Create the shared memory to transport the logged frames
+        if num_of_shared_memory_segments > 0:
+            self.logging_shared_memory_ring = SharedMemoryRing(
+                num_of_segments=num_of_shared_memory_segments,
+                segment_size=shared_memory_segment_size
+            )
+        else:
+            self.logging_shared_memory_ring = None
        
         # Create the queues for the logger messaging 
         self.message_to_logging_queue = PortableQueue(maxsize=self.max_message_queue_size)
@@ -269,6 +365,7 @@ class SingleRunner:
             logging_queue=self.logging_queue,
             message_to_queue=self.message_to_logging_queue,
             message_from_queue=self.message_from_logging_queue,
+            shared_memory_ring=self.logging_shared_memory_ring,
             verbose=self.verbose
         )
 
@@ -322,7 +419,12 @@ class SingleRunner:
         self.message_to_loading_queue.put(end_message)
         self.message_to_logging_queue.put(end_message)
 
-    def respond_loader_message_timetrack(self, timetrack:pd.DataFrame, windows:list):
+    def respond_loader_message_timetrack(
+            self, 
+            timetrack:pd.DataFrame, 
+            windows:list, 
+            window_idx:Optional[int]=None
+        ):
         """Respond to the retrieved message with initialization info.
 
         Args:
@@ -332,8 +434,13 @@ class SingleRunner:
             windows (list): List of the windows with their start and end
             times.
 
+            window_idx (Optional[int]): The window of the timetrack, if 
+            the timetrack is sent per window. Only the global timetrack
+            is kept.
+
         """
-        self.timetrack = timetrack
+        if type(window_idx) == type(None):
+            self.timetrack = timetrack
         self.num_of_windows = len(windows)
 
     def respond_loader_message_counter(
@@ -360,7 +467,11 @@ class SingleRunner:
 
         """
         self.latest_window_loaded = loading_window
-        self.loading_queue_memory_chunks[uuid] = data_memory_usage
+
+        # Inform the processing loop that the data chunk is registered
+        with self.loading_counter_updated:
+            self.loading_queue_memory_chunks[uuid] = data_memory_usage
+            self.loading_counter_updated.notify_all()
 
     def respond_logger_message_counter(
             self, 
@@ -379,11 +490,8 @@ class SingleRunner:
         """
         self.num_of_logged_data = num_of_logged_data
 
-        # Sometimes the uuid has not been added yet so we need to wait
-        while uuid not in self.logging_queue_memory_chunks:
-            time.sleep(0.01)
-
-        del self.logging_queue_memory_chunks[uuid]
+        # The session records the memory usage before ``put``
+        self.logging_queue_memory_chunks.pop(uuid, None)
 
     def respond_loader_message_end(self):
         """Respond to the ``Loader`` inform that it has ended."""
@@ -522,6 +630,9 @@ class SingleRunner:
         # Creating threading Event to indicate stopping processing
         self.thread_exit = threading.Event()
         self.thread_exit.clear()
+
+        # Condition notified when a loaded data chunk is registered
+        self.loading_counter_updated = threading.Condition()
         
         # Begin the thread receiving messages
         self.message_loader_thread = self.check_loader_messages()
@@ -569,6 +680,9 @@ class SingleRunner:
         # Then process the sample
         output = self.pipe.step(data_samples[self.name])
 
+        # Log the tabular data that has been buffered for too long
+        self.session.flush_stale()
+
         # Return the pipe's output
         return output
     
@@ -578,6 +692,9 @@ class SingleRunner:
         # Closing components
         self.pipe.end()
 
+        # Log the remaining buffered tabular data
+        self.session.flush()
+
     def shutdown(self) -> None:
         """Shutting down the ``SingleRunner``.
 
@@ -604,15 +721,20 @@ class SingleRunner:
                 self.logger_finished:
                 break
 
-        # If the thread ended, we should stop the message thread
+        # If the thread ended, we should stop the message thread, and 
+        # wake up the processing waiting on a data chunk's registration
         self.thread_exit.set()
+        with self.loading_counter_updated:
+            self.loading_counter_updated.notify_all()
 
         # Clear out all mesages
         while self.loader.is_alive() or self.logger.is_alive():
 
-            # Clear the queue if necessary
+            # Clear the queue if necessary, except the message queues 
+            # to the subprocesses as this could drop the END messages
             for q_name, queue in self.queues.items():
-                clear_queue(queue)
+                if not q_name.startswith('m_to'):
+                    clear_queue(queue)
             
             # Joining the subprocesses
             self.loader.join(timeout=1)
@@ -622,41 +744,130 @@ class SingleRunner:
         self.message_loader_thread.join()
         self.message_logger_thread.join()
 
+        # Destroying the shared memory
+        if self.shared_memory_ring:
+            self.shared_memory_ring.close(unlink=True)
+        if self.logging_shared_memory_ring:
+            self.logging_shared_memory_ring.close(unlink=True)
+
+    @threaded
+    def prefetch_data_chunks(self):
+        """Get the next data chunks while the pipeline is stepping.
+
+        ``get``ting from the ``loading_queue`` unpickles the data chunk,
+        and copying it out of the shared memory can be as costly. This 
+        thread does this ahead of the processing loop, placing up to 
+        ``num_of_prefetched_chunks`` data chunks in the 
+        ``prefetched_data_chunks`` queue.
+
+        """
+        while not self.thread_exit.is_set():
+
+            # Retrieveing sample from the loading queue
+            try:
+                data_chunk = self.loading_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            # Copying the data out of the shared memory
+            if data_chunk != 'END' and self.shared_memory_ring:
+                data_chunk['data'] = self.shared_memory_ring.unpack(data_chunk['data'])
+
+            # Handing the data chunk to the processing loop
+            while not self.thread_exit.is_set():
+                try:
+                    self.prefetched_data_chunks.put(data_chunk, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+            # Check for end condition
+            if data_chunk == 'END':
+                break
+
+    def get_data_chunk(self) -> Optional[Union[str, Dict[str, Any]]]:
+        """Get the next data chunk to process.
+
+        Returns:
+            Optional[Union[str, Dict[str, Any]]]: The data chunk, the 
+            ``'END'`` message, or ``None`` if the processing is stopped.
+
+        """
+        # Get from the prefetching thread if there is one
+        if self.num_of_prefetched_chunks > 0:
+            source_queue = self.prefetched_data_chunks
+        else:
+            source_queue = self.loading_queue
+
+        # Wait for the data chunk while checking if the processing stops
+        while not self.thread_exit.is_set():
+            try:
+                data_chunk = source_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            # Copying the data out of the shared memory, since the 
+            # pipeline can keep or log the data
+            if self.num_of_prefetched_chunks == 0 and data_chunk != 'END' and self.shared_memory_ring:
+                data_chunk['data'] = self.shared_memory_ring.unpack(data_chunk['data'])
+
+            return data_chunk
+
+        return None
+
     def process_data(self):
         """Main routine for loading and processing data chunks.
 
         This routine acts as the base routine for ``get``ting data 
         chunks from the ``loading_queue`` and passing them through the
-        ``Pipeline``.
+        ``Pipeline``. With ``num_of_prefetched_chunks``, the data 
+        chunks are obtained by a thread while the ``Pipeline`` steps.
 
         """
         # Keep track of the number of processed data chunks
         self.num_processed_data_chunks = 0
+
+        # Start getting data chunks ahead of the pipeline
+        if self.num_of_prefetched_chunks > 0:
+            self.prefetched_data_chunks = queue.Queue(maxsize=self.num_of_prefetched_chunks)
+            self.prefetch_thread = self.prefetch_data_chunks()
+            self.prefetch_thread.start()
         
         # Continue iterating
         while not self.thread_exit.is_set():
 
-            # Retrieveing sample from the loading queue
-            data_chunk = self.loading_queue.get(block=True)
+            # Retrieveing sample
+            data_chunk = self.get_data_chunk()
             
             # Check for end condition
-            if data_chunk == 'END':
+            if data_chunk is None or data_chunk == 'END':
                 break
 
             # Decompose the data chunk
             all_data_samples = data_chunk['data'] 
  
             # Now that the data has been removed from the queue, remove 
-            # this from the memory used
-            while data_chunk['uuid'] not in self.loading_queue_memory_chunks:
-                time.sleep(0.01)
-            del self.loading_queue_memory_chunks[data_chunk['uuid']]
+            # this from the memory used, once the ``Loader`` message 
+            # registering it has been received. The wait is re-checked, 
+            # as the ``thread_exit`` set by the signal handler cannot 
+            # notify the condition
+            with self.loading_counter_updated:
+                while not self.loading_counter_updated.wait_for(
+                    lambda: data_chunk['uuid'] in self.loading_queue_memory_chunks or self.thread_exit.is_set(),
+                    timeout=0.1
+                ):
+                    continue
+                self.loading_queue_memory_chunks.pop(data_chunk['uuid'], None)
             
             # Then propagate the sample throughout the pipe
             self.step(all_data_samples)
 
             # Increase the counter
             self.num_processed_data_chunks += 1
+
+        # Stop getting data chunks
+        if self.num_of_prefetched_chunks > 0:
+            self.prefetch_thread.join()
         
     def tui_main(self, stdscr):
         """Routine for TUI.
@@ -813,6 +1024,16 @@ class GroupRunner(SingleRunner):
             max_message_queue_size:int=100,
             memory_limit:float=0.8,
             memory_usage_factor:float=2.25,
+            num_of_loading_workers:int=0,
+            num_of_shared_memory_segments:int=0,
+            shared_memory_segment_size:int=64*1024**2,
+            num_of_prefetched_chunks:int=0,
+            num_of_step_workers:int=0,
+            num_of_logging_shared_memory_segments:int=0,
+            logging_shared_memory_segment_size:int=64*1024**2,
+            max_session_buffered_rows:int=0,
+            max_session_buffered_period:float=1.0,
+            lazy_timetrack:bool=False,
             verbose:bool=False,
         ) -> None:
         """Construct the ``GroupRunner``.
@@ -846,6 +1067,52 @@ class GroupRunner(SingleRunner):
                 crash, a factor is used to compensate for this as a safety \
                 measure.
 
+            num_of_loading_workers (int): The number of threads used \
+                by the ``Loader`` to fetch the data streams concurrently. \
+                With many participants, a worker per data stream lets the \
+                latency of a window approach the slowest data stream.
+
+            num_of_shared_memory_segments (int): The number of shared \
+                memory segments used to transport the loaded data, \
+                instead of pickling it through the loading queue. With \
+                ``0``, shared memory is not used.
+
+            shared_memory_segment_size (int): The size (in bytes) of \
+                each shared memory segment. Windows that do not fit are \
+                pickled through the loading queue.
+
+            num_of_prefetched_chunks (int): The number of data chunks \
+                a background thread gets (and deserializes) from the \
+                loading queue ahead of the pipelines. With ``0``, the \
+                data chunks are obtained by the processing loop.
+
+            num_of_step_workers (int): The number of threads used to \
+                step the ``SingleRunner`` pipelines concurrently, before \
+                the group pipeline. With ``0``, the pipelines are stepped \
+                one after another.
+
+            num_of_logging_shared_memory_segments (int): The number of \
+                shared memory segments used to transport the frames of \
+                ``add_video`` and ``add_images`` to the ``Logger``, \
+                instead of pickling them through the logging queue. With \
+                ``0``, shared memory is not used.
+
+            logging_shared_memory_segment_size (int): The size (in bytes) \
+                of each logging shared memory segment. Frames that do not \
+                fit are pickled through the logging queue.
+
+            max_session_buffered_rows (int): The number of rows of each \
+                tabular entry that the sessions buffer before putting \
+                them in the logging queue as a single data chunk. With \
+                ``0`` (the default), the tabular data is not buffered.
+
+            max_session_buffered_period (float): The max time (in \
+                seconds) tabular rows stay in the sessions' buffers.
+
+            lazy_timetrack (bool): If the ``Loader`` only builds the \
+                global timetrack per window, instead of fully before \
+                loading the first window.
+
             verbose (bool): Debugging printout.
 
         """
@@ -863,7 +1130,14 @@ class GroupRunner(SingleRunner):
         self.max_loading_queue_size = max_loading_queue_size
         self.max_logging_queue_size = max_logging_queue_size
         self.max_message_queue_size = max_message_queue_size
+        self.num_of_prefetched_chunks = num_of_prefetched_chunks
         self.verbose = verbose
+
+        # Create the pool of threads to step the runners' pipelines
+        if num_of_step_workers > 0:
+            self.step_executor = concurrent.futures.ThreadPoolExecutor(max_workers=num_of_step_workers)
+        else:
+            self.step_executor = None
         
         # Keep track of the number of processed data chunks
         self.num_processed_data_chunks = 0
@@ -912,25 +1186,37 @@ class GroupRunner(SingleRunner):
             time_window,
             max_loading_queue_size, 
             start_time,
-            end_time
+            end_time,
+            num_of_loading_workers,
+            num_of_shared_memory_segments,
+            shared_memory_segment_size,
+            lazy_timetrack
         )
 
         # Setup the logger
         self.init_logger(
             max_logging_queue_size,
+            num_of_logging_shared_memory_segments,
+            logging_shared_memory_segment_size
         )
 
         # Creating sessions for the runners
         self.session = Session(
             name='root',
-            logging_queue=self.logging_queue
+            logging_queue=self.logging_queue,
+            shared_memory_ring=self.logging_shared_memory_ring,
+            max_buffered_rows=max_session_buffered_rows,
+            max_buffered_period=max_session_buffered_period
         )
         
         # Providing each runner with a subsession
         for runner in self.runners:
             runner_session = Session(
                 name=runner.name,
-                logging_queue=self.logging_queue
+                logging_queue=self.logging_queue,
+                shared_memory_ring=self.logging_shared_memory_ring,
+                max_buffered_rows=max_session_buffered_rows,
+                max_buffered_period=max_session_buffered_period
             )
 
             # Connect the session to the group runner to track memory usage
@@ -976,15 +1262,30 @@ class GroupRunner(SingleRunner):
             the conjuction of all the ``SingleRunner`` instances.
 
         """
-        # Get samples for all the runners and propagate them
-        for runner in self.runners:
-            # Get the output of the each runner
-            output = runner.step({runner.name: all_data_samples[runner.name]})
+        # Get samples for all the runners and propagate them, 
+        # concurrently if possible
+        if self.step_executor:
+            futures = [
+                self.step_executor.submit(runner.step, {runner.name: all_data_samples[runner.name]})
+                for runner in self.runners
+            ]
+        else:
+            futures = None
+
+        # Get the output of the each runner, in the order of the runners
+        for i, runner in enumerate(self.runners):
+            if futures:
+                output = futures[i].result()
+            else:
+                output = runner.step({runner.name: all_data_samples[runner.name]})
             all_data_samples[runner.name]['_output_'] = output
 
         # Then process the sample in the group pipeline
         self.pipe.step(all_data_samples)
 
+        # Log the tabular data that has been buffered for too long
+        self.session.flush_stale()
+
     def end(self) -> None:
         """Ending the data pipelines."""
 
@@ -992,5 +1293,9 @@ class GroupRunner(SingleRunner):
         for runner in self.runners:
             runner.end()
 
+        # Stop the pool of threads stepping the runners
+        if self.step_executor:
+            self.step_executor.shutdown()
+
         # Execute its own start
         super().end()
@@ -1,15 +1,17 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple, Callable
 import multiprocessing as mp
+import concurrent.futures
 import queue
-import time
 import uuid
 
 # Third-party imports
-from PIL import Image
 import pandas as pd
+import numpy as np
+import cv2
 
 # ChimeraPy Library
-from .core.tools import to_numpy, get_memory_data_size, PortableQueue
+from .core.tools import get_memory_data_size, PortableQueue
+from .core.tabular.entry import ImageEntry
 from .base_process import BaseProcess
 
 # Resource:
@@ -31,7 +33,10 @@ class Sorter(BaseProcess):
             message_to_queue:PortableQueue,
             message_from_queue:PortableQueue,
             entries:pd.DataFrame,
-            update_counter_period:int=10,
+            update_counter_period:int=1,
+            num_of_decoders:int=4,
+            send_encoded_images:bool=False,
+            display_sizes:Optional[Dict[Tuple[str,str], Tuple[int,int]]]=None,
             verbose:bool=False
         ):
         """Construct a ``Sorter`` to temporally sort all data.
@@ -52,11 +57,25 @@ class Sorter(BaseProcess):
             entries (pd.DataFrame): A data frame that contains various \
                 attributes of the entries.
 
-            update_counter_period (int): This is the period in when the \
-                ``Sorter`` reports sorted data. Too frequent and the system \
-                will be overloaded by the messages. Too large periods and \
-                the memory consumption of the ``Sorter`` won't be accurately \
-                tracked.
+            update_counter_period (int): This is the period (in batches of \
+                a window) in when the ``Sorter`` reports sorted data. Too \
+                frequent and the system will be overloaded by the messages. \
+                Too large periods and the memory consumption of the \
+                ``Sorter`` won't be accurately tracked.
+
+            num_of_decoders (int): The number of threads decoding and \
+                downscaling the images and frames of a window.
+
+            send_encoded_images (bool): If ``True``, the images are put \
+                in the sorting queue still encoded, to be decoded at the \
+                display's resolution by the front-end. This reduces the \
+                size of the queue's data for image-heavy sessions.
+
+            display_sizes (Optional[Dict[Tuple[str,str], Tuple[int,int]]]): \
+                The (height, width) of the display of each (user, \
+                entry_name). Larger frames are downscaled to fit in their \
+                display before being ``put`` in the sorting queue. It is \
+                updated with the ``DISPLAY_SIZES`` message.
 
             verbose (bool): Debugging printout.
         """
@@ -69,13 +88,36 @@ class Sorter(BaseProcess):
 
         # Saving the input variables
         self.update_counter_period = update_counter_period
+        self.num_of_decoders = num_of_decoders
+        self.send_encoded_images = send_encoded_images
+        self.display_sizes = display_sizes if display_sizes is not None else {}
         self.loading_queue = loading_queue
         self.sorting_queue = sorting_queue
         self.sorted_entries_processed = 0
+        self.sorted_batches_processed = 0
 
         # Keeping track of the entries and their meta information
         self.entries = entries.set_index(['user', 'entry_name'])
 
+        # The pool decoding and downscaling frames is created within 
+        # the process
+        self.frames_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+        # Adding specific function class from the message
+        self.subclass_message_to_functions.update({
+            'DISPLAY_SIZES': self.set_display_sizes
+        })
+
+    def set_display_sizes(self, display_sizes:Dict[Tuple[str,str], Tuple[int,int]]):
+        """message_to function to set the sizes of the displays.
+
+        Args:
+            display_sizes (Dict[Tuple[str,str], Tuple[int,int]]): The \
+                (height, width) of the display of each (user, entry_name).
+
+        """
+        self.display_sizes = display_sizes
+
     def message_sorter_pulled_from_loading_queue(self, uuid:str):
         """``Sorter`` sending message: getting data from loading queue.
 
@@ -100,16 +142,16 @@ class Sorter(BaseProcess):
         except queue.Full:
             print("Error: ``message_sorter_pulled_from_loading_queue`` failed to send!")
 
-    def message_loading_sorted(self, data_chunk:Dict[str,Any]):
+    def message_loading_sorted(self, batch:Dict[str,Any]):
         """``Sorter`` sending message: putting data to sorting queue.
 
         Args:
-            data_chunk (Dict[str,Any]): The data chunk that is being \
-                ``put`` into sorting queue.
+            batch (Dict[str,Any]): The batch that is being ``put`` into \
+                sorting queue.
 
         """
         # Check that the uuid is not None
-        assert data_chunk['uuid'] != None
+        assert batch['uuid'] != None
 
         # Create the message
         message = {
@@ -117,8 +159,8 @@ class Sorter(BaseProcess):
             'body': {
                 'type': 'COUNTER',
                 'content': {
-                    'uuid': data_chunk['uuid'],
-                    'loaded_time': data_chunk['entry_time'],
+                    'uuid': batch['uuid'],
+                    'loaded_time': pd.Timedelta(int(batch['times'][-1]), unit='ns'),
                     'data_memory_usage': self.unregistered_memory_usage
                 }
             }
@@ -148,69 +190,178 @@ class Sorter(BaseProcess):
         except queue.Full:
             print("Error: finished sorting message failed to send!")
 
-    def add_content_to_queue(self, entry:pd.Series):
-        """Apply function for pd.DataFrame to individually put into sorting queue.
-
-        This is the main routine that handles the individual rows in the
-        collection of all the data samples.
+    def get_contents(self, user:str, entry_name:str, df:pd.DataFrame) -> Optional[List[Any]]:
+        """Extract the content of each sample of a window's data stream.
 
         Args:
-            entry (pd.Series): The row of the data frame to be added \
-                to the sorting queue.
+            user (str): The user of the data stream.
+            entry_name (str): The name of the data stream.
+            df (pd.DataFrame): The window's data of the data stream.
+
+        Returns:
+            Optional[List[Any]]: The content of each row, or ``None`` if \
+            the type of data stream is not displayed.
 
         """
         # Obtaining the data type
-        entry_dtype = self.entries.loc[entry.group, entry.ds_type]['dtype']
+        entry_meta = self.entries.loc[user, entry_name]
+        entry_dtype = entry_meta['dtype']
 
-        # Extract the content for each type of data stream
+        # Extract the content for each type of data stream, downscaled 
+        # to the display's size
+        display_size = self.display_sizes.get((user, entry_name))
         if entry_dtype == 'image':
-            content = to_numpy(Image.open(entry.img_filepaths))
+            buffers = self.read_encoded_images(entry_meta, df)
+            if self.send_encoded_images:
+                return buffers
+            return self.map_in_pool(lambda x: self.downscale(ImageEntry.decode_image(x), display_size), buffers)
         elif entry_dtype == 'video':
-            if len(entry.frames.shape) == 3:
-                content = entry.frames[:,:,::-1]
-            else:
-                content = entry.frames
+            frames = df['frames'].values
+            if display_size is not None:
+                frames = self.map_in_pool(lambda x: self.downscale(x, display_size), list(frames))
+            return [frame[:,:,::-1] if len(frame.shape) == 3 else frame for frame in frames]
         else:
             # raise NotImplementedError(f"{entry_dtype} content is not implemented yet!")
             return None
 
-        # If updating, the we need to generate uuid
-        if self.sorted_entries_processed % self.update_counter_period == 0 and \
-            self.sorted_entries_processed != 0:
-            data_uuid = uuid.uuid4()
+    def read_encoded_images(self, entry_meta:pd.Series, df:pd.DataFrame) -> List[np.ndarray]:
+        """Read the encoded images of a window's image data stream.
+
+        Args:
+            entry_meta (pd.Series): The meta information of the entry.
+            df (pd.DataFrame): The window's data of the data stream.
+
+        Returns:
+            List[np.ndarray]: The encoded images, as ``uint8`` buffers.
+
+        """
+        if entry_meta.get('image_storage') == 'archive':
+            return [
+                np.frombuffer(ImageEntry.read_archive_image(archive, int(offset), int(size)), dtype=np.uint8)
+                for archive, offset, size in zip(df['img_archive'].values, df['img_offset'].values, df['img_size'].values)
+            ]
         else:
-            data_uuid = None
+            return [np.fromfile(filepath, dtype=np.uint8) for filepath in df['img_filepaths'].values]
+
+    def map_in_pool(self, func:Callable[[Any], Any], items:List[Any]) -> List[Any]:
+        """Apply a function to items in parallel with the frames' pool.
+
+        The pool is meant for OpenCV functions, which release the GIL.
+
+        Args:
+            func (Callable[[Any], Any]): The function to apply.
+            items (List[Any]): The items, like encoded images or frames.
+
+        Returns:
+            List[Any]: The outputs, in the order of the items.
+
+        """
+        # Create the pool the first time it is needed
+        if self.frames_pool is None:
+            self.frames_pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.num_of_decoders)
+
+        return list(self.frames_pool.map(func, items))
+
+    @staticmethod
+    def downscale(frame:Optional[np.ndarray], display_size:Optional[Tuple[int,int]]) -> Optional[np.ndarray]:
+        """Downscale a frame to fit in its display, keeping its aspect ratio.
+
+        Args:
+            frame (Optional[np.ndarray]): The frame.
+            display_size (Optional[Tuple[int,int]]): The (height, width) \
+                of the display, if known.
+
+        Returns:
+            Optional[np.ndarray]: The frame, downscaled with ``INTER_AREA`` \
+            if it is larger than the display.
+
+        """
+        if frame is None or display_size is None:
+            return frame
+
+        ratio = min(display_size[0] / frame.shape[0], display_size[1] / frame.shape[1])
+        if ratio >= 1:
+            return frame
+
+        size = (max(1, int(frame.shape[1] * ratio)), max(1, int(frame.shape[0] * ratio)))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def sort_window(self, window_data:Dict[str, Dict[str, pd.DataFrame]]) -> Optional[Dict[str, Any]]:
+        """Temporally sort the samples of a window into a single batch.
+
+        Instead of concatenating the data frames and putting each row 
+        in the sorting queue, the window becomes a single batch. The 
+        batch contains the sorted times (``int64`` nanoseconds), the 
+        code of each sample's entry (its index in ``entries``), and the
+        content of each sample.
+
+        Args:
+            window_data (Dict[str, Dict[str, pd.DataFrame]]): The data \
+                of each user and entry loaded for the window.
+
+        Returns:
+            Optional[Dict[str, Any]]: The batch, or ``None`` if the window \
+            has no content to display.
+
+        """
+        # Gather the times, codes and contents of each data stream
+        all_times, all_codes, all_contents, entries = [], [], [], []
+        for user, user_entries in window_data.items():
+            for entry_name, df in user_entries.items():
+                if len(df) == 0:
+                    continue
+                contents = self.get_contents(user, entry_name, df)
+                if contents is None:
+                    continue
+
+                all_times.append(pd.to_timedelta(df['_time_']).values.astype(np.int64))
+                all_codes.append(np.full(len(df), len(entries), dtype=np.int32))
+                all_contents.extend(contents)
+                entries.append((user, entry_name))
+
+        if len(entries) == 0:
+            return None
 
-        # Creating the data chunk
-        data_chunk = {
-            'uuid': data_uuid,
+        # Sorting the samples, keeping the order of equal timestamps
+        times = np.concatenate(all_times)
+        codes = np.concatenate(all_codes)
+        order = np.argsort(times, kind='stable')
+
+        return {
+            'uuid': None,
             'index': self.sorted_entries_processed,
-            'user': entry.group,
-            'entry_time': entry._time_,
-            'entry_name': entry.ds_type,
-            'content': content
+            'times': times[order],
+            'codes': codes[order],
+            'entries': entries,
+            'contents': [all_contents[i] for i in order]
         }
 
-        # Put the entry into the queue
+    def put_batch(self, batch:Dict[str, Any]):
+        """Put a sorted batch into the sorting queue.
+
+        Args:
+            batch (Dict[str, Any]): The batch created by ``sort_window``.
+
+        """
+        # Track the memory of the batch, reporting it only every 
+        # ``update_counter_period`` batches
+        self.unregistered_memory_usage += get_memory_data_size(batch)
+        self.sorted_batches_processed += 1
+        if self.sorted_batches_processed % self.update_counter_period == 0:
+            batch['uuid'] = uuid.uuid4()
+            self.message_loading_sorted(batch)
+            self.unregistered_memory_usage = 0
+
+        # Put the batch into the queue
         while not self.thread_exit.is_set():
             try:
-                # Putting the data
-                self.sorting_queue.put(data_chunk.copy(), timeout=1)
+                self.sorting_queue.put(batch, timeout=1)
                 break
             except queue.Full:
-                print("full")
-                time.sleep(0.1)
+                continue
             
-        # Only update sorting bar entry other 10 samples
-        if self.sorted_entries_processed % self.update_counter_period == 0 and \
-            self.sorted_entries_processed != 0:
-            self.message_loading_sorted(data_chunk)
-            self.unregistered_memory_usage = 0
-        else:
-            self.unregistered_memory_usage += get_memory_data_size(data_chunk)
-        
-        # Updating the number of processed data chunks
-        self.sorted_entries_processed += 1
+        # Updating the number of processed samples
+        self.sorted_entries_processed += len(batch['times'])
 
     def run(self):
         """The main routine for sorting data.
@@ -231,20 +382,20 @@ class Sorter(BaseProcess):
         # Continously update the content
         while not self.thread_exit.is_set():
 
-            # If paused, just continue sleeping
+            # If paused, wait until resumed
             if self.thread_pause.is_set():
                 if self.verbose:
                     print("SORTER WAITING")
-                time.sleep(0.5)
+                self.wait_until(lambda: not self.thread_pause.is_set())
                 continue
 
             # Get the next window of information if done processing 
             # the previous window data
+            if not self.wait_for_data(self.loading_queue):
+                continue
             try:
                 data_chunk = self.loading_queue.get(timeout=1)
             except queue.Empty:
-                time.sleep(0.1)
-                print(f"size of loading queue: {self.loading_queue.qsize()}")
                 continue
 
             # Printing information about pulling
@@ -263,23 +414,12 @@ class Sorter(BaseProcess):
             current_window_data = data_chunk['data']
             # current_window_timetrack = data_chunk['timetrack']
 
-            # Placing all the data frames within a list to later concat
-            all_dfs = []
-            for user, entries in current_window_data.items():
-                for entry_name, entry_data in entries.items():
-                    df = current_window_data[user][entry_name]
-                    df['group'] = user
-                    df['ds_type'] = entry_name
-                    all_dfs.append(current_window_data[user][entry_name])
-
-            # Combining and sorting data
-            total_df = pd.concat(all_dfs, axis=0, ignore_index=True)
-            total_df.sort_values(by="_time_", inplace=True)
-            total_df.reset_index(inplace=True)
-            total_df = total_df.drop(columns=['index'])
-
-            # Apply to the total_df
-            total_df.apply(lambda x: self.add_content_to_queue(x), axis=1)
-
-        # Closing the process
+            # Sorting the window into a single batch
+            batch = self.sort_window(current_window_data)
+            if batch is not None:
+                self.put_batch(batch)
+
+        # Closing the frames' pool and the process
+        if self.frames_pool is not None:
+            self.frames_pool.shutdown()
         self.close()
@@ -120,5 +120,155 @@ class LoaderTests(unittest.TestCase):
         # Then wait until the loader joins
         loader.join()
 
+    def test_loader_with_shared_memory(self):
+
+        # Creating the necessary queues and the shared memory
+        q_max_size = 3
+        loading_queue = cp.tools.PortableQueue(maxsize=q_max_size)
+        message_to_queue = cp.tools.PortableQueue(maxsize=100)
+        message_from_queue = cp.tools.PortableQueue(maxsize=100)
+        shared_memory_ring = cp.SharedMemoryRing(num_of_segments=q_max_size, segment_size=2*1024**2)
+
+        time_window = pd.Timedelta(seconds=0.5)
+
+        # Create data loader
+        loader = cp.Loader(
+            loading_queue=loading_queue,
+            message_to_queue=message_to_queue,
+            message_from_queue=message_from_queue,
+            users_data_streams=self.dss,
+            time_window=time_window,
+            shared_memory_ring=shared_memory_ring
+        )
+        loader.start()
+
+        # Compare the windows with the ones loaded directly
+        collector = cp.Collector(self.dss, time_window=time_window)
+        for window in collector.windows[:2*q_max_size]:
+            data_chunk = loading_queue.get(timeout=10)
+            assert isinstance(data_chunk['data'], cp.core.transport.SharedMemoryChunk)
+            data = shared_memory_ring.unpack(data_chunk['data'])
+            expected_data = collector.get(window.start, window.end)
+
+            tabular_data = data['P01']['test_tabular']
+            assert tabular_data.equals(expected_data['P01']['test_tabular'])
+            video_data = data['P01']['test_video']
+            expected_video_data = expected_data['P01']['test_video']
+            assert (video_data['_time_'] == expected_video_data['_time_']).all()
+            for frame, expected_frame in zip(video_data['frames'], expected_video_data['frames']):
+                assert np.array_equal(frame, expected_frame)
+
+        # Then tell the loader to stop!
+        end_message = {
+            'header': 'META',
+            'body': {
+                'type': 'END',
+                'content': {},
+            }
+        }
+        message_to_queue.put(end_message)
+
+        # Clear the queues until the loader joins
+        while loader.is_alive():
+            cp.tools.clear_queue(loading_queue)
+            cp.tools.clear_queue(message_from_queue)
+            loader.join(timeout=1)
+
+        collector.close()
+        shared_memory_ring.close(unlink=True)
+
+    def test_loader_responds_to_messages_quickly(self):
+
+        # Creating the necessary queues
+        q_max_size = 3
+        loading_queue = cp.tools.PortableQueue(maxsize=q_max_size)
+        message_to_queue = cp.tools.PortableQueue(maxsize=100)
+        message_from_queue = cp.tools.PortableQueue(maxsize=100)
+
+        # Create data loader
+        loader = cp.Loader(
+            loading_queue=loading_queue,
+            message_to_queue=message_to_queue,
+            message_from_queue=message_from_queue,
+            users_data_streams=self.dss,
+            time_window=pd.Timedelta(seconds=0.1),
+        )
+        loader.start()
+
+        # Wait until the loader fills the queue
+        while loading_queue.qsize() != q_max_size:
+            time.sleep(0.01)
+
+        # Then tell the loader to stop, which should not wait on any 
+        # polling timeouts
+        end_message = {
+            'header': 'META',
+            'body': {
+                'type': 'END',
+                'content': {},
+            }
+        }
+        tic = time.perf_counter()
+        message_to_queue.put(end_message)
+        while loader.is_alive():
+            cp.tools.clear_queue(loading_queue)
+            cp.tools.clear_queue(message_from_queue)
+            loader.join(timeout=0.01)
+        assert time.perf_counter() - tic < 0.5
+
+    def test_loader_sends_lazy_timetrack_per_window(self):
+
+        # Creating the necessary queues
+        q_max_size = 3
+        loading_queue = cp.tools.PortableQueue(maxsize=q_max_size)
+        message_to_queue = cp.tools.PortableQueue(maxsize=100)
+        message_from_queue = cp.tools.PortableQueue(maxsize=100)
+
+        time_window = pd.Timedelta(seconds=0.5)
+
+        # Create data loader, which only builds the timetrack per window
+        loader = cp.Loader(
+            loading_queue=loading_queue,
+            message_to_queue=message_to_queue,
+            message_from_queue=message_from_queue,
+            users_data_streams=self.dss,
+            time_window=time_window,
+            lazy_timetrack=True
+        )
+        loader.start()
+
+        # Get the timetrack messages of the loaded windows
+        timetracks = {}
+        while len(timetracks) < q_max_size + 1:
+            message = message_from_queue.get(timeout=10)
+            if message['body']['type'] == 'TIMETRACK':
+                content = message['body']['content']
+                timetracks[content['window_idx']] = content['timetrack']
+
+        # Then tell the loader to stop!
+        end_message = {
+            'header': 'META',
+            'body': {
+                'type': 'END',
+                'content': {},
+            }
+        }
+        message_to_queue.put(end_message)
+        while loader.is_alive():
+            cp.tools.clear_queue(loading_queue)
+            cp.tools.clear_queue(message_from_queue)
+            loader.join(timeout=1)
+
+        # The initial timetrack is empty, and each window's timetrack
+        # should match the fully constructed global timetrack
+        assert len(timetracks[None]) == 0
+        collector = cp.Collector(self.dss, time_window=time_window)
+        for window_idx in range(q_max_size):
+            window = collector.windows[window_idx]
+            expected_timetrack = collector.get_timetrack(window.start, window.end)
+            assert len(timetracks[window_idx]) > 0
+            assert (timetracks[window_idx]['time'].to_numpy() == expected_timetrack['time'].to_numpy()).all()
+        collector.close()
+
 if __name__ == '__main__':
     unittest.main()
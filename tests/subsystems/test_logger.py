@@ -12,6 +12,7 @@ import queue
 # from memory_profiler import profile
 import pprint
 import numpy as np
+import cv2
 import psutil
 import pandas as pd
 
@@ -316,6 +317,381 @@ class LoggerTests(unittest.TestCase):
         print("ACTUAL META")
         pprint.pprint(actual_meta)
 
+    def test_entry_buffers_unsaved_changes(self):
+
+        # Small chunks should be buffered until the size threshold
+        entry_dir = OUTPUT_DIR / 'test_entry_buffer'
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        entry = cp.TabularEntry(entry_dir, 'test_tabular')
+        entry.max_unsaved_period = 60
+        tabular_data = self.tabular_ds.get(pd.Timedelta(seconds=0), pd.Timedelta(seconds=1))
+        
+        num_of_chunks = 0
+        while not entry.needs_flush():
+            entry.append({'data': tabular_data})
+            num_of_chunks += 1
+        assert num_of_chunks * len(tabular_data) >= entry.max_unsaved_rows
+        assert not entry.save_loc.exists()
+
+        # Closing writes all the changes at once
+        entry.close()
+        saved_data = pd.read_csv(entry.save_loc)
+        assert len(saved_data) == num_of_chunks * len(tabular_data)
+
+    def test_image_entry_encodes_batches(self):
+
+        # Create a PNG image entry, as it is lossless
+        entry_dir = OUTPUT_DIR / 'test_image_entry'
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        os.mkdir(entry_dir)
+        entry = cp.ImageEntry(entry_dir, 'test_images', image_format='.png', quality=1)
+
+        # Log two batches of images
+        video_data = self.video_ds.get(pd.Timedelta(seconds=0), pd.Timedelta(seconds=1))
+        entry.append({'data': video_data})
+        entry.flush()
+        entry.append({'data': video_data})
+        entry.close()
+
+        # Each image should be saved and have its timestamp
+        timestamps = pd.read_csv(entry.save_loc / 'timestamps.csv')
+        assert (timestamps['idx'] == np.arange(2*len(video_data))).all()
+        assert (pd.to_timedelta(timestamps['_time_'])[:len(video_data)] == video_data['_time_'].values).all()
+        for idx, frame in zip(timestamps['idx'], pd.concat([video_data, video_data])['frames']):
+            image = cv2.imread(str(entry.save_loc / f"{idx}.png"))
+            assert np.array_equal(image, frame)
+
+    def test_image_entry_archive_storage(self):
+
+        # Create a PNG image entry that appends to an archive
+        entry_dir = OUTPUT_DIR / 'test_image_archive'
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        os.mkdir(entry_dir)
+        entry = cp.ImageEntry(entry_dir, 'test_images', image_format='.png', storage='archive')
+
+        # Log two batches of images
+        video_data = self.video_ds.get(pd.Timedelta(seconds=0), pd.Timedelta(seconds=1))
+        entry.append({'data': video_data})
+        entry.flush()
+        entry.append({'data': video_data})
+        entry.close()
+
+        # Only the archive, its index, and the timestamps are saved
+        assert sorted(os.listdir(entry.save_loc)) == ['images.bin', 'index.bin', 'timestamps.csv']
+
+        # Each image should be found with the index
+        timestamps = pd.read_csv(entry.save_loc / 'timestamps.csv')
+        index = cp.ImageEntry.read_archive_index(entry.save_loc)
+        assert len(index) == len(timestamps) == 2*len(video_data)
+        for idx, frame in zip(timestamps['idx'], pd.concat([video_data, video_data])['frames']):
+            offset, size = index[idx]
+            encoded_image = cp.ImageEntry.read_archive_image(entry.archive_path, offset, size)
+            image = cv2.imdecode(np.frombuffer(encoded_image, dtype=np.uint8), cv2.IMREAD_COLOR)
+            assert np.array_equal(image, frame)
+
+    def test_video_entry_encoding_thread(self):
+
+        # Create a video entry that can only queue a single batch
+        entry_dir = OUTPUT_DIR / 'test_video_entry'
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        entry = cp.VideoEntry(entry_dir, 'test_video', max_queued_batches=1)
+
+        # Log contiguous frames and frames that need to be converted
+        video_data = self.video_ds.get(pd.Timedelta(seconds=0), pd.Timedelta(seconds=1))
+        converted_data = self.video_ds.get(pd.Timedelta(seconds=1), pd.Timedelta(seconds=2))
+        converted_data['frames'] = [frame[:,::-1].astype(np.float32) for frame in converted_data['frames']]
+        for data in [video_data, converted_data, video_data]:
+            entry.append({'data': data})
+            entry.flush()
+        entry.close()
+
+        # All the frames should be encoded
+        assert entry.num_of_encoded_frames == 2*len(video_data) + len(converted_data)
+        assert entry.encode_fps > 0
+        video = cv2.VideoCapture(str(entry.save_loc))
+        assert int(video.get(cv2.CAP_PROP_FRAME_COUNT)) == entry.num_of_encoded_frames
+        video.release()
+
+    def test_video_entry_timestamps_sidecar(self):
+
+        # Create frames with a variable frame rate, crossing seconds
+        entry_dir = OUTPUT_DIR / 'test_video_timestamps'
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        entry = cp.VideoEntry(entry_dir, 'test_video')
+        video_data = self.video_ds.get(pd.Timedelta(seconds=0), pd.Timedelta(seconds=2))
+        periods = np.where(np.arange(len(video_data)) % 10 == 9, 0.1, 1/30)
+        video_data['_time_'] = pd.to_timedelta(0.9 + np.cumsum(periods), unit='s')
+
+        # The fps should be estimated from the typical period
+        assert abs(cp.VideoEntry.estimate_fps(video_data['_time_']) - 30) < 0.01
+
+        # Duplicate timestamps are ignored, unless there are only those
+        duplicated_times = pd.concat([video_data['_time_'], video_data['_time_'].iloc[:5]]).sort_values()
+        assert abs(cp.VideoEntry.estimate_fps(duplicated_times) - 30) < 0.01
+        with self.assertRaises(ValueError):
+            cp.VideoEntry.estimate_fps(video_data['_time_'].iloc[[0, 0]])
+
+        # Log the frames in multiple batches
+        for start in range(0, len(video_data), 25):
+            entry.append({'data': video_data.iloc[start:start+25]})
+            entry.flush()
+        entry.close()
+
+        # The reloaded video should use the recorded timestamps
+        start_time = video_data['_time_'].iloc[0]
+        reloaded_ds = cp.VideoDataStream(
+            name='test_video',
+            start_time=start_time,
+            video_path=entry.save_loc,
+            timestamps_path=entry.timestamps_loc,
+            startup_now=True
+        )
+        assert len(reloaded_ds) == len(video_data)
+        assert (reloaded_ds.timetrack['time'].values == video_data['_time_'].values).all()
+        reloaded_data = reloaded_ds.get(start_time, video_data['_time_'].iloc[-1] + pd.Timedelta(seconds=0.01))
+        assert len(reloaded_data) == len(video_data)
+        reloaded_ds.close()
+
+    def test_logging_tabular_data_to_parquet(self):
+
+        # Log the tabular data in multiple chunks
+        root_session = cp.Session(
+            name='root',
+            logging_queue=self.logging_queue
+        )
+        expected_data = []
+        for start in range(0, 10, 2):
+            tabular_data = self.tabular_ds.get(pd.Timedelta(seconds=start), pd.Timedelta(seconds=start+2))
+            root_session.add_tabular(
+                name='test_parquet',
+                data=tabular_data,
+                time_column='_time_',
+                file_format='parquet'
+            )
+            expected_data.append(tabular_data)
+
+        # Start the logger and tell it to stop once the data is logged
+        self.logger.start()
+        end_message = {
+            'header': 'META',
+            'body': {
+                'type': 'END',
+                'content': {},
+            }
+        }
+        self.message_to_logger.put(end_message)
+
+        # Clear the messages until the logger joins
+        while self.logger.is_alive():
+            cp.tools.clear_queue(self.message_from_logger)
+            self.logger.join(timeout=0.1)
+
+        # The file should contain all the chunks, with the timedeltas
+        expected_data = pd.concat(expected_data).reset_index(drop=True)
+        data = cp.ParquetEntry.read(self.logger.experiment_dir / "test_parquet.parquet")
+        assert data['_time_'].dtype == expected_data['_time_'].dtype
+        pd.testing.assert_frame_equal(data, expected_data)
+
+    def test_parquet_entry_promotes_schema(self):
+
+        # Create the entry
+        entry_dir = OUTPUT_DIR / 'test_parquet_schema'
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        entry = cp.ParquetEntry(entry_dir, 'test_parquet')
+
+        # Log chunks with wider types and a new column
+        chunks = [
+            pd.DataFrame({'_time_': pd.to_timedelta([0, 1], unit='s'), 'x': [1, 2]}),
+            pd.DataFrame({'_time_': pd.to_timedelta([2, 3], unit='s'), 'x': [1.5, None]}),
+            pd.DataFrame({'_time_': pd.to_timedelta([4], unit='s'), 'x': [3.0], 'y': ['a']})
+        ]
+        for chunk in chunks:
+            entry.append({'data': chunk.copy()})
+            entry.flush()
+        entry.close()
+
+        # The data should be complete, with the promoted types
+        data = cp.ParquetEntry.read(entry.save_loc)
+        assert data['_time_'].dtype == chunks[0]['_time_'].dtype
+        assert data['x'].dtype == np.float64
+        assert data['x'].tolist()[:2] == [1.0, 2.0] and data['x'].iloc[2] == 1.5 and np.isnan(data['x'].iloc[3])
+        assert data['y'].isna().sum() == 4 and data['y'].iloc[4] == 'a'
+
+    def test_logging_many_entries_with_writer_pool(self):
+
+        # Create a logger with fewer writers than entries
+        logger = cp.Logger(
+            logdir=self.logdir,
+            experiment_name='testing_logger',
+            logging_queue=self.logging_queue,
+            message_to_queue=self.message_to_logger,
+            message_from_queue=self.message_from_logger,
+            num_of_writers=2,
+            max_writer_queue_size=2,
+            meta_data_period=0.1
+        )
+        root_session = cp.Session(
+            name='root',
+            logging_queue=self.logging_queue
+        )
+
+        # Log multiple chunks to many entries
+        tabular_data = self.tabular_ds.get(pd.Timedelta(seconds=0), pd.Timedelta(seconds=1))
+        num_of_entries = 10
+        for i in range(3):
+            for j in range(num_of_entries):
+                root_session.add_tabular(f'test_tabular_{j}', tabular_data)
+
+        # Start the logger and tell it to stop once the data is logged
+        logger.start()
+        end_message = {
+            'header': 'META',
+            'body': {
+                'type': 'END',
+                'content': {},
+            }
+        }
+        self.message_to_logger.put(end_message)
+
+        # Count the logged data chunks until the logger joins
+        messages = []
+        while logger.is_alive() or self.message_from_logger.qsize():
+            try:
+                messages.append(self.message_from_logger.get(timeout=0.1))
+            except queue.Empty:
+                continue
+        logger.join()
+        counters = [m for m in messages if m['body']['type'] == 'COUNTER']
+        assert len(counters) == 3 * num_of_entries
+
+        # Every entry should be complete and in the meta data
+        with open(logger.experiment_dir / 'meta.json') as f:
+            meta_data = json.load(f)
+        assert not (logger.experiment_dir / 'meta.json.tmp').exists()
+        for j in range(num_of_entries):
+            assert f'test_tabular_{j}' in meta_data['records']['root']
+            logged_data = pd.read_csv(logger.experiment_dir / f'test_tabular_{j}.csv')
+            assert len(logged_data) == 3 * len(tabular_data)
+
+    def test_logging_continues_after_entry_failure(self):
+
+        # Create a logger with a single writer and a small queue
+        logger = cp.Logger(
+            logdir=self.logdir,
+            experiment_name='testing_logger',
+            logging_queue=self.logging_queue,
+            message_to_queue=self.message_to_logger,
+            message_from_queue=self.message_from_logger,
+            num_of_writers=1,
+            max_writer_queue_size=1,
+            meta_data_period=0.1
+        )
+        root_session = cp.Session(
+            name='root',
+            logging_queue=self.logging_queue
+        )
+
+        # Logging images to a tabular entry fails for every chunk
+        tabular_data = self.tabular_ds.get(pd.Timedelta(seconds=0), pd.Timedelta(seconds=1))
+        root_session.add_tabular('test_tabular', tabular_data)
+        for i in range(10):
+            root_session.add_image('test_tabular', np.zeros((4,4,3), dtype=np.uint8))
+        root_session.add_tabular('test_tabular', tabular_data)
+
+        # Creating an entry from an empty chunk fails, but not the next
+        root_session.put_tabular('test_created_later', tabular_data.iloc[:0], 'tabular')
+        root_session.put_tabular('test_created_later', tabular_data, 'tabular')
+
+        # Start the logger and tell it to stop once the data is logged
+        logger.start()
+        end_message = {
+            'header': 'META',
+            'body': {
+                'type': 'END',
+                'content': {},
+            }
+        }
+        self.message_to_logger.put(end_message)
+
+        # The logger should still process every chunk and join
+        messages = []
+        tic = time.time()
+        while (logger.is_alive() or self.message_from_logger.qsize()) and time.time() - tic < 30:
+            try:
+                messages.append(self.message_from_logger.get(timeout=0.1))
+            except queue.Empty:
+                continue
+        logger.join(timeout=1)
+        assert not logger.is_alive()
+        counters = [m for m in messages if m['body']['type'] == 'COUNTER']
+        assert len(counters) == 14
+
+        # The valid data is still logged
+        logged_data = pd.read_csv(logger.experiment_dir / 'test_tabular.csv')
+        assert len(logged_data) == 2 * len(tabular_data)
+        logged_data = pd.read_csv(logger.experiment_dir / 'test_created_later.csv')
+        assert len(logged_data) == len(tabular_data)
+
+    def test_logging_frames_with_shared_memory(self):
+
+        # Create a logger that receives the frames through shared memory
+        shared_memory_ring = cp.SharedMemoryRing(num_of_segments=2, segment_size=4*1024**2)
+        logger = cp.Logger(
+            logdir=self.logdir,
+            experiment_name='testing_logger',
+            logging_queue=self.logging_queue,
+            message_to_queue=self.message_to_logger,
+            message_from_queue=self.message_from_logger,
+            shared_memory_ring=shared_memory_ring
+        )
+        root_session = cp.Session(
+            name='root',
+            logging_queue=self.logging_queue,
+            shared_memory_ring=shared_memory_ring
+        )
+
+        # Log the frames, which should only pass their descriptors
+        video_data = self.video_ds.get(pd.Timedelta(seconds=0), pd.Timedelta(seconds=1))
+        root_session.add_video(name='test_video', df=video_data)
+        root_session.add_images(name='test_images', df=video_data, image_format='.png')
+        for i in range(2):
+            data_chunk = self.logging_queue.get()
+            assert isinstance(data_chunk['data'], cp.core.transport.SharedMemoryChunk)
+            self.logging_queue.put(data_chunk)
+
+        # Start the logger and tell it to stop once the data is logged
+        logger.start()
+        end_message = {
+            'header': 'META',
+            'body': {
+                'type': 'END',
+                'content': {},
+            }
+        }
+        self.message_to_logger.put(end_message)
+
+        # Clear the messages until the logger joins
+        while logger.is_alive():
+            cp.tools.clear_queue(self.message_from_logger)
+            logger.join(timeout=0.1)
+
+        # The segments should be released and the frames logged
+        assert shared_memory_ring.free_segments.qsize() == len(shared_memory_ring)
+        images_dir = logger.experiment_dir / 'test_images'
+        for idx, frame in enumerate(video_data['frames']):
+            assert np.array_equal(cv2.imread(str(images_dir / f"{idx}.png")), frame)
+        video = cv2.VideoCapture(str(logger.experiment_dir / 'test_video.avi'))
+        assert int(video.get(cv2.CAP_PROP_FRAME_COUNT)) == len(video_data)
+        video.release()
+
+        shared_memory_ring.close(unlink=True)
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -16,6 +16,7 @@ import tqdm
 import numpy as np
 import psutil
 import pandas as pd
+import cv2
 
 # Testing Library
 import chimerapy as cp
@@ -154,5 +155,117 @@ class SorterTests(unittest.TestCase):
         loader.join()
         sorter.join()
 
+    def test_sorting_window_into_batch(self):
+
+        # Create the data sorter, without starting it
+        entries = pd.DataFrame({
+            'user': ['P01', 'P01', 'P02'], 
+            'entry_name': ['test_tabular', 'test_video', 'test_video'], 
+            'dtype': ['tabular', 'video', 'video']
+        })
+        sorter = cp.Sorter(
+            loading_queue=cp.tools.PortableQueue(),
+            sorting_queue=cp.tools.PortableQueue(),
+            message_to_queue=cp.tools.PortableQueue(),
+            message_from_queue=cp.tools.PortableQueue(),
+            entries=entries
+        )
+
+        # Create a window with interleaved samples
+        frames = [np.full((4,4,3), i, dtype=np.uint8) for i in range(6)]
+        window_data = {
+            'P01': {
+                'test_tabular': pd.DataFrame({'_time_': pd.to_timedelta([0.0, 0.5], unit='s'), 'x': [1, 2]}),
+                'test_video': pd.DataFrame({'_time_': pd.to_timedelta([0.0, 0.2, 0.4], unit='s'), 'frames': frames[:3]})
+            },
+            'P02': {
+                'test_video': pd.DataFrame({'_time_': pd.to_timedelta([0.1, 0.2, 0.3], unit='s'), 'frames': frames[3:]})
+            }
+        }
+
+        # Sort the window
+        batch = sorter.sort_window(window_data)
+
+        # The tabular data is not displayed, and the frames are sorted
+        assert batch['entries'] == [('P01', 'test_video'), ('P02', 'test_video')]
+        assert batch['times'].dtype == np.int64
+        assert (np.diff(batch['times']) >= 0).all()
+        assert batch['codes'].tolist() == [0, 1, 0, 1, 1, 0]
+        assert [int(content[0,0,0]) for content in batch['contents']] == [0, 3, 1, 4, 5, 2]
+
+    def test_sorting_window_of_images(self):
+
+        # Write the images of an entry
+        images_dir = OUTPUT_DIR / 'sorter_images'
+        if images_dir.exists():
+            shutil.rmtree(images_dir)
+        os.makedirs(images_dir)
+        filepaths = []
+        for i in range(3):
+            filepath = images_dir / f"{i}.jpg"
+            cv2.imwrite(str(filepath), np.full((64,96,3), 50*i, dtype=np.uint8))
+            filepaths.append(str(filepath))
+
+        entries = pd.DataFrame({'user': ['P01'], 'entry_name': ['test_image'], 'dtype': ['image']})
+        window_data = {'P01': {'test_image': pd.DataFrame({
+            '_time_': pd.to_timedelta([0.2, 0.0, 0.1], unit='s'), 
+            'img_filepaths': filepaths
+        })}}
+
+        # Decode the images in the Sorter, or send them encoded
+        for send_encoded_images in [False, True]:
+            sorter = cp.Sorter(
+                loading_queue=cp.tools.PortableQueue(),
+                sorting_queue=cp.tools.PortableQueue(),
+                message_to_queue=cp.tools.PortableQueue(),
+                message_from_queue=cp.tools.PortableQueue(),
+                entries=entries,
+                send_encoded_images=send_encoded_images
+            )
+            batch = sorter.sort_window(window_data)
+
+            if send_encoded_images:
+                assert all(content.ndim == 1 for content in batch['contents'])
+                images = [cp.ImageEntry.decode_image(content, scale=2) for content in batch['contents']]
+                assert images[0].shape == (32,48,3)
+            else:
+                images = batch['contents']
+                assert images[0].shape == (64,96,3)
+
+            assert [int(image[0,0,0]) // 10 for image in images] == [5, 10, 0]
+
+    def test_downscaling_frames_to_display_sizes(self):
+
+        # Create the data sorter, knowing the size of a display
+        entries = pd.DataFrame({'user': ['P01', 'P02'], 'entry_name': ['test_video', 'test_video'], 'dtype': ['video', 'video']})
+        sorter = cp.Sorter(
+            loading_queue=cp.tools.PortableQueue(),
+            sorting_queue=cp.tools.PortableQueue(),
+            message_to_queue=cp.tools.PortableQueue(),
+            message_from_queue=cp.tools.PortableQueue(),
+            entries=entries,
+            display_sizes={('P01', 'test_video'): (135, 200)}
+        )
+
+        frames = [np.zeros((1080,1920,3), dtype=np.uint8) for i in range(4)]
+        window_data = {user: {'test_video': pd.DataFrame({
+            '_time_': pd.to_timedelta([0.0, 0.1], unit='s'), 
+            'frames': frames[2*i:2*i+2]
+        })} for i, user in enumerate(['P01', 'P02'])}
+
+        # Only the frames of the known display are downscaled, keeping 
+        # their aspect ratio
+        batch = sorter.sort_window(window_data)
+        shapes = {batch['entries'][code]: content.shape for code, content in zip(batch['codes'], batch['contents'])}
+        assert shapes[('P01', 'test_video')] == (112,200,3)
+        assert shapes[('P02', 'test_video')] == (1080,1920,3)
+
+        # Update the sizes of the displays
+        sorter.set_display_sizes({('P02', 'test_video'): (2000, 2000)})
+        batch = sorter.sort_window(window_data)
+        shapes = {batch['entries'][code]: content.shape for code, content in zip(batch['codes'], batch['contents'])}
+        assert shapes[('P01', 'test_video')] == (1080,1920,3)
+        assert shapes[('P02', 'test_video')] == (1080,1920,3)
+
 if __name__ == '__main__':
     unittest.main()
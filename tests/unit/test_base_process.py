@@ -0,0 +1,57 @@
+# Built-in Imports
+import time
+import unittest
+import threading
+import queue
+
+# Testing Library
+import chimerapy as cp
+from chimerapy.base_process import BaseProcess
+
+class BaseProcessTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        # Use queues without a pipe, setting up the process in this one
+        self.process = BaseProcess(
+            message_to_queue=queue.Queue(),
+            message_from_queue=queue.Queue()
+        )
+        self.process.setup()
+
+    def tearDown(self):
+        self.process.end()
+        self.process.close()
+
+    def test_waiting_for_data_of_queue_without_pipe(self):
+
+        data_queue = queue.Queue()
+        assert not self.process.wait_for_data(data_queue, timeout=0.2)
+
+        # Data put from another thread should be detected
+        threading.Timer(0.2, lambda: data_queue.put(1)).start()
+        tic = time.time()
+        assert self.process.wait_for_data(data_queue, timeout=5)
+        assert time.time() - tic < 1
+
+    def test_waiting_for_data_of_portable_queue(self):
+
+        data_queue = cp.tools.PortableQueue()
+        assert not self.process.wait_for_data(data_queue, timeout=0.2)
+        data_queue.put(1)
+        assert self.process.wait_for_data(data_queue, timeout=5)
+
+    def test_waiting_until_state_changed_without_message(self):
+
+        # The predicate depends on state changed outside of the messages
+        event = threading.Event()
+        threading.Timer(0.2, event.set).start()
+        tic = time.time()
+        assert self.process.wait_until(event.is_set)
+        assert time.time() - tic < 1
+
+        # The timeout is still respected
+        assert not self.process.wait_until(lambda: False, timeout=0.2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,7 @@ import time
 import collections
 import queue
 import gc
+import threading
 
 # Third-Party Imports
 import tqdm
@@ -95,6 +96,108 @@ class CollectorTestCase(unittest.TestCase):
 
         return None
 
+    def test_concurrent_collector(self):
+
+        # Create a collector that fetches with a thread pool
+        concurrent_collector = cp.Collector(
+            {'P01': self.dss},
+            time_window=pd.Timedelta(seconds=2),
+            num_of_workers=2
+        )
+
+        # Setting start and end time
+        start_time = pd.Timedelta(seconds=0)
+        end_time = pd.Timedelta(seconds=1)
+
+        # The output should be the same as the serial collector
+        data1 = self.collector.get(start_time, end_time)
+        data2 = concurrent_collector.get(start_time, end_time)
+        for user in data1.keys():
+            assert list(data1[user].keys()) == list(data2[user].keys())
+            for ds_name in data1[user].keys():
+                assert data1[user][ds_name].equals(data2[user][ds_name])
+
+        # Timing statistics are recorded per data stream
+        stats = concurrent_collector.get_timing_stats()
+        assert ('P01', 'test_video') in stats.index
+        assert ('P01', 'test_tabular') in stats.index
+
+        concurrent_collector.close()
+
+    def test_concurrent_collector_timings(self):
+
+        # Create a collector with many groups fetched by the thread pool
+        groups = {
+            f"P{i:02d}": [cp.TabularDataStream(
+                name="test_tabular",
+                data=self.csv_data,
+                time_column="_time_"
+            )] for i in range(16)
+        }
+        concurrent_collector = cp.Collector(
+            groups,
+            time_window=pd.Timedelta(seconds=2),
+            num_of_workers=8
+        )
+
+        # Reading the statistics while the workers record the timings
+        reader_exit = threading.Event()
+        def read_stats():
+            while not reader_exit.is_set():
+                concurrent_collector.get_timing_stats()
+        reader = threading.Thread(target=read_stats)
+        reader.start()
+
+        num_of_gets = 20
+        for i in range(num_of_gets):
+            concurrent_collector.get(pd.Timedelta(seconds=0), pd.Timedelta(seconds=1))
+
+        reader_exit.set()
+        reader.join()
+
+        # Every get of every data stream should be recorded
+        assert len(concurrent_collector.stream_timings) == len(groups)
+        for timings in concurrent_collector.stream_timings.values():
+            assert len(timings) == num_of_gets
+
+        concurrent_collector.close()
+
+    def test_global_timetrack_merge(self):
+
+        # The merge should match concatenating and sorting all timetracks
+        expected_times = pd.concat([ds.timetrack['time'] for ds in self.dss]).sort_values()
+        assert (self.collector.global_timetrack['time'].values == expected_times.values).all()
+        assert len(self.collector) == len(expected_times)
+
+        # Pointers should point back to the correct data stream time
+        for ds in self.dss:
+            ds_timetrack = self.collector.global_timetrack[self.collector.global_timetrack['ds_type'] == ds.name]
+            assert (ds.timetrack['time'].values[ds_timetrack['ds_index']] == ds_timetrack['time'].values).all()
+
+    def test_lazy_global_timetrack(self):
+
+        # Create a collector that only builds the timetrack per window
+        lazy_collector = cp.Collector(
+            {'P01': self.dss},
+            time_window=pd.Timedelta(seconds=2),
+            lazy_timetrack=True
+        )
+
+        # Same boundaries and windows as the complete timetrack
+        assert lazy_collector.start_time == self.collector.start_time
+        assert lazy_collector.end_time == self.collector.end_time
+        assert lazy_collector.windows == self.collector.windows
+        assert len(lazy_collector) == len(self.collector)
+
+        # Same timetrack in a window range
+        start_time = pd.Timedelta(seconds=2)
+        end_time = pd.Timedelta(seconds=4)
+        lazy_timetrack = lazy_collector.get_timetrack(start_time, end_time)
+        timetrack = self.collector.get_timetrack(start_time, end_time)
+        assert (lazy_timetrack['time'].values == timetrack['time'].values).all()
+        assert (lazy_timetrack['ds_index'].values == timetrack['ds_index'].values).all()
+        assert (lazy_timetrack['ds_type'].values == timetrack['ds_type'].values).all()
+
 if __name__ == '__main__':
     # Run when debugging is not needed
     unittest.main()
@@ -91,6 +91,89 @@ class DataStreamTestCase(unittest.TestCase):
 
         return None
 
+    def test_getting_window_indices_match_mask(self):
+
+        # Windows that fall inside, across, and outside the timetrack
+        windows = [(0, 0.1), (2.5, 7.5), (19.9, 25), (30, 40)]
+
+        for ds in self.dss:
+            for start, end in windows:
+                start_time = pd.Timedelta(seconds=start)
+                end_time = pd.Timedelta(seconds=end)
+
+                # Compute the window with the previous full-mask approach
+                mask = (ds.timetrack['time'] >= start_time) & (ds.timetrack['time'] < end_time)
+                expected_index = ds.timetrack[mask].ds_index.tolist()
+
+                # Then with the binary search
+                start_idx, end_idx = ds.get_window_indices(start_time, end_time)
+                assert ds.timetrack_index[start_idx:end_idx].tolist() == expected_index
+
+        return None
+
+    def test_video_sequential_access_without_seeking(self):
+
+        # Walking the windows in order should only stream forward
+        windows = [(x, x+0.5) for x in np.arange(0, 3, 0.5)]
+        first_window_data = None
+        for start, end in windows:
+            data = self.video_ds.get(pd.Timedelta(seconds=start), pd.Timedelta(seconds=end))
+            if first_window_data is None:
+                first_window_data = data
+        assert self.video_ds.num_of_seeks == 0
+
+        # Jumping back requires a seek, yet provides the same frames
+        data = self.video_ds.get(pd.Timedelta(seconds=0), pd.Timedelta(seconds=0.5))
+        assert self.video_ds.num_of_seeks == 1
+        for frame, expected_frame in zip(data['frames'], first_window_data['frames']):
+            assert np.array_equal(frame, expected_frame)
+
+        return None
+
+    def test_video_getting_frame_batch(self):
+
+        start_time = pd.Timedelta(seconds=1)
+        end_time = pd.Timedelta(seconds=2)
+
+        # The batch is a single (n, h, w, c) array
+        times, frames = self.video_ds.get_batch(start_time, end_time)
+        assert isinstance(frames, np.ndarray) and frames.dtype == np.uint8
+        assert frames.shape == (len(times), *self.video_ds.frame_shape)
+
+        # It should match the data frame version
+        data = self.video_ds.get(start_time, end_time)
+        assert (data['_time_'] == times).all()
+        for frame, expected_frame in zip(data['frames'], frames):
+            assert np.array_equal(frame, expected_frame)
+
+        return None
+
+    def test_video_prefetching_matches_direct_decoding(self):
+
+        # Create a video data stream that decodes ahead
+        prefetch_video_ds = cp.VideoDataStream(
+            name="test_prefetch_video",
+            start_time=pd.Timedelta(0),
+            video_path=RAW_DATA_DIR/"example_use_case"/"test_video1.mp4",
+            fps=30,
+            startup_now=True,
+            prefetch_size=10
+        )
+
+        # Sequential windows, a jump back, and a window past the end
+        windows = [(0, 0.5), (0.5, 1), (1, 1.5), (0.25, 0.75), (10, 11), (19.9, 25), (20, 25)]
+        for start, end in windows:
+            start_time = pd.Timedelta(seconds=start)
+            end_time = pd.Timedelta(seconds=end)
+            times, frames = prefetch_video_ds.get_batch(start_time, end_time)
+            expected_times, expected_frames = self.video_ds.get_batch(start_time, end_time)
+            assert (times == expected_times).all()
+            assert np.array_equal(frames, expected_frames)
+
+        prefetch_video_ds.close()
+
+        return None
+
     def test_appending_data(self):
 
         # Getting data to append
@@ -7,6 +7,7 @@ import shutil
 import os
 import sys
 import threading
+import json
 
 # Third-Party Imports
 import pandas as pd
@@ -90,6 +91,138 @@ class SingleRunnerTestCase(unittest.TestCase):
 
         return None
 
+    def test_runner_with_shared_memory(self):
+
+        # Load construct the first runner
+        self.runner = cp.SingleRunner(
+            name='P01',
+            logdir=OUTPUT_DIR,
+            data_streams=self.dss,
+            pipe=self.individual_pipeline,
+            time_window=pd.Timedelta(seconds=0.5),
+            end_time=pd.Timedelta(seconds=5),
+            run_solo=True,
+            num_of_shared_memory_segments=4,
+            shared_memory_segment_size=4*1024**2
+        )
+
+        # Running should be working!
+        self.runner.run()
+
+        return None
+
+    def test_runner_logging_frames_with_shared_memory(self):
+
+        # The pipeline logs the frames of each window
+        class VideoLoggingPipeline(cp.Pipeline):
+            def step(self, data_samples):
+                if len(data_samples['test_video']) > 0:
+                    self.session.add_video('test_video', data_samples['test_video'])
+
+        # Load construct the first runner
+        self.runner = cp.SingleRunner(
+            name='P01',
+            logdir=OUTPUT_DIR,
+            data_streams=self.dss,
+            pipe=VideoLoggingPipeline(),
+            time_window=pd.Timedelta(seconds=0.5),
+            end_time=pd.Timedelta(seconds=5),
+            run_solo=True,
+            num_of_logging_shared_memory_segments=2,
+            logging_shared_memory_segment_size=4*1024**2
+        )
+
+        # Running should log all the frames
+        self.runner.run()
+        assert len(self.runner.logging_queue_memory_chunks) == 0
+        with open(OUTPUT_DIR / 'P01' / 'meta.json') as f:
+            assert json.load(f)['records']['root']['test_video']['end_time'] != str(pd.Timedelta(0))
+
+        return None
+
+    def test_runner_buffering_tabular_logging(self):
+
+        # The pipeline logs a few rows per window
+        class TabularLoggingPipeline(cp.Pipeline):
+            def __init__(self):
+                super().__init__()
+                self.num_of_logged_rows = 0
+            def step(self, data_samples):
+                rows = data_samples['test_tabular'].iloc[:3]
+                self.session.add_tabular('test_tabular', rows)
+                self.num_of_logged_rows += len(rows)
+
+        # Clear out the previously logged data
+        if (OUTPUT_DIR / 'P01').exists():
+            shutil.rmtree(OUTPUT_DIR / 'P01')
+
+        # Load construct the first runner
+        pipeline = TabularLoggingPipeline()
+        self.runner = cp.SingleRunner(
+            name='P01',
+            logdir=OUTPUT_DIR,
+            data_streams=self.dss,
+            pipe=pipeline,
+            time_window=pd.Timedelta(seconds=0.5),
+            end_time=pd.Timedelta(seconds=5),
+            run_solo=True,
+            max_session_buffered_rows=10,
+            max_session_buffered_period=60
+        )
+
+        # All the buffered rows should be logged, in fewer data chunks
+        self.runner.run()
+        logged_data = pd.read_csv(OUTPUT_DIR / 'P01' / 'test_tabular.csv')
+        assert len(logged_data) == pipeline.num_of_logged_rows
+        assert pd.to_timedelta(logged_data['_time_']).is_monotonic_increasing
+        assert self.runner.num_of_logged_data < self.runner.num_of_windows
+        assert len(self.runner.logging_queue_memory_chunks) == 0
+
+        return None
+
+    def test_runner_with_prefetching(self):
+
+        # Load construct the first runner
+        self.runner = cp.SingleRunner(
+            name='P01',
+            logdir=OUTPUT_DIR,
+            data_streams=self.dss,
+            pipe=self.individual_pipeline,
+            time_window=pd.Timedelta(seconds=0.5),
+            end_time=pd.Timedelta(seconds=5),
+            run_solo=True,
+            num_of_prefetched_chunks=2
+        )
+
+        # Running should process all the windows
+        self.runner.run()
+        assert self.runner.num_processed_data_chunks == self.runner.num_of_windows
+        assert len(self.runner.loading_queue_memory_chunks) == 0
+
+        return None
+
+    def test_runner_with_lazy_timetrack(self):
+
+        # Load construct the first runner
+        self.runner = cp.SingleRunner(
+            name='P01',
+            logdir=OUTPUT_DIR,
+            data_streams=self.dss,
+            pipe=self.individual_pipeline,
+            time_window=pd.Timedelta(seconds=0.5),
+            end_time=pd.Timedelta(seconds=5),
+            run_solo=True,
+            lazy_timetrack=True
+        )
+
+        # Running should process all the windows, with the timetrack
+        # of each window sent by the loader
+        self.runner.run()
+        assert self.runner.num_processed_data_chunks == self.runner.num_of_windows
+        assert len(self.runner.timetrack) == 0
+
+        return None
+
     def test_runner_handling_keyboard_interrupt(self):
 
         def create_keyboard_interrupt():
@@ -119,7 +252,32 @@ class SingleRunnerTestCase(unittest.TestCase):
 
         # Then stoping the thread
         signal_thread.join()
-    
+
+    def test_runner_processing_stops_without_loader_message(self):
+
+        # Load construct the first runner
+        self.runner = cp.SingleRunner(
+            name='P01',
+            logdir=OUTPUT_DIR,
+            data_streams=self.dss,
+            pipe=self.individual_pipeline,
+            time_window=pd.Timedelta(seconds=0.5),
+            run_solo=True,
+        )
+
+        # A data chunk whose ``Loader`` message never arrives
+        self.runner.thread_exit = threading.Event()
+        self.runner.loading_counter_updated = threading.Condition()
+        self.runner.get_data_chunk = lambda: {'uuid': 'never_registered', 'data': {}}
+        processing_thread = threading.Thread(target=self.runner.process_data)
+        processing_thread.start()
+
+        # Setting the thread exit, without notifying, should still stop
+        time.sleep(0.2)
+        self.runner.thread_exit.set()
+        processing_thread.join(timeout=2)
+        assert not processing_thread.is_alive()
+
 class GroupRunnerTestCase(unittest.TestCase):
 
     def setUp(self):
@@ -185,6 +343,50 @@ class GroupRunnerTestCase(unittest.TestCase):
 
         return None
 
+    def test_group_runner_with_concurrent_steps(self):
+
+        # Pipelines that output their name after some work
+        class NamedPipeline(cp.Pipeline):
+            def __init__(self, name):
+                super().__init__()
+                self.name = name
+            def step(self, data_samples):
+                time.sleep(0.01)
+                return self.name
+
+        # The group pipeline records the outputs of the runners
+        class RecordingPipeline(cp.Pipeline):
+            def __init__(self):
+                super().__init__()
+                self.outputs = []
+            def step(self, data_samples):
+                self.outputs.append([data_samples[name]['_output_'] for name in data_samples])
+
+        for runner in self.runners:
+            runner.pipe = NamedPipeline(runner.name)
+        overall_pipeline = RecordingPipeline()
+
+        # Pass all the runners to the Director
+        group_runner = cp.GroupRunner(
+            logdir=OUTPUT_DIR,
+            name="Nurse Teamwork Example #1",
+            pipe=overall_pipeline,
+            runners=self.runners, 
+            time_window=pd.Timedelta(seconds=0.5),
+            end_time=pd.Timedelta(seconds=5),
+            num_of_step_workers=2
+        )
+
+        # Run the director
+        group_runner.run()
+
+        # Every window should get the outputs of the runners in order
+        assert len(overall_pipeline.outputs) > 0
+        for outputs in overall_pipeline.outputs:
+            assert outputs == [runner.name for runner in self.runners]
+
+        return None
+
     def test_group_runner_with_shorter_run(self):
         
         # Pass all the runners to the Director
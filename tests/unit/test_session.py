@@ -110,6 +110,35 @@ class SessionTestCase(unittest.TestCase):
 
         # Clear the queue
         cp.tools.clear_queue(self.logging_queue)
+
+    def test_session_buffers_tabular_data(self):
+
+        # Create a session that combines the small chunks
+        root_session = cp.Session(
+            name='root',
+            logging_queue=self.logging_queue,
+            max_buffered_rows=100,
+            max_buffered_period=60
+        )
+        tabular_data = self.tabular_ds.get(pd.Timedelta(seconds=0), pd.Timedelta(seconds=12.5))
+        for start in range(0, len(tabular_data), 10):
+            root_session.add_tabular('test_tabular', tabular_data.iloc[start:start+10])
+
+        # Only full buffers are put, until the session is flushed
+        assert self.logging_queue.qsize() == 2
+        root_session.flush()
+        assert self.logging_queue.qsize() == 3
+
+        # The data should keep its order
+        data_chunks = [self.logging_queue.get() for i in range(3)]
+        logged_data = pd.concat([data_chunk['data'] for data_chunk in data_chunks], ignore_index=True)
+        pd.testing.assert_frame_equal(logged_data, tabular_data.reset_index(drop=True))
+
+        # Old buffered data is put with the next call
+        root_session.max_buffered_period = 0
+        root_session.add_tabular('test_tabular', tabular_data.iloc[:10])
+        assert self.logging_queue.qsize() == 1
+        assert len(self.logging_queue.get()['data']) == 10
   
 if __name__ == "__main__":
     # unittest.main()
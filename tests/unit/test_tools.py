@@ -8,6 +8,7 @@ import time
 import collections
 import queue
 import gc
+import pickle
 import multiprocessing as mp
 
 # Third-Party Imports
@@ -47,6 +48,19 @@ class PortableQueueTests(unittest.TestCase):
         while queue.qsize() != 0:
             queue.get()
 
+    def test_clearing_queue(self):
+
+        queue = cp.tools.PortableQueue(maxsize=10)
+        for i in range(5):
+            queue.put(i)
+
+        queue.clear()
+        assert queue.empty()
+
+        # The queue is still usable after clearing
+        queue.put('a')
+        assert queue.get(timeout=1) == 'a'
+
     def test_passing_queue_to_process(self):
 
         number_of_entries = 5
@@ -73,5 +87,30 @@ class PortableQueueTests(unittest.TestCase):
 
         assert counter == number_of_entries
 
+class MemoryDataSizeTests(unittest.TestCase):
+
+    def test_memory_data_size_of_data_chunk(self):
+
+        # Frames that are views of a single batch, like the video data stream
+        frames = np.zeros((30, 120, 160, 3), dtype=np.uint8)
+        video_data = pd.DataFrame({
+            '_time_': pd.to_timedelta(np.arange(30), unit='s'),
+            'frames': list(frames)
+        })
+        tabular_data = pd.DataFrame({
+            '_time_': pd.to_timedelta(np.arange(100), unit='s'),
+            'x': np.random.rand(100),
+            'label': ['a'] * 100
+        })
+        data_chunk = {'uuid': 'test', 'data': {'P01': {'video': video_data, 'tabular': tabular_data}}}
+
+        # The estimate should account for the frames' buffers
+        size = cp.tools.get_memory_data_size(data_chunk)
+        assert size >= frames.nbytes + tabular_data['x'].nbytes
+
+        # And be comparable with the pickled size
+        pickled_size = len(pickle.dumps(data_chunk))
+        assert abs(size - pickled_size) < 0.1 * pickled_size
+
 if __name__ == '__main__':
     unittest.main()